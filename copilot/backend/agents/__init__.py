@@ -2,6 +2,7 @@
 ATLAS Capital Delivery - Multi-Agent System
 """
 
+from .conversation_store import ConversationStore
 from .orchestrator import AgentOrchestrator, get_orchestrator
 
-__all__ = ["AgentOrchestrator", "get_orchestrator"]
+__all__ = ["AgentOrchestrator", "ConversationStore", "get_orchestrator"]
@@ -0,0 +1,269 @@
+"""
+ATLAS Capital Delivery - Conversation Store
+
+Per-session chat state for the orchestrator, which is one instance shared by
+every user:
+- conversations are keyed by the client's session id; a message without one
+  gets a throwaway conversation, so nothing leaks between users
+- sessions live in a SQLite database (WAL) on local disk shared by every
+  uvicorn worker of the host, so consecutive messages of a session may land
+  on any worker (ATLAS_WORKERS > 1)
+- LRU over at most ATLAS_CONVERSATION_MAX_SESSIONS sessions; sessions idle
+  for ATLAS_CONVERSATION_TTL seconds expire
+- a session keeps its current project, last intent and its last few results
+  as compact summaries (response text and row lists truncated), never the
+  full payloads; it is stored as zlib-compressed JSON and its oldest
+  summaries are dropped to stay within ATLAS_CONVERSATION_SESSION_KB
+
+Like the shared result store, the store degrades instead of raising: when
+the database fails, a message is answered without its session's context.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.environ.get(
+    "ATLAS_CONVERSATION_PATH", os.path.join(tempfile.gettempdir(), "atlas-conversations.db")
+)
+MAX_SESSIONS = int(os.environ.get("ATLAS_CONVERSATION_MAX_SESSIONS", "2000"))
+SESSION_TTL = float(os.environ.get("ATLAS_CONVERSATION_TTL", "1800"))
+SESSION_BUDGET = int(os.environ.get("ATLAS_CONVERSATION_SESSION_KB", "32")) * 1024
+MAX_RESULTS = int(os.environ.get("ATLAS_CONVERSATION_RESULTS", "5"))
+MAX_SESSION_ID = 128
+
+# Expired sessions are swept at most this often (seconds)
+SWEEP_INTERVAL = 60.0
+
+# Result summaries: longest response text / string value, rows kept per list
+RESPONSE_CHARS = 2000
+VALUE_CHARS = 200
+LIST_ITEMS = 10
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL,
+    size INTEGER NOT NULL,
+    state BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+"""
+
+
+def _compact(value: Any, depth: int = 0) -> Any:
+    if isinstance(value, str):
+        return value if len(value) <= VALUE_CHARS else value[:VALUE_CHARS] + "..."
+    if isinstance(value, dict):
+        if depth >= 3:
+            return f"<{len(value)} fields>"
+        return {str(key): _compact(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if depth >= 3:
+            return f"<{len(value)} items>"
+        items = [_compact(item, depth + 1) for item in value[:LIST_ITEMS]]
+        if len(value) > LIST_ITEMS:
+            items.append(f"<{len(value) - LIST_ITEMS} more>")
+        return items
+    return value
+
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """What a conversation keeps of an orchestrator result."""
+    response = result.get("response") or ""
+    return {
+        "intent": result.get("intent"),
+        "sources": result.get("sources", []),
+        "visualization": result.get("visualization"),
+        "response": response if len(response) <= RESPONSE_CHARS else response[:RESPONSE_CHARS] + "...",
+        "context": _compact(result.get("context") or {})
+    }
+
+
+class Conversation:
+    """One session's state, as loaded from the store."""
+
+    __slots__ = ("session_id", "current_project", "last_intent", "results")
+
+    def __init__(self, session_id: Optional[str] = None, state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self.session_id = session_id
+        self.current_project: Optional[str] = state.get("current_project")
+        self.last_intent: Optional[str] = state.get("last_intent")
+        self.results: List[Dict[str, Any]] = state.get("results", [])  # summaries, oldest first
+
+    @property
+    def last_results(self) -> Optional[Dict[str, Any]]:
+        return self.results[-1] if self.results else None
+
+    def pack(self, budget: int) -> bytes:
+        """Compressed state within `budget` bytes (oldest summaries dropped first)."""
+        while True:
+            blob = zlib.compress(json.dumps({
+                "current_project": self.current_project,
+                "last_intent": self.last_intent,
+                "results": self.results
+            }, default=str, separators=(",", ":")).encode("utf-8"))
+            if len(blob) <= budget or not self.results:
+                return blob
+            if len(self.results) > 1:
+                self.results.pop(0)
+            elif "context" in self.results[0]:
+                self.results[0] = {k: v for k, v in self.results[0].items() if k != "context"}
+            else:
+                self.results.clear()
+
+
+class ConversationStore:
+    """Host-wide LRU + TTL store of session id -> Conversation (SQLite, WAL)."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        max_sessions: int = MAX_SESSIONS,
+        ttl: float = SESSION_TTL,
+        session_budget: int = SESSION_BUDGET,
+        max_results: int = MAX_RESULTS
+    ):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.session_budget = session_budget
+        self.max_results = max_results
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+        # Metrics (this process)
+        self.created = 0
+        self.resumed = 0
+        self.expired = 0
+        self.evicted = 0
+        self.anonymous = 0
+        self.errors = 0
+
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connect().executescript(_SCHEMA)
+        except Exception as e:
+            self._failed("open", e)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, counter: str, n: int = 1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def _failed(self, action: str, error: Exception):
+        self._count("errors")
+        logger.warning(f"Conversation store {action} failed: {error}")
+
+    def get(self, session_id: Optional[str]) -> Conversation:
+        """The session's conversation (new on first use); raises ValueError for a bad id."""
+        if not session_id:
+            self._count("anonymous")
+            return Conversation()
+        if len(session_id) > MAX_SESSION_ID:
+            raise ValueError(f"session_id is longer than {MAX_SESSION_ID} characters")
+        now = time.time()
+        try:
+            conn = self._connect()
+            self._sweep(conn, now)
+            row = conn.execute(
+                "SELECT last_seen, state FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is not None and now - row[0] < self.ttl:
+                self._count("resumed")
+                return Conversation(session_id, json.loads(zlib.decompress(row[1])))
+        except Exception as e:
+            self._failed("lookup", e)
+            return Conversation(session_id)
+        self._count("created")
+        return Conversation(session_id)
+
+    def record(self, conversation: Conversation, intent: str, result: Optional[Dict[str, Any]] = None):
+        """Remember a turn's intent and a compact summary of its result, then save the session."""
+        conversation.last_intent = intent
+        if result is not None:
+            conversation.results.append(summarize_result(result))
+            del conversation.results[:-self.max_results]
+        self.save(conversation)
+
+    def save(self, conversation: Conversation):
+        if conversation.session_id is None:
+            return
+        blob = conversation.pack(self.session_budget)
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, last_seen, size, state) VALUES (?, ?, ?, ?)",
+                (conversation.session_id, time.time(), len(blob), blob)
+            )
+            # Least recently used beyond the session cap
+            cursor = conn.execute(
+                "DELETE FROM sessions WHERE session_id IN "
+                "(SELECT session_id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,)
+            )
+            if cursor.rowcount > 0:
+                self._count("evicted", cursor.rowcount)
+        except Exception as e:
+            self._failed("write", e)
+
+    def drop(self, session_id: str) -> bool:
+        try:
+            cursor = self._connect().execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        except Exception as e:
+            self._failed("drop", e)
+            return False
+        return cursor.rowcount > 0
+
+    def _sweep(self, conn: sqlite3.Connection, now: float):
+        if now - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        cursor = conn.execute("DELETE FROM sessions WHERE last_seen < ?", (now - self.ttl,))
+        if cursor.rowcount > 0:
+            self._count("expired", cursor.rowcount)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            sessions, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sessions WHERE last_seen >= ?",
+                (time.time() - self.ttl,)
+            ).fetchone()
+        except Exception:
+            sessions = size = None
+        with self._lock:
+            return {
+                "path": self.path,
+                "sessions": sessions,
+                "bytes": size,
+                "max_sessions": self.max_sessions,
+                "ttl_s": self.ttl,
+                "session_budget_kb": self.session_budget // 1024,
+                "created": self.created,
+                "resumed": self.resumed,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "anonymous": self.anonymous,
+                "errors": self.errors
+            }
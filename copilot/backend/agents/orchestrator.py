@@ -8,10 +8,12 @@ The Orchestrator classifies user intent and routes to specialized agents:
 - Risk Predictor: ML predictions, EAC forecasts, vendor risk
 """
 
+import asyncio
 import re
 import logging
 from typing import Any, Dict, List, Optional
 
+from .conversation_store import ConversationStore
 from .portfolio_agent import PortfolioWatchdog
 from .scope_agent import ScopeAnalyst
 from .schedule_agent import ScheduleOptimizer
@@ -28,7 +30,7 @@ class AgentOrchestrator:
     1. Classify user intent from message
     2. Route to appropriate agent(s)
     3. Aggregate responses with sources
-    4. Maintain conversation context
+    4. Maintain per-session conversation context
     """
     
     def __init__(self, snowflake_service):
@@ -40,30 +42,32 @@ class AgentOrchestrator:
         self.schedule_agent = ScheduleOptimizer(snowflake_service)
         self.risk_agent = RiskPredictor(snowflake_service)
         
-        # Conversation context
-        self.context = {
-            "current_project": None,
-            "last_intent": None,
-            "last_results": None
-        }
+        # Conversation context, per session
+        self.conversations = ConversationStore()
         
         logger.info("AgentOrchestrator initialized with 4 specialized agents")
     
     async def process_message(
         self,
         message: str,
-        project_id: Optional[str] = None
+        project_id: Optional[str] = None,
+        session_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Process a user message and return appropriate response.
+        Context is kept per `session_id`; without one the message stands alone.
         """
+        # The store is SQLite shared by every worker; a busy database must
+        # not stall the event loop
+        loop = asyncio.get_running_loop()
+        
         # Update context
+        conversation = await loop.run_in_executor(None, self.conversations.get, session_id)
         if project_id:
-            self.context["current_project"] = project_id
+            conversation.current_project = project_id
         
         # Classify intent
         intent = self._classify_intent(message)
-        self.context["last_intent"] = intent
         
         logger.info(f"Classified intent: {intent}")
         
@@ -77,11 +81,12 @@ class AgentOrchestrator:
                 # ALL other queries go to Cortex Analyst
                 result = await self._handle_cortex_analyst(message)
             
-            self.context["last_results"] = result
+            await loop.run_in_executor(None, self.conversations.record, conversation, intent, result)
             return result
             
         except Exception as e:
             logger.error(f"Error processing message: {e}")
+            await loop.run_in_executor(None, self.conversations.record, conversation, intent)
             return {
                 "response": f"I encountered an error: {str(e)}. Please try rephrasing your question.",
                 "sources": [],
@@ -120,10 +125,10 @@ class AgentOrchestrator:
             "visualization": "portfolio_summary"
         }
     
-    async def _handle_scope(self, message: str) -> Dict[str, Any]:
+    async def _handle_scope(self, message: str, project_id: Optional[str] = None) -> Dict[str, Any]:
         """Handle change order analysis requests."""
         response = await self.scope_agent.analyze_change_orders(
-            project_id=self.context.get("current_project")
+            project_id=project_id
         )
         return {
             "response": response["narrative"],
@@ -145,10 +150,10 @@ class AgentOrchestrator:
             "alert_level": "high"
         }
     
-    async def _handle_schedule(self, message: str) -> Dict[str, Any]:
+    async def _handle_schedule(self, message: str, project_id: Optional[str] = None) -> Dict[str, Any]:
         """Handle schedule analysis requests."""
         response = await self.schedule_agent.analyze_schedule(
-            project_id=self.context.get("current_project")
+            project_id=project_id
         )
         return {
             "response": response["narrative"],
@@ -158,10 +163,10 @@ class AgentOrchestrator:
             "visualization": "schedule_risk"
         }
     
-    async def _handle_risk(self, message: str) -> Dict[str, Any]:
+    async def _handle_risk(self, message: str, project_id: Optional[str] = None) -> Dict[str, Any]:
         """Handle risk and ML prediction requests."""
         response = await self.risk_agent.get_risk_overview(
-            project_id=self.context.get("current_project")
+            project_id=project_id
         )
         return {
             "response": response["narrative"],
@@ -187,10 +192,10 @@ class AgentOrchestrator:
             "visualization": "vendor_scorecard"
         }
     
-    async def _handle_project_detail(self, message: str) -> Dict[str, Any]:
+    async def _handle_project_detail(self, message: str, project_id: Optional[str] = None) -> Dict[str, Any]:
         """Handle specific project detail requests."""
-        # Try to extract project ID from message
-        project_id = self._extract_project_id(message) or self.context.get("current_project")
+        # Try to extract project ID from message, else the conversation's project
+        project_id = self._extract_project_id(message) or project_id
         
         if project_id:
             response = await self.portfolio_agent.get_project_detail(project_id)
@@ -220,7 +225,7 @@ class AgentOrchestrator:
         
         # TIER 1: Try direct SQL with pattern matching (reliable)
         try:
-            result = self.sf.direct_sql_query(message)
+            result = await self.sf.direct_sql_query_async(message)
             
             if result.get("results") and len(result["results"]) > 0:
                 return self._format_query_response(
@@ -234,7 +239,7 @@ class AgentOrchestrator:
         
         # TIER 2: Try LLM text-to-SQL
         try:
-            result = self.sf.cortex_analyst(message)
+            result = await self.sf.cortex_analyst_async(message)
             
             if result.get("data") and len(result["data"]) > 0:
                 return self._format_query_response(
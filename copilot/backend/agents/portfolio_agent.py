@@ -4,6 +4,7 @@ ATLAS Capital Delivery - Portfolio Watchdog Agent
 Monitors portfolio health, KPIs, and project status.
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, Optional
 
@@ -26,8 +27,10 @@ class PortfolioWatchdog:
     
     async def get_portfolio_overview(self) -> Dict[str, Any]:
         """Get comprehensive portfolio overview."""
-        summary = self.sf.get_portfolio_summary()
-        projects = self.sf.get_projects()
+        summary, projects = await asyncio.gather(
+            self.sf.get_portfolio_summary_async(),
+            self.sf.get_projects_async()
+        )
         
         # Calculate alerts
         critical_projects = [p for p in projects if p.get("RISK_LEVEL") == "critical"]
@@ -74,7 +77,7 @@ class PortfolioWatchdog:
     
     async def get_project_detail(self, project_id: str) -> Dict[str, Any]:
         """Get detailed information for a specific project."""
-        project = self.sf.get_project_detail(project_id)
+        project = await self.sf.get_project_detail_async(project_id)
         
         if not project:
             return {
@@ -84,7 +87,7 @@ class PortfolioWatchdog:
             }
         
         # Get related change orders
-        change_orders = self.sf.get_change_orders(project_id=project_id, limit=10)
+        change_orders = await self.sf.get_change_orders_async(project_id=project_id, limit=10)
         co_total = sum(co.get("APPROVED_AMOUNT", 0) or 0 for co in change_orders if co.get("STATUS") == "APPROVED")
         
         budget = project.get("ORIGINAL_BUDGET", 0) or 0
@@ -134,7 +137,7 @@ class PortfolioWatchdog:
     
     async def check_alerts(self) -> Dict[str, Any]:
         """Check for portfolio alerts and warnings."""
-        projects = self.sf.get_projects()
+        projects = await self.sf.get_projects_async()
         
         alerts = []
         
@@ -4,6 +4,7 @@ ATLAS Capital Delivery - Risk Predictor Agent
 Provides ML-based predictions and risk analysis.
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, Optional
 
@@ -26,8 +27,10 @@ class RiskPredictor:
     
     async def get_risk_overview(self, project_id: Optional[str] = None) -> Dict[str, Any]:
         """Get comprehensive risk overview with ML predictions."""
-        projects = self.sf.get_projects()
-        at_risk_activities = self.sf.get_at_risk_activities(threshold=0.5)
+        projects, at_risk_activities = await asyncio.gather(
+            self.sf.get_projects_async(),
+            self.sf.get_at_risk_activities_async(threshold=0.5)
+        )
         
         if project_id:
             projects = [p for p in projects if p.get("PROJECT_ID") == project_id]
@@ -97,7 +100,7 @@ class RiskPredictor:
     
     async def get_eac_forecast(self, project_id: str) -> Dict[str, Any]:
         """Get detailed EAC forecast for a project with feature importance."""
-        project = self.sf.get_project_detail(project_id)
+        project = await self.sf.get_project_detail_async(project_id)
         
         if not project:
             return {
@@ -165,7 +168,7 @@ toward a **moderate cost overrun**, primarily driven by change order frequency.
     
     async def get_vendor_risk_summary(self) -> Dict[str, Any]:
         """Get vendor risk scores and analysis."""
-        vendors = self.sf.get_vendors()
+        vendors = await self.sf.get_vendors_async()
         
         # Group by risk tier
         by_tier = {"critical": [], "high": [], "medium": [], "low": []}
@@ -209,7 +212,7 @@ toward a **moderate cost overrun**, primarily driven by change order frequency.
     
     async def get_contingency_forecast(self, project_id: Optional[str] = None) -> Dict[str, Any]:
         """Forecast contingency depletion."""
-        projects = self.sf.get_projects()
+        projects = await self.sf.get_projects_async()
         
         if project_id:
             projects = [p for p in projects if p.get("PROJECT_ID") == project_id]
@@ -4,6 +4,7 @@ ATLAS Capital Delivery - Schedule Optimizer Agent
 Analyzes schedule risk, critical path, and predicts delays.
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, Optional
 
@@ -26,8 +27,10 @@ class ScheduleOptimizer:
     
     async def analyze_schedule(self, project_id: Optional[str] = None) -> Dict[str, Any]:
         """Analyze schedule health and risk."""
-        activities = self.sf.get_activities(project_id=project_id)
-        at_risk = self.sf.get_at_risk_activities(threshold=0.5)
+        activities, at_risk = await asyncio.gather(
+            self.sf.get_activities_async(project_id=project_id),
+            self.sf.get_at_risk_activities_async(threshold=0.5)
+        )
         
         # Summary stats
         total = len(activities)
@@ -96,7 +99,7 @@ class ScheduleOptimizer:
     
     async def get_critical_path(self, project_id: str) -> Dict[str, Any]:
         """Get critical path activities for a project."""
-        activities = self.sf.get_activities(project_id=project_id, critical_only=True)
+        activities = await self.sf.get_activities_async(project_id=project_id, critical_only=True)
         
         if not activities:
             return {
@@ -106,7 +109,8 @@ class ScheduleOptimizer:
             }
         
         # Sort by planned finish
-        activities.sort(key=lambda x: x.get("PLANNED_FINISH") or "9999-99-99")
+        # Sorted copy - service results are shared within the request
+        activities = sorted(activities, key=lambda x: x.get("PLANNED_FINISH") or "9999-99-99")
         
         # Calculate total critical path risk
         high_risk = [a for a in activities if (a.get("SLIP_PROBABILITY") or 0) > 0.5]
@@ -144,7 +148,7 @@ class ScheduleOptimizer:
     
     async def get_milestone_status(self, project_id: Optional[str] = None) -> Dict[str, Any]:
         """Get milestone status and predictions."""
-        activities = self.sf.get_activities(project_id=project_id)
+        activities = await self.sf.get_activities_async(project_id=project_id)
         
         # Filter to milestones (activities with 0 duration or type MILESTONE)
         milestones = [a for a in activities 
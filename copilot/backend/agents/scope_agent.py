@@ -4,6 +4,7 @@ ATLAS Capital Delivery - Scope Analyst Agent
 Analyzes change orders, detects patterns, and reveals the "Hidden Discovery".
 """
 
+import asyncio
 import logging
 from typing import Any, Dict, Optional
 
@@ -23,7 +24,7 @@ class ScopeAnalyst:
     
     async def analyze_change_orders(self, project_id: Optional[str] = None) -> Dict[str, Any]:
         """Analyze change orders for a project or the entire portfolio."""
-        change_orders = self.sf.get_change_orders(project_id=project_id, limit=200)
+        change_orders = await self.sf.get_change_orders_async(project_id=project_id, limit=200)
         
         # Calculate summary stats
         approved = [co for co in change_orders if co.get("STATUS") == "APPROVED"]
@@ -96,8 +97,10 @@ class ScopeAnalyst:
         root cause (missing grounding specs) and aggregate to significant impact.
         """
         # Get the grounding pattern specifically
-        grounding_data = self.sf.get_grounding_pattern()
-        scope_gaps = self.sf.get_scope_gap_analysis()
+        grounding_data, scope_gaps = await asyncio.gather(
+            self.sf.get_grounding_pattern_async(),
+            self.sf.get_scope_gap_analysis_async()
+        )
         
         if not grounding_data:
             return {
@@ -182,7 +185,7 @@ ATLAS has detected a **significant pattern** across your portfolio that requires
     
     async def analyze_vendor(self, vendor_id: str) -> Dict[str, Any]:
         """Analyze a specific vendor's change order history."""
-        change_orders = self.sf.get_change_orders(limit=500)
+        change_orders = await self.sf.get_change_orders_async(limit=500)
         
         # Filter to this vendor
         vendor_cos = [co for co in change_orders if co.get("VENDOR_ID") == vendor_id]
@@ -4,9 +4,9 @@ ATLAS Capital Delivery - FastAPI Main Application
 Agentic AI system for capital project delivery intelligence.
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import logging
@@ -14,6 +14,8 @@ import sys
 import os
 import json
 import asyncio
+import threading
+import time
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +31,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Lazy load services to handle SPCS environment
 _snowflake_service = None
 _orchestrator = None
+_orchestrator_lock = threading.Lock()  # warm-up thread and requests may race
 
 
 def get_sf():
@@ -44,25 +47,56 @@ def get_sf():
     return _snowflake_service()
 
 
+def built_sf():
+    """
+    The Snowflake service if it has been constructed, else None - never
+    builds it or waits on its lock (monitoring must not stall during warm-up).
+    """
+    from services import snowflake_service_spcs
+    return snowflake_service_spcs._snowflake_service
+
+
 def get_orchestrator():
     """Get Agent Orchestrator with lazy initialization."""
     global _orchestrator
     if _orchestrator is None:
-        try:
-            from agents.orchestrator import AgentOrchestrator
-            sf = get_sf()
-            _orchestrator = AgentOrchestrator(sf)
-        except Exception as e:
-            logger.error(f"Failed to init Orchestrator: {e}")
-            raise HTTPException(status_code=503, detail="Orchestrator not available")
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                try:
+                    from agents.orchestrator import AgentOrchestrator
+                    sf = get_sf()
+                    _orchestrator = AgentOrchestrator(sf)
+                except Exception as e:
+                    logger.error(f"Failed to init Orchestrator: {e}")
+                    raise HTTPException(status_code=503, detail="Orchestrator not available")
     return _orchestrator
 
 
+from services.serialization import RowSchema, as_float, as_int, as_str, dumps  # noqa: E402
+from services.fieldsets import parse_fields  # noqa: E402
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (stdlib json when it is not installed)."""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_json(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Return `content` without FastAPI's jsonable_encoder pass; headers already
+    set on the endpoint's `response` parameter (e.g. ETag) are carried over.
+    """
+    return FastJSONResponse(content, headers=dict(response.headers) if response is not None else None)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="ATLAS Capital Delivery API",
     description="Agentic AI system for capital project delivery intelligence",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware for React frontend
@@ -79,6 +113,56 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# One request-scoped loader per HTTP request: agents share identical service reads
+from services.request_loader import RequestLoaderMiddleware  # noqa: E402
+
+app.add_middleware(RequestLoaderMiddleware)
+
+# Per-lane concurrency budgets (interactive / llm / analytics); shed with 429 + Retry-After
+from services.admission import AdmissionController, AdmissionMiddleware  # noqa: E402
+
+admission = AdmissionController.from_env()
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+# =============================================================================
+# Startup Warm-up & Readiness
+# =============================================================================
+
+
+def _build_warmup():
+    """Warm-up sequence run in the background at container start (ATLAS_WARMUP=0 disables it)."""
+    from services.warmup import Warmup, WarmupStep
+    
+    if os.environ.get("ATLAS_WARMUP", "1") == "0":
+        return Warmup([])
+    return Warmup([
+        WarmupStep("snowflake_session", lambda: {"spcs": get_sf().is_spcs}),
+        WarmupStep("preload", lambda: get_sf().warm_up()),
+        WarmupStep("agents", lambda: type(get_orchestrator()).__name__, required=False)
+    ])
+
+
+warmup = _build_warmup()
+
+
+@app.on_event("startup")
+async def start_warmup():
+    """Build sessions and preload hot data without blocking startup."""
+    warmup.start()
+    if os.environ.get("ATLAS_BRIEF_SCHEDULER", "1") != "0":
+        brief_scheduler.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    warmup.cancel()
+    brief_scheduler.cancel()
+    broadcast_hub.close()
+    sf = built_sf()
+    if sf is not None:
+        sf.close()
+
+
 # =============================================================================
 # Pydantic Models
 # =============================================================================
@@ -87,6 +171,7 @@ app.add_middleware(
 class ChatMessage(BaseModel):
     message: str
     project_id: Optional[str] = None
+    session_id: Optional[str] = None  # keeps conversation context between messages
 
 
 class ChatResponse(BaseModel):
@@ -109,6 +194,101 @@ class SearchQuery(BaseModel):
     limit: int = 10
 
 
+class BatchItem(BaseModel):
+    id: str
+    path: str
+    params: Dict[str, Any] = {}
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+
+# =============================================================================
+# Response Row Schemas (warehouse column -> API field)
+# =============================================================================
+
+
+PORTFOLIO_SUMMARY_ROW = RowSchema([
+    ("total_projects", "TOTAL_PROJECTS", as_int),
+    ("total_budget", "TOTAL_BUDGET", as_float),
+    ("current_budget", "CURRENT_BUDGET", as_float),
+    ("total_contingency", "TOTAL_CONTINGENCY", as_float),
+    ("contingency_used", "CONTINGENCY_USED", as_float),
+    ("avg_cpi", "AVG_CPI", as_float),
+    ("avg_spi", "AVG_SPI", as_float),
+    ("projects_over_budget", "PROJECTS_OVER_BUDGET", as_int),
+    ("projects_behind_schedule", "PROJECTS_BEHIND_SCHEDULE", as_int)
+])
+
+BRIEF_PORTFOLIO_ROW = RowSchema([
+    field for field in PORTFOLIO_SUMMARY_ROW.fields
+    if field[0] in ("total_projects", "total_budget", "avg_cpi", "avg_spi",
+                    "projects_over_budget", "projects_behind_schedule")
+])
+
+CHANGE_ORDER_SEARCH_ROW = RowSchema([
+    ("co_id", "CO_ID"),
+    ("project_id", "PROJECT_ID"),
+    ("project_name", "PROJECT_NAME"),
+    ("vendor_id", "VENDOR_ID"),
+    ("vendor_name", "VENDOR_NAME"),
+    ("co_number", "CO_NUMBER"),
+    ("co_title", "CO_TITLE"),
+    ("reason_text", "REASON_TEXT"),
+    ("approved_amount", "APPROVED_AMOUNT", as_float),
+    ("ml_category", "ML_CATEGORY"),
+    ("approval_date", "APPROVAL_DATE", as_str)
+])
+
+
+# =============================================================================
+# Response helpers
+# =============================================================================
+
+
+def ndjson_response(batches) -> StreamingResponse:
+    """Stream row batches as NDJSON; a failure mid-stream ends with an {"error": ...} line."""
+    async def lines():
+        try:
+            async for batch in batches:
+                yield b"".join(dumps(row) + b"\n" for row in batch)
+        except Exception as e:
+            logger.error(f"NDJSON stream error: {e}")
+            yield dumps({"error": str(e)}) + b"\n"
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}  # Disable nginx buffering
+    )
+
+
+async def conditional_get(request: Request, response: Response, tables: List[str]) -> Optional[Response]:
+    """
+    Conditional GET keyed on the source tables' data versions. Sets ETag,
+    Last-Modified and Cache-Control on `response`, or returns a 304 to send
+    before any query runs. Without known versions the request proceeds as usual.
+    With validators set, the request's reads skip stale cache entries and
+    raise on warehouse errors, so the body always matches the versions its
+    ETag names and a failed read becomes a 500 without validators.
+    """
+    from services.conditional import data_validators
+    from services.result_cache import require_fresh
+    
+    sf = get_sf()
+    # The first version lookup may query INFORMATION_SCHEMA - keep it off the event loop
+    versions = await sf.executor.run(sf.table_versions.versions, tables, label="table_versions")
+    validators = data_validators(f"{request.url.path}?{request.url.query}", versions)
+    if validators is None:
+        return None
+    response.headers.update(validators.headers)
+    if validators.not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=validators.headers)
+    require_fresh()
+    return None
+
+
 # =============================================================================
 # Health & Info Endpoints
 # =============================================================================
@@ -120,6 +300,13 @@ async def health():
     return {"status": "healthy", "service": "atlas-capital-delivery"}
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once warm-up finished its required steps, else 503 with progress."""
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
 @app.get("/api/info")
 async def api_info():
     """API information."""
@@ -136,6 +323,66 @@ async def api_info():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: query telemetry histograms plus executor, pool and cache gauges."""
+    from services.telemetry import get_query_telemetry, render_gauges
+    
+    lines = [get_query_telemetry().render_prometheus()]
+    for lane, lane_stats in admission.stats().items():
+        lines += render_gauges(f"atlas_admission_{lane}", lane_stats)
+    sf = built_sf()
+    if sf is not None:
+        lines += render_gauges("atlas_executor", sf.executor.stats())
+        lines += render_gauges("atlas_streams", sf.stream_stats())
+        lines += render_gauges("atlas_pool", sf.pool.stats() if sf.pool else None)
+        lines += render_gauges("atlas_result_cache", sf.result_cache.stats())
+        lines += render_gauges("atlas_single_flight_queries", sf.flight.stats())
+        lines += render_gauges("atlas_single_flight_reads", sf.async_flight.stats())
+        lines += render_gauges("atlas_shared_cache", sf.result_cache.shared.stats() if sf.result_cache.shared else None)
+        lines += render_gauges("atlas_sql_cache", sf.sql_cache.stats())
+        lines += render_gauges("atlas_completion_cache", sf.completion_cache.stats() if sf.completion_cache else None)
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/diagnostics")
+async def diagnostics():
+    """
+    Query executor, connection pool, result cache and query telemetry metrics.
+    Service metrics are None until the Snowflake service has been built.
+    """
+    sf = built_sf()
+    conversations = _orchestrator.conversations if _orchestrator else None
+    report = {
+        "worker_pid": os.getpid(),
+        "service_built": sf is not None,
+        "admission": admission.stats(),
+        # SQLite shared by the workers - off the event loop
+        "conversations": (
+            await asyncio.get_running_loop().run_in_executor(None, conversations.stats) if conversations else None
+        ),
+        "warmup": warmup.status(),
+        "morning_brief": brief_scheduler.stats(),
+        "broadcast": broadcast_hub.stats()
+    }
+    if sf is None:
+        return report
+    report.update({
+        "executor": sf.executor.stats(),
+        "pool": sf.pool.stats() if sf.pool else None,
+        "result_cache": sf.result_cache.stats(),
+        "shared_cache": sf.result_cache.shared.stats() if sf.result_cache.shared else None,
+        "table_versions": sf.table_versions.stats(),
+        "single_flight": {"queries": sf.flight.stats(), "reads": sf.async_flight.stats()},
+        "streams": sf.stream_stats(),
+        "statements": sf.statements.stats(),
+        "sql_cache": sf.sql_cache.stats(),
+        "completion_cache": sf.completion_cache.stats() if sf.completion_cache else None,
+        "queries": sf.telemetry.stats()
+    })
+    return report
+
+
 # =============================================================================
 # Chat Endpoint - Main AI Interface
 # =============================================================================
@@ -155,7 +402,8 @@ async def chat(message: ChatMessage):
         orchestrator = get_orchestrator()
         result = await orchestrator.process_message(
             message=message.message,
-            project_id=message.project_id
+            project_id=message.project_id,
+            session_id=message.session_id
         )
         
         return ChatResponse(
@@ -166,6 +414,8 @@ async def chat(message: ChatMessage):
             visualization=result.get("visualization"),
             alert_level=result.get("alert_level")
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -193,7 +443,7 @@ async def chat_stream(message: ChatMessage):
             
             async for event in agent.run_agent(message.message):
                 # Format as SSE
-                yield f"data: {json.dumps(event)}\n\n"
+                yield f"data: {dumps(event).decode()}\n\n"
                 await asyncio.sleep(0.01)  # Small delay for smooth streaming
             
             yield "data: [DONE]\n\n"
@@ -225,7 +475,8 @@ async def chat_local(message: ChatMessage):
         orchestrator = get_orchestrator()
         result = await orchestrator.process_message(
             message=message.message,
-            project_id=message.project_id
+            project_id=message.project_id,
+            session_id=message.session_id
         )
         
         return ChatResponse(
@@ -236,6 +487,8 @@ async def chat_local(message: ChatMessage):
             visualization=result.get("visualization"),
             alert_level=result.get("alert_level")
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Local chat error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -251,32 +504,32 @@ async def get_portfolio_summary():
     """Get portfolio-level KPI summary."""
     try:
         sf = get_sf()
-        summary = sf.get_portfolio_summary()
+        summary = await sf.get_portfolio_summary_async()
         logger.info(f"Portfolio summary raw: {summary}")
         
         # Ensure proper type conversion for frontend
-        return {
-            "total_projects": int(summary.get("TOTAL_PROJECTS") or summary.get("total_projects") or 0),
-            "total_budget": float(summary.get("TOTAL_BUDGET") or summary.get("total_budget") or 0),
-            "current_budget": float(summary.get("CURRENT_BUDGET") or summary.get("current_budget") or 0),
-            "total_contingency": float(summary.get("TOTAL_CONTINGENCY") or summary.get("total_contingency") or 0),
-            "contingency_used": float(summary.get("CONTINGENCY_USED") or summary.get("contingency_used") or 0),
-            "avg_cpi": float(summary.get("AVG_CPI") or summary.get("avg_cpi") or 0),
-            "avg_spi": float(summary.get("AVG_SPI") or summary.get("avg_spi") or 0),
-            "projects_over_budget": int(summary.get("PROJECTS_OVER_BUDGET") or summary.get("projects_over_budget") or 0),
-            "projects_behind_schedule": int(summary.get("PROJECTS_BEHIND_SCHEDULE") or summary.get("projects_behind_schedule") or 0)
-        }
+        return fast_json(PORTFOLIO_SUMMARY_ROW.apply_one(summary))
     except Exception as e:
         logger.error(f"Portfolio summary error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/projects")
-async def get_projects():
-    """Get all projects with health indicators."""
+async def get_projects(request: Request, response: Response, fields: Optional[str] = None):
+    """
+    Get all projects with health indicators.
+    
+    fields=PROJECT_ID,PROJECT_NAME,... selects columns (default: the standard list).
+    """
     try:
         sf = get_sf()
-        return sf.get_projects()
+        columns = parse_fields(fields)
+        not_modified = await conditional_get(request, response, [f"{sf.schema}.PROJECT"])
+        if not_modified:
+            return not_modified
+        return fast_json(await sf.get_projects_async(fields=columns), response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Get projects error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -285,48 +538,51 @@ async def get_projects():
 # IMPORTANT: This route MUST come before /api/projects/{project_id}
 # to avoid "map" being interpreted as a project_id
 @app.get("/api/projects/map")
-async def get_projects_for_map():
-    """Get project data optimized for map visualization."""
+async def get_projects_for_map(
+    request: Request,
+    response: Response,
+    bbox: Optional[str] = None,
+    zoom: Optional[int] = None
+):
+    """
+    Project data optimized for map visualization (CAPITAL_PROJECTS.MAP_DATA).
+    
+    Without parameters: every project with coordinates.
+    With bbox=west,south,east,north and/or zoom: the viewport only - individual
+    projects when few are visible, otherwise grid clusters with count, budget
+    sum and worst risk level.
+    """
+    from services.geo_index import parse_bbox, validate_zoom
+    
     try:
         sf = get_sf()
-        projects = sf.get_projects()
-        logger.info(f"Map endpoint: got {len(projects)} projects")
-        # Return only map-relevant fields
-        result = [
-            {
-                "id": p.get("PROJECT_ID"),
-                "name": p.get("PROJECT_NAME"),
-                "type": p.get("PROJECT_TYPE"),
-                "city": p.get("CITY"),
-                "state": p.get("STATE"),
-                "lat": float(p.get("LATITUDE") or 0),
-                "lng": float(p.get("LONGITUDE") or 0),
-                "budget": float(p.get("ORIGINAL_BUDGET") or 0),
-                "cpi": float(p.get("CPI") or 0),
-                "spi": float(p.get("SPI") or 0),
-                "riskLevel": p.get("RISK_LEVEL") or "low"
-            }
-            for p in projects
-            if p.get("LATITUDE") and p.get("LONGITUDE")
-        ]
-        logger.info(f"Map endpoint: returning {len(result)} projects with coordinates")
-        return result
+        not_modified = await conditional_get(request, response, [f"{sf.schema}.PROJECT"])
+        if not_modified:
+            return not_modified
+        index = await sf.get_map_index_async()
+        if bbox is None and zoom is None:
+            return fast_json(index.items, response)
+        return fast_json(index.query(parse_bbox(bbox), validate_zoom(zoom)), response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Map data error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/projects/{project_id}")
-async def get_project(project_id: str):
-    """Get detailed project information."""
+async def get_project(project_id: str, fields: Optional[str] = None):
+    """Get detailed project information (fields= selects columns, default all)."""
     try:
         sf = get_sf()
-        project = sf.get_project_detail(project_id)
+        project = await sf.get_project_detail_async(project_id, fields=parse_fields(fields))
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
         return project
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Get project error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -338,22 +594,67 @@ async def get_project(project_id: str):
 
 
 @app.get("/api/change-orders")
-async def get_change_orders(project_id: Optional[str] = None, limit: int = 100):
-    """Get change orders with optional project filter."""
+async def get_change_orders(project_id: Optional[str] = None, limit: int = 100, fields: Optional[str] = None):
+    """
+    Get change orders with optional project filter.
+    
+    fields=CO_ID,APPROVED_AMOUNT,... selects columns, e.g. to leave out REASON_TEXT.
+    """
     try:
         sf = get_sf()
-        return sf.get_change_orders(project_id=project_id, limit=limit)
+        return fast_json(await sf.get_change_orders_async(
+            project_id=project_id, limit=limit, fields=parse_fields(fields)
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Get COs error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/change-orders/page")
+async def get_change_orders_page(
+    project_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    format: str = "json",
+    fields: Optional[str] = None
+):
+    """
+    Keyset-paginated change orders (APPROVED_AMOUNT desc, CO_ID).
+    
+    format=json returns one page: {"items", "count", "next_cursor"}.
+    format=ndjson streams every change order after `cursor`, one per line.
+    fields= selects columns (CO_ID and APPROVED_AMOUNT are always included).
+    """
+    try:
+        sf = get_sf()
+        columns = parse_fields(fields)
+        if format == "ndjson":
+            return ndjson_response(sf.iter_change_orders_async(project_id=project_id, cursor=cursor, fields=columns))
+        if format != "json":
+            raise ValueError("format must be 'json' or 'ndjson'")
+        return fast_json(await sf.get_change_orders_page_async(
+            project_id=project_id, cursor=cursor, limit=limit, fields=columns
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"CO page error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/change-orders/scope-gaps")
-async def get_scope_gap_analysis():
+async def get_scope_gap_analysis(request: Request, response: Response):
     """Get scope gap pattern analysis."""
     try:
         sf = get_sf()
-        return sf.get_scope_gap_analysis()
+        not_modified = await conditional_get(
+            request, response, [f"{sf.schema}.PROJECT", f"{sf.schema}.CHANGE_ORDER"]
+        )
+        if not_modified:
+            return not_modified
+        return fast_json(await sf.get_scope_gap_analysis_async(), response)
     except Exception as e:
         logger.error(f"Scope gap error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -364,7 +665,7 @@ async def get_hidden_pattern():
     """Get the 'Hidden Discovery' - grounding pattern analysis."""
     try:
         sf = get_sf()
-        return sf.get_grounding_pattern()
+        return await sf.get_grounding_pattern_async()
     except Exception as e:
         logger.error(f"Hidden pattern error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -375,27 +676,13 @@ async def search_change_orders(query: SearchQuery):
     """Semantic search on change order narratives."""
     try:
         sf = get_sf()
-        results = sf.search_change_orders(query.query, query.limit)
+        results = await sf.search_change_orders_async(query.query, query.limit)
         
         # Normalize column names to lowercase for frontend
-        normalized = []
-        for r in results:
-            normalized.append({
-                "co_id": r.get("CO_ID") or r.get("co_id"),
-                "project_id": r.get("PROJECT_ID") or r.get("project_id"),
-                "project_name": r.get("PROJECT_NAME") or r.get("project_name"),
-                "vendor_id": r.get("VENDOR_ID") or r.get("vendor_id"),
-                "vendor_name": r.get("VENDOR_NAME") or r.get("vendor_name"),
-                "co_number": r.get("CO_NUMBER") or r.get("co_number"),
-                "co_title": r.get("CO_TITLE") or r.get("co_title"),
-                "reason_text": r.get("REASON_TEXT") or r.get("reason_text"),
-                "approved_amount": float(r.get("APPROVED_AMOUNT") or r.get("approved_amount") or 0),
-                "ml_category": r.get("ML_CATEGORY") or r.get("ml_category"),
-                "approval_date": str(r.get("APPROVAL_DATE") or r.get("approval_date") or "")
-            })
+        normalized = CHANGE_ORDER_SEARCH_ROW.apply(results)
         
         logger.info(f"Search returned {len(normalized)} results for query: {query.query[:30]}")
-        return normalized
+        return fast_json(normalized)
     except Exception as e:
         logger.error(f"CO search error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -407,11 +694,14 @@ async def search_change_orders(query: SearchQuery):
 
 
 @app.get("/api/vendors")
-async def get_vendors():
+async def get_vendors(request: Request, response: Response):
     """Get all vendors with risk scores."""
     try:
         sf = get_sf()
-        return sf.get_vendors()
+        not_modified = await conditional_get(request, response, [f"{sf.schema}.VENDOR"])
+        if not_modified:
+            return not_modified
+        return fast_json(await sf.get_vendors_async(), response)
     except Exception as e:
         logger.error(f"Get vendors error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -423,10 +713,13 @@ async def get_vendors():
 
 
 @app.get("/api/ml/classification-summary")
-async def get_ml_classification_summary():
+async def get_ml_classification_summary(request: Request, response: Response):
     """Get ML classification summary for change orders."""
     try:
         sf = get_sf()
+        not_modified = await conditional_get(request, response, ["ATOMIC.CHANGE_ORDER"])
+        if not_modified:
+            return not_modified
         sql = f"""
         SELECT 
             ML_CATEGORY,
@@ -439,7 +732,7 @@ async def get_ml_classification_summary():
         GROUP BY ML_CATEGORY
         ORDER BY total_amount DESC
         """
-        results = sf.execute_query(sql)
+        results = await sf.execute_query_async(sql)
         
         # Normalize to lowercase
         return [{
@@ -460,28 +753,10 @@ async def get_ml_hidden_pattern():
     try:
         sf = get_sf()
         
-        # Get grounding pattern COs with ML classifications
-        sql = f"""
-        SELECT 
-            co.CO_ID,
-            co.PROJECT_ID,
-            p.PROJECT_NAME,
-            co.VENDOR_ID,
-            v.VENDOR_NAME,
-            co.REASON_TEXT,
-            co.APPROVED_AMOUNT,
-            co.ML_CATEGORY,
-            co.ML_CONFIDENCE,
-            co.ML_SCOPE_GAP_PROB
-        FROM {sf.database}.ATOMIC.CHANGE_ORDER co
-        JOIN {sf.database}.ATOMIC.PROJECT p ON co.PROJECT_ID = p.PROJECT_ID
-        LEFT JOIN {sf.database}.ATOMIC.VENDOR v ON co.VENDOR_ID = v.VENDOR_ID
-        WHERE LOWER(co.REASON_TEXT) LIKE '%ground%'
-          AND co.STATUS = 'APPROVED'
-        ORDER BY co.ML_CONFIDENCE DESC
-        LIMIT 50
-        """
-        cos = sf.execute_query(sql)
+        # Grounding pattern COs with ML classifications: the same scan as
+        # /api/change-orders/hidden-pattern, top 50 by ML confidence
+        grounding = await sf.get_grounding_change_orders_async()
+        cos = sorted(grounding, key=lambda r: r.get("ML_CONFIDENCE") or 0, reverse=True)[:50]
         
         # Summary stats
         total_cos = len(cos)
@@ -531,22 +806,61 @@ async def get_ml_hidden_pattern():
 
 
 @app.get("/api/activities")
-async def get_activities(project_id: Optional[str] = None, critical_only: bool = False):
-    """Get schedule activities."""
+async def get_activities(project_id: Optional[str] = None, critical_only: bool = False, fields: Optional[str] = None):
+    """Get schedule activities (fields= selects columns)."""
     try:
         sf = get_sf()
-        return sf.get_activities(project_id=project_id, critical_only=critical_only)
+        return fast_json(await sf.get_activities_async(
+            project_id=project_id, critical_only=critical_only, fields=parse_fields(fields)
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Get activities error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/activities/page")
+async def get_activities_page(
+    project_id: Optional[str] = None,
+    critical_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    format: str = "json",
+    fields: Optional[str] = None
+):
+    """
+    Keyset-paginated schedule activities (SLIP_PROBABILITY desc, ACTIVITY_ID).
+    
+    format=json returns one page: {"items", "count", "next_cursor"}.
+    format=ndjson streams every activity after `cursor`, one per line.
+    fields= selects columns (ACTIVITY_ID and SLIP_PROBABILITY are always included).
+    """
+    try:
+        sf = get_sf()
+        columns = parse_fields(fields)
+        if format == "ndjson":
+            return ndjson_response(sf.iter_activities_async(
+                project_id=project_id, critical_only=critical_only, cursor=cursor, fields=columns
+            ))
+        if format != "json":
+            raise ValueError("format must be 'json' or 'ndjson'")
+        return fast_json(await sf.get_activities_page_async(
+            project_id=project_id, critical_only=critical_only, cursor=cursor, limit=limit, fields=columns
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Activities page error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/activities/at-risk")
 async def get_at_risk_activities(threshold: float = 0.5):
     """Get activities at risk of schedule slip."""
     try:
         sf = get_sf()
-        return sf.get_at_risk_activities(threshold=threshold)
+        return fast_json(await sf.get_at_risk_activities_async(threshold=threshold))
     except Exception as e:
         logger.error(f"At risk activities error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -558,11 +872,29 @@ async def get_at_risk_activities(threshold: float = 0.5):
 
 
 @app.get("/api/trends/monthly")
-async def get_monthly_trend(project_id: Optional[str] = None):
-    """Get monthly snapshot data for S-curves."""
+async def get_monthly_trend(
+    request: Request,
+    response: Response,
+    project_id: Optional[str] = None,
+    max_points: Optional[int] = None
+):
+    """
+    EVM series for S-curves (CAPITAL_PROJECTS.MONTHLY_TREND), columnar:
+    {"dates", "pv", "ev", "ac", "cpi", "spi", "points", "total_points", "downsampled"}.
+    
+    Without project_id: portfolio totals. max_points downsamples long
+    histories (LTTB), e.g. max_points=300 for a chart.
+    """
     try:
         sf = get_sf()
-        return sf.get_monthly_trend(project_id=project_id)
+        not_modified = await conditional_get(
+            request, response, [f"{sf.schema}.MONTHLY_SNAPSHOT", f"{sf.schema}.PROJECT"]
+        )
+        if not_modified:
+            return not_modified
+        return fast_json(await sf.get_monthly_trend_async(project_id=project_id, max_points=max_points), response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Monthly trend error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -573,37 +905,38 @@ async def get_monthly_trend(project_id: Optional[str] = None):
 # =============================================================================
 
 
-@app.get("/api/morning-brief")
-async def get_morning_brief():
-    """Generate AI-powered morning brief for the portfolio."""
+async def build_morning_brief() -> Dict[str, Any]:
+    """
+    Assemble the morning brief from the agents (used by the snapshot scheduler).
+    Reads are fresh and raise on warehouse errors, so a brief is never built
+    from an error's empty result and stored under the current data version -
+    the build fails and the last good snapshot stays in place.
+    """
+    from services.request_loader import request_scope
+    from services.result_cache import fresh_reads
+    from services.telemetry import get_query_telemetry
+    
+    started = time.monotonic()
+    status = "ok"
+    loader = None
     try:
         orchestrator = get_orchestrator()
         
-        # Get portfolio overview
-        portfolio_result = await orchestrator.portfolio_agent.get_portfolio_overview()
-        
-        # Check for alerts
-        alerts = await orchestrator.portfolio_agent.check_alerts()
-        
-        # Get hidden patterns if any
-        hidden = await orchestrator.scope_agent.find_hidden_patterns()
-        
-        # Get at-risk activities
-        schedule_result = await orchestrator.schedule_agent.analyze_schedule()
+        # The agents' reads run concurrently; the request loader issues each
+        # distinct dataset once (get_projects is shared by overview and alerts)
+        with request_scope() as loader, fresh_reads():
+            portfolio_result, alerts, hidden, schedule_result = await asyncio.gather(
+                orchestrator.portfolio_agent.get_portfolio_overview(),
+                orchestrator.portfolio_agent.check_alerts(),
+                orchestrator.scope_agent.find_hidden_patterns(),
+                orchestrator.schedule_agent.analyze_schedule()
+            )
         
         # Normalize portfolio data (Snowflake returns UPPERCASE, frontend expects lowercase)
-        raw_summary = portfolio_result.get("data", {}).get("summary", {})
-        portfolio = {
-            "total_projects": int(raw_summary.get("TOTAL_PROJECTS") or raw_summary.get("total_projects") or 0),
-            "total_budget": float(raw_summary.get("TOTAL_BUDGET") or raw_summary.get("total_budget") or 0),
-            "avg_cpi": float(raw_summary.get("AVG_CPI") or raw_summary.get("avg_cpi") or 0),
-            "avg_spi": float(raw_summary.get("AVG_SPI") or raw_summary.get("avg_spi") or 0),
-            "projects_over_budget": int(raw_summary.get("PROJECTS_OVER_BUDGET") or raw_summary.get("projects_over_budget") or 0),
-            "projects_behind_schedule": int(raw_summary.get("PROJECTS_BEHIND_SCHEDULE") or raw_summary.get("projects_behind_schedule") or 0)
-        }
+        portfolio = BRIEF_PORTFOLIO_ROW.apply_one(portfolio_result.get("data", {}).get("summary", {}))
         
+        # "date", "data_version" and "generated_at" are added by the snapshot
         return {
-            "date": "2024-01-15",  # Would be dynamic
             "portfolio": portfolio,
             "alerts": alerts.get("alerts", [])[:5],
             "critical_alert_count": alerts.get("critical_count", 0),
@@ -611,9 +944,112 @@ async def get_morning_brief():
             "schedule_risk_count": schedule_result.get("data", {}).get("high_risk_count", 0),
             "narrative": portfolio_result.get("narrative", "")
         }
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        if loader is not None:
+            get_query_telemetry().record_request("morning_brief", time.monotonic() - started, loader.stats(), status)
+
+
+def _build_brief_scheduler():
+    """Snapshot scheduler for the morning brief (ATLAS_BRIEF_SCHEDULER=0: build on demand only)."""
+    from services.brief_snapshots import BRIEF_TABLES, BriefScheduler
+    
+    return BriefScheduler(
+        build_morning_brief,
+        lambda: get_sf().table_versions.last_altered(BRIEF_TABLES)
+    )
+
+
+brief_scheduler = _build_brief_scheduler()
+
+
+def _snapshot_response(request: Request, snapshot, cache_control: str) -> Response:
+    from services.conditional import etag_matches
+    
+    headers = {"ETag": snapshot.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/morning-brief")
+async def get_morning_brief(request: Request):
+    """Today's morning brief, served from the stored snapshot (ETag / 304)."""
+    try:
+        snapshot = await brief_scheduler.current()
     except Exception as e:
         logger.error(f"Morning brief error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    # Rebuilt whenever the data changes - clients revalidate every time
+    return _snapshot_response(request, snapshot, "no-cache")
+
+
+@app.post("/api/morning-brief/refresh")
+async def refresh_morning_brief():
+    """Rebuild today's brief now (call after a data load)."""
+    try:
+        get_sf().table_versions.invalidate()
+        snapshot = await brief_scheduler.refresh(force=True)
+        return snapshot.info()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Morning brief refresh error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/morning-brief/{brief_date}")
+async def get_morning_brief_for_date(brief_date: str, request: Request):
+    """A previous day's brief (YYYY-MM-DD), if it is still retained."""
+    from services.brief_snapshots import brief_today, parse_brief_date
+    
+    try:
+        brief_date = parse_brief_date(brief_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="brief_date must be YYYY-MM-DD")
+    if brief_date == brief_today():
+        return await get_morning_brief(request)
+    snapshot = brief_scheduler.store.get(brief_date)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"No morning brief stored for {brief_date}")
+    # Past briefs are final
+    return _snapshot_response(request, snapshot, "private, max-age=86400")
+
+
+# =============================================================================
+# Batch Endpoint
+# =============================================================================
+
+
+@app.post("/api/batch")
+async def batch(request: Request, body: BatchRequest):
+    """
+    Resolve several GET routes in one round trip.
+    
+    Body: {"requests": [{"id": "pattern", "path": "/api/change-orders/hidden-pattern", "params": {}}]}
+    Returns {"ok": n, "failed": n, "results": {id: {"status", "ok", "body" | "error"}}}.
+    Sub-requests run concurrently and share one request loader, so each
+    distinct service read is issued once; a failed sub-request does not fail
+    the batch.
+    """
+    from services.batch import parse_batch, run_batch
+    from services.request_loader import request_scope
+    from services.telemetry import get_query_telemetry
+    
+    try:
+        subs = parse_batch([(item.id, item.path, item.params) for item in body.requests])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    started = time.monotonic()
+    with request_scope() as loader:
+        document, counts = await run_batch(request.app, request.scope, subs)
+    get_query_telemetry().record_request(
+        "batch", time.monotonic() - started, loader.stats(), "ok" if not counts["failed"] else "partial"
+    )
+    return Response(content=document, media_type="application/json")
 
 
 # =============================================================================
@@ -621,27 +1057,98 @@ async def get_morning_brief():
 # =============================================================================
 
 
+def _build_broadcast_hub():
+    """
+    Live topics for /ws/portfolio:
+      portfolio         - portfolio summary
+      projects          - KPI rows of every project, keyed by PROJECT_ID
+      project:<id>      - one project's KPI row
+      alerts            - portfolio alerts, keyed by project and alert type
+    """
+    from services.broadcast import BroadcastHub, keyed
+    from services.request_loader import request_scope
+    from services.result_cache import fresh_reads
+    
+    hub = BroadcastHub()
+    
+    # Reads raise on warehouse errors: a failed poll publishes nothing, while
+    # an empty value (the last alert cleared) is published like any other
+    async def fetch_portfolio(topics):
+        with fresh_reads():
+            return {"portfolio": await get_sf().get_portfolio_summary_async()}
+    
+    async def fetch_projects(topics):
+        # projects, project:<id> and alerts all derive from one get_projects read
+        with request_scope(), fresh_reads():
+            projects = await get_sf().get_projects_async()
+            alerts = await get_orchestrator().portfolio_agent.check_alerts() if "alerts" in topics else None
+        by_id = keyed(projects, lambda p: p.get("PROJECT_ID"))
+        values = {"projects": by_id}
+        for topic in topics:
+            if topic.startswith("project:"):
+                values[topic] = by_id.get(topic.split(":", 1)[1])
+        if alerts is not None:
+            values["alerts"] = keyed(alerts.get("alerts", []), lambda a: f"{a.get('project')}:{a.get('type')}")
+        return values
+    
+    hub.add_source("portfolio", fetch_portfolio)
+    hub.add_source("projects", fetch_projects, topics=["projects", "project", "alerts"])
+    return hub
+
+
+broadcast_hub = _build_broadcast_hub()
+
+
+async def _ws_sender(websocket: WebSocket, subscriber):
+    try:
+        while True:
+            await websocket.send_text(await subscriber.next_message())
+    except Exception as e:
+        # Closed socket - the receive loop sees the disconnect and cleans up
+        logger.debug(f"WebSocket send stopped: {e}")
+
+
 @app.websocket("/ws/portfolio")
 async def websocket_portfolio(websocket: WebSocket):
-    """WebSocket for real-time portfolio updates."""
-    await websocket.accept()
+    """
+    WebSocket for real-time portfolio updates (subscribed to "portfolio" on connect).
     
+    Client messages:
+      {"action": "subscribe", "topics": ["project:P-001", "alerts"]}
+      {"action": "unsubscribe", "topics": ["portfolio"]}
+      {"action": "refresh"}  (or any other text) - resend snapshots
+    Server messages: {"type": "snapshot" | "diff", "topic", "seq", ...}
+    """
+    await websocket.accept()
+    subscriber = broadcast_hub.connect()
+    sender = asyncio.create_task(_ws_sender(websocket, subscriber))
     try:
+        broadcast_hub.subscribe(subscriber, ["portfolio"])
         while True:
-            # Wait for any message (can be used for subscribe/unsubscribe)
             data = await websocket.receive_text()
-            
-            # Send portfolio update
-            sf = get_sf()
-            summary = sf.get_portfolio_summary()
-            await websocket.send_json({
-                "type": "portfolio_update",
-                "data": summary
-            })
+            try:
+                message = json.loads(data)
+            except ValueError:
+                message = None
+            action = message.get("action") if isinstance(message, dict) else "refresh"
+            topics = message.get("topics", []) if isinstance(message, dict) else []
+            if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+                subscriber.offer(json.dumps({"type": "error", "detail": "topics must be a list of strings"}))
+            elif action == "subscribe":
+                rejected = broadcast_hub.subscribe(subscriber, topics)
+                subscriber.offer(json.dumps({"type": "subscribed", "topics": sorted(subscriber.topics), "rejected": rejected}))
+            elif action == "unsubscribe":
+                broadcast_hub.unsubscribe(subscriber, topics)
+                subscriber.offer(json.dumps({"type": "subscribed", "topics": sorted(subscriber.topics), "rejected": []}))
+            else:
+                broadcast_hub.refresh(subscriber)
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
+        sender.cancel()
+        broadcast_hub.disconnect(subscriber)
 
 
 # =============================================================================
@@ -0,0 +1,96 @@
+"""
+ATLAS Capital Delivery - Bind Parameter Benchmark
+
+Compares repeated project drill-downs issued as f-string SQL (a new statement
+text per project) against the registered statement with a `?` bind (one text
+for every project). Reports client latency and the server-side compilation
+time summed from QUERY_HISTORY_BY_SESSION.
+
+Requires a working named connection (default: "demo").
+
+Usage (from copilot/backend):
+    python benchmarks/bench_bind_params.py --connection demo --iterations 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import snowflake.connector  # noqa: E402
+
+DATABASE = "CAPITAL_PROJECTS_DB"
+SCHEMA = "ATOMIC"
+
+
+def _run(cursor, project_ids, build):
+    timings, query_ids = [], []
+    for project_id in project_ids:
+        sql, params = build(project_id)
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+        query_ids.append(cursor.sfqid)
+    return timings, query_ids
+
+
+def _compilation_ms(cursor, query_ids):
+    cursor.execute(
+        "SELECT QUERY_ID, COMPILATION_TIME FROM TABLE("
+        "INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => 1000))"
+    )
+    wanted = set(query_ids)
+    return sum(row[1] or 0 for row in cursor.fetchall() if row[0] in wanted)
+
+
+def _report(label: str, timings, compile_ms):
+    print(f"{label:<10} mean={statistics.mean(timings):8.1f} ms  "
+          f"p50={statistics.median(timings):8.1f} ms  compile total={compile_ms:8.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bound vs inlined parameter benchmark")
+    parser.add_argument("--connection", default="demo", help="Named Snowflake connection")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--result-cache", action="store_true",
+                        help="Leave USE_CACHED_RESULT on (off by default to expose compilation)")
+    args = parser.parse_args()
+
+    conn = snowflake.connector.connect(
+        connection_name=args.connection, database=DATABASE, schema=SCHEMA, paramstyle="qmark"
+    )
+    cursor = conn.cursor()
+    if not args.result_cache:
+        cursor.execute("ALTER SESSION SET USE_CACHED_RESULT = FALSE")
+
+    cursor.execute(f"SELECT PROJECT_ID FROM {DATABASE}.{SCHEMA}.PROJECT ORDER BY PROJECT_ID")
+    projects = [row[0] for row in cursor.fetchall()]
+    if not projects:
+        print("No projects found - nothing to benchmark")
+        return 1
+    project_ids = [projects[i % len(projects)] for i in range(args.iterations)]
+
+    def inlined(project_id):
+        return f"SELECT * FROM {DATABASE}.{SCHEMA}.PROJECT WHERE PROJECT_ID = '{project_id}'", None
+
+    def bound(project_id):
+        return f"SELECT * FROM {DATABASE}.{SCHEMA}.PROJECT WHERE PROJECT_ID = ?", [project_id]
+
+    print(f"{len(projects)} projects, {args.iterations} drill-downs each way")
+    inlined_times, inlined_ids = _run(cursor, project_ids, inlined)
+    bound_times, bound_ids = _run(cursor, project_ids, bound)
+
+    _report("f-string", inlined_times, _compilation_ms(cursor, inlined_ids))
+    _report("bound", bound_times, _compilation_ms(cursor, bound_ids))
+
+    cursor.close()
+    conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
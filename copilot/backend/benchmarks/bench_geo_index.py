@@ -0,0 +1,74 @@
+"""
+ATLAS Capital Delivery - Map Index Benchmark
+
+Measures GeoIndex build time and viewport query latency / payload size for a
+synthetic utility portfolio spread across the continental US, from a whole
+country view down to street level.
+
+Usage (from copilot/backend):
+    python benchmarks/bench_geo_index.py --sites 3000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.geo_index import GeoIndex  # noqa: E402
+from services.serialization import dumps  # noqa: E402
+
+RISKS = ("low", "low", "medium", "high", "critical")
+
+# (label, zoom, viewport width in degrees of longitude)
+VIEWS = [("country", 4, 60.0), ("region", 6, 15.0), ("metro", 9, 2.0), ("city", 12, 0.25), ("street", 15, 0.03)]
+
+
+def _synthetic_sites(sites: int):
+    rng = random.Random(7)
+    # Clustered around a few dozen metros, like a real utility footprint
+    metros = [(rng.uniform(26, 48), rng.uniform(-123, -71)) for _ in range(40)]
+    items = []
+    for i in range(sites):
+        lat, lng = rng.choice(metros)
+        items.append({
+            "id": f"SITE-{i:05d}", "name": f"Site {i}",
+            "lat": lat + rng.gauss(0, 0.4), "lng": lng + rng.gauss(0, 0.4),
+            "budget": rng.uniform(1e6, 5e8), "riskLevel": rng.choice(RISKS)
+        })
+    return items, metros
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map index benchmark")
+    parser.add_argument("--sites", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    items, metros = _synthetic_sites(args.sites)
+    start = time.perf_counter()
+    index = GeoIndex(items)
+    print(f"{len(index):,} sites, index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(11)
+    for label, zoom, width in VIEWS:
+        timings, sizes, modes = [], [], set()
+        for _ in range(args.queries):
+            lat, lng = rng.choice(metros)
+            bbox = (lng - width / 2, lat - width / 4, lng + width / 2, lat + width / 4)
+            start = time.perf_counter()
+            body = dumps(index.query(bbox, zoom))
+            timings.append((time.perf_counter() - start) * 1000)
+            sizes.append(len(body))
+            modes.add("clusters" if b'"mode":"clusters"' in body else "projects")
+        timings.sort()
+        print(f"{label:<8} z{zoom:<3} p50={statistics.median(timings):6.2f} ms  "
+              f"p99={timings[int(len(timings) * 0.99) - 1]:6.2f} ms  "
+              f"payload p50={statistics.median(sizes) / 1024:7.1f} KB  ({'/'.join(sorted(modes))})")
+
+
+if __name__ == "__main__":
+    main()
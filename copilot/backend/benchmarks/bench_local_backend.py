@@ -0,0 +1,70 @@
+"""
+ATLAS Capital Delivery - Local Backend Benchmark
+
+Compares per-query overhead of the persistent local connector pool against
+spawning one `snow sql` process per query (the previous local path).
+
+Requires a working named connection (default: "demo").
+
+Usage (from copilot/backend):
+    python benchmarks/bench_local_backend.py --connection demo --iterations 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.snowflake_service_spcs import SnowflakeServiceSPCS  # noqa: E402
+
+
+def _time_calls(fn, query: str, iterations: int):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings):
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"{label:<22} mean={statistics.mean(timings):8.1f} ms  "
+          f"p50={statistics.median(timings):8.1f} ms  p95={p95:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local query backend overhead benchmark")
+    parser.add_argument("--connection", default="demo", help="Named Snowflake connection")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--query", default="SELECT 1 AS ONE")
+    parser.add_argument("--skip-cli", action="store_true", help="Only measure the pooled backend")
+    args = parser.parse_args()
+
+    svc = SnowflakeServiceSPCS(connection_name=args.connection)
+    if svc.pool is None:
+        print(f"Connector pool unavailable for connection '{args.connection}' - nothing to compare")
+        return 1
+
+    # Warm the pool so the first measurement is not connection setup
+    svc._execute_query_pooled(args.query)
+
+    print(f"Query: {args.query!r}  iterations={args.iterations}")
+    pooled = _time_calls(svc._execute_query_pooled, args.query, args.iterations)
+    _report("persistent connector", pooled)
+
+    if not args.skip_cli:
+        cli = _time_calls(svc._execute_query_cli, args.query, args.iterations)
+        _report("snow CLI subprocess", cli)
+        print(f"Per-query overhead saved: {statistics.mean(cli) - statistics.mean(pooled):.1f} ms")
+
+    svc.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+ATLAS Capital Delivery - Result Decoding Benchmark
+
+Measures rows/sec for fetching an executed cursor's result and decoding it
+into API-ready data:
+- legacy:  fetchall() row tuples -> dict per row with hasattr(value, 'isoformat')
+           per cell
+- records: fetch_cursor(shape="records") - Arrow result chunks, converters
+           chosen once per column from the cursor description (list of dicts)
+- columns: fetch_cursor(shape="columns") - the same, as a dict of lists
+
+The "arrow" shape is not listed: it hands the fetched table through without
+decoding anything.
+
+Runs offline against a cursor stand-in serving a synthetic change-order-shaped
+result in connector-sized Arrow chunks. Its fetchall() builds the row tuples
+with Arrow's own column conversion, which is cheaper than the connector's row
+iterator, so the legacy figures are on the optimistic side.
+
+Usage (from copilot/backend):
+    python benchmarks/bench_result_decoding.py --rows 100000
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa  # noqa: E402
+
+from services.result_decoding import fetch_cursor  # noqa: E402
+
+# (name, connector type code) - FIXED=0, REAL=1, TEXT=2, DATE=3, TIMESTAMP_NTZ=8
+DESCRIPTION = [
+    ("CO_ID", 2), ("PROJECT_ID", 2), ("VENDOR_ID", 2), ("CO_TITLE", 2), ("REASON_TEXT", 2),
+    ("APPROVED_AMOUNT", 0), ("ML_CONFIDENCE", 1), ("APPROVAL_DATE", 3), ("UPDATED_AT", 8),
+]
+
+
+def _synthetic_table(rows: int) -> pa.Table:
+    rng = random.Random(42)
+    start = datetime.date(2022, 1, 1)
+    ts = datetime.datetime(2024, 1, 1)
+    return pa.table({
+        "CO_ID": [f"CO-{i:06d}" for i in range(rows)],
+        "PROJECT_ID": [f"PRJ-{rng.randint(1, 12):03d}" for _ in range(rows)],
+        "VENDOR_ID": [f"VND-{rng.randint(1, 40):03d}" for _ in range(rows)],
+        "CO_TITLE": ["Additional grounding conductor" for _ in range(rows)],
+        "REASON_TEXT": ["Field condition required additional grounding per NEC 250" for _ in range(rows)],
+        "APPROVED_AMOUNT": pa.array([Decimal(rng.randint(500, 90000)) / 100 for _ in range(rows)],
+                                    type=pa.decimal128(18, 2)),
+        "ML_CONFIDENCE": [rng.random() for _ in range(rows)],
+        "APPROVAL_DATE": [start + datetime.timedelta(days=i % 900) for i in range(rows)],
+        "UPDATED_AT": [ts + datetime.timedelta(minutes=i) for i in range(rows)],
+    })
+
+
+class _Cursor:
+    """Executed connector cursor stand-in: description, Arrow chunks, row fetch."""
+
+    def __init__(self, chunks):
+        self.description = [(name, type_code) + (None,) * 5 for name, type_code in DESCRIPTION]
+        self._chunks = chunks
+
+    def fetch_arrow_batches(self):
+        for chunk in self._chunks:
+            yield pa.Table.from_batches([chunk])
+
+    def fetchall(self):
+        rows = []
+        for chunk in self._chunks:
+            rows.extend(zip(*(column.to_pylist() for column in chunk.columns)))
+        return rows
+
+
+def _legacy(cursor: _Cursor):
+    """Previous path: fetchall() tuples, then per-cell isoformat probing."""
+    columns = [desc[0] for desc in cursor.description]
+    rows = cursor.fetchall()
+    results = []
+    for row in rows:
+        row_dict = {}
+        for i, col in enumerate(columns):
+            value = row[i]
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            row_dict[col] = value
+        results.append(row_dict)
+    return results
+
+
+def _bench(label: str, fn, rows: int, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<10} {best * 1000:9.1f} ms  {rows / best:14,.0f} rows/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Result decoding throughput benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-rows", type=int, default=10_000, help="rows per result chunk")
+    args = parser.parse_args()
+
+    table = _synthetic_table(args.rows)
+    chunks = table.to_batches(max_chunksize=args.chunk_rows)
+    print(f"{args.rows:,} rows x {table.num_columns} columns ({table.nbytes / 1e6:.1f} MB Arrow, "
+          f"{len(chunks)} chunks)")
+
+    _bench("legacy", lambda: _legacy(_Cursor(chunks)), args.rows, args.repeat)
+    _bench("records", lambda: fetch_cursor(_Cursor(chunks), "records"), args.rows, args.repeat)
+    _bench("columns", lambda: fetch_cursor(_Cursor(chunks), "columns"), args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+ATLAS Capital Delivery - Response Serialization Benchmark
+
+Measures bytes/sec and CPU per request for encoding a change-order list:
+- fastapi:  jsonable_encoder + stdlib json (FastAPI's default path, if installed)
+- stdlib:   json.dumps with a Decimal fallback
+- legacy:   per-row `r.get("UPPER") or r.get("lower")` normalization + stdlib json
+- schema:   RowSchema mapping (resolved once per result) + services.serialization.dumps
+- dumps:    services.serialization.dumps on the raw rows (orjson when installed)
+
+Runs offline against synthetic change-order records.
+
+Usage (from copilot/backend):
+    python benchmarks/bench_serialization.py --rows 5000
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.serialization import RowSchema, as_float, as_str, dumps, orjson  # noqa: E402
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+CO_ROW = RowSchema([
+    ("co_id", "CO_ID"), ("project_id", "PROJECT_ID"), ("project_name", "PROJECT_NAME"),
+    ("vendor_id", "VENDOR_ID"), ("vendor_name", "VENDOR_NAME"), ("co_number", "CO_NUMBER"),
+    ("co_title", "CO_TITLE"), ("reason_text", "REASON_TEXT"),
+    ("approved_amount", "APPROVED_AMOUNT", as_float), ("ml_category", "ML_CATEGORY"),
+    ("approval_date", "APPROVAL_DATE", as_str)
+])
+
+
+def _synthetic_rows(rows: int):
+    rng = random.Random(42)
+    start = datetime.date(2022, 1, 1)
+    return [
+        {
+            "CO_ID": f"CO-{i:06d}",
+            "PROJECT_ID": f"PRJ-{rng.randint(1, 12):03d}",
+            "PROJECT_NAME": "Riverside Substation Expansion",
+            "VENDOR_ID": f"VND-{rng.randint(1, 40):03d}",
+            "VENDOR_NAME": "Apex Electrical Contractors",
+            "CO_NUMBER": f"CO-{i % 400:03d}",
+            "CO_TITLE": "Additional grounding conductor",
+            "REASON_TEXT": "Field condition required additional grounding per NEC 250",
+            "APPROVED_AMOUNT": Decimal(rng.randint(500, 90000)) / 100,
+            "ML_CATEGORY": rng.choice(["DESIGN_ERROR", "SCOPE_GAP", "FIELD_CONDITION", "OWNER_CHANGE"]),
+            "ML_CONFIDENCE": rng.random(),
+            "APPROVAL_DATE": (start + datetime.timedelta(days=i % 900)).isoformat(),
+        }
+        for i in range(rows)
+    ]
+
+
+def _stdlib(content) -> bytes:
+    return json.dumps(content, default=lambda v: float(v) if isinstance(v, Decimal) else str(v)).encode("utf-8")
+
+
+def _legacy(rows) -> bytes:
+    normalized = []
+    for r in rows:
+        normalized.append({
+            "co_id": r.get("CO_ID") or r.get("co_id"),
+            "project_id": r.get("PROJECT_ID") or r.get("project_id"),
+            "project_name": r.get("PROJECT_NAME") or r.get("project_name"),
+            "vendor_id": r.get("VENDOR_ID") or r.get("vendor_id"),
+            "vendor_name": r.get("VENDOR_NAME") or r.get("vendor_name"),
+            "co_number": r.get("CO_NUMBER") or r.get("co_number"),
+            "co_title": r.get("CO_TITLE") or r.get("co_title"),
+            "reason_text": r.get("REASON_TEXT") or r.get("reason_text"),
+            "approved_amount": float(r.get("APPROVED_AMOUNT") or r.get("approved_amount") or 0),
+            "ml_category": r.get("ML_CATEGORY") or r.get("ml_category"),
+            "approval_date": str(r.get("APPROVAL_DATE") or r.get("approval_date") or "")
+        })
+    return _stdlib(normalized)
+
+
+def _bench(label: str, fn, repeat: int):
+    best_wall = best_cpu = float("inf")
+    size = 0
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        size = len(fn())
+        best_wall = min(best_wall, time.perf_counter() - wall)
+        best_cpu = min(best_cpu, time.process_time() - cpu)
+    print(f"{label:<8} {best_cpu * 1000:8.1f} ms CPU/request  {size / best_wall / 1e6:8.1f} MB/s  ({size / 1e6:.2f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization benchmark")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = _synthetic_rows(args.rows)
+    print(f"{args.rows:,} change orders, encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib json'}")
+
+    if jsonable_encoder is not None:
+        _bench("fastapi", lambda: _stdlib(jsonable_encoder(rows)), args.repeat)
+    _bench("stdlib", lambda: _stdlib(rows), args.repeat)
+    _bench("legacy", lambda: _legacy(rows), args.repeat)
+    _bench("schema", lambda: dumps(CO_ROW.apply(rows)), args.repeat)
+    _bench("dumps", lambda: dumps(rows), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+ATLAS Capital Delivery - Multi-Worker Throughput Benchmark
+
+Runs N worker processes, each serving cached "requests" (cache lookup +
+response encoding) against a simulated warehouse, and reports throughput and
+warehouse loads per worker count:
+- local:   one in-process ResultCache per worker (every worker reloads each
+           result after an invalidation)
+- shared:  ResultCache backed by the SQLite SharedResultStore (one load per
+           result per data version across all workers)
+
+Data versions are bumped periodically to simulate warehouse loads.
+
+Usage (from copilot/backend):
+    python benchmarks/bench_workers.py --workers 1,2,4 --seconds 5
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.result_cache import ResultCache  # noqa: E402
+from services.serialization import dumps  # noqa: E402
+from services.shared_cache import SharedResultStore  # noqa: E402
+
+
+def _synthetic_result(key: int, rows: int):
+    rng = random.Random(key)
+    return [
+        {"PROJECT_ID": f"PRJ-{i:04d}", "PROJECT_NAME": f"Project {i}", "STATUS": "ACTIVE",
+         "CURRENT_BUDGET": Decimal(rng.randint(10**6, 10**9)), "CPI": rng.random() + 0.5}
+        for i in range(rows)
+    ]
+
+
+def _worker(args, path, version, loads, served, start_at):
+    shared = SharedResultStore(path) if path else None
+    cache = ResultCache(shared=shared, stale_while_revalidate=0)
+    rng = random.Random(os.getpid())
+
+    def loader(key):
+        def load():
+            with loads.get_lock():
+                loads.value += 1
+            time.sleep(args.latency / 1000)
+            return _synthetic_result(key, args.rows)
+        return load
+
+    while time.time() < start_at:
+        time.sleep(0.01)
+    deadline = start_at + args.seconds
+    count = 0
+    while time.time() < deadline:
+        key = rng.randrange(args.keys)
+        versions = (("ATOMIC.PROJECT", str(version.value)),)
+        dumps(cache.get_or_load(("query", key), versions, loader(key)))
+        count += 1
+    with served.get_lock():
+        served.value += count
+
+
+def _run(args, workers: int, shared: bool):
+    path = None
+    if shared:
+        path = os.path.join(tempfile.mkdtemp(prefix="atlas-bench-"), "cache.db")
+        SharedResultStore(path)  # create the schema once
+    version = multiprocessing.Value("i", 0)
+    loads = multiprocessing.Value("i", 0)
+    served = multiprocessing.Value("i", 0)
+    start_at = time.time() + 1.0
+    procs = [
+        multiprocessing.Process(target=_worker, args=(args, path, version, loads, served, start_at))
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    bumps = 0
+    while time.time() < start_at + args.seconds:
+        time.sleep(args.invalidate)
+        with version.get_lock():
+            version.value += 1
+        bumps += 1
+    for proc in procs:
+        proc.join()
+    label = "shared" if shared else "local"
+    print(f"{label:<7} workers={workers:<3} {served.value / args.seconds:10,.0f} req/s  "
+          f"warehouse loads={loads.value:6,}  ({loads.value / (bumps + 1) / args.keys:.2f} per query per version)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-worker shared cache benchmark")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--keys", type=int, default=20, help="distinct queries")
+    parser.add_argument("--rows", type=int, default=200, help="rows per result")
+    parser.add_argument("--latency", type=float, default=20.0, help="simulated warehouse latency (ms)")
+    parser.add_argument("--invalidate", type=float, default=2.0, help="seconds between data loads")
+    args = parser.parse_args()
+
+    print(f"{args.keys} queries x {args.rows} rows, warehouse latency {args.latency:.0f} ms, "
+          f"data load every {args.invalidate:.1f}s, {os.cpu_count()} CPUs")
+    for workers in (int(n) for n in args.workers.split(",")):
+        for shared in (False, True):
+            _run(args, workers, shared)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+ATLAS Capital Delivery - Admission Control
+
+Keeps LLM chat and heavy analytics from starving dashboard reads. Every API
+request is classified into a lane with its own concurrency budget and
+bounded FIFO queue:
+
+- interactive: KPI / list / detail reads (the default)
+- llm:         /api/chat* (Cortex COMPLETE + generated SQL)
+- analytics:   ML rollups, trends, ndjson exports, brief rebuilds
+
+A request that cannot start is queued, unless its lane's queue is full or the
+expected wait (queue position x recent service time / concurrency) exceeds
+the lane's deadline - then it is shed at once with 429 and Retry-After. A
+queued request still waiting at the deadline gets the same 429. Health,
+readiness and metrics endpoints are never queued. A batch is not admitted
+itself - each of its sub-requests is admitted in its own lane, so analytics
+GETs cannot ride in through /api/batch on interactive slots.
+
+Lane budgets: ATLAS_ADMISSION_<LANE>="concurrency,max_queue,max_wait_s".
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .batch import BATCH_PATH
+from .serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# (concurrency, max_queue, max_wait_s) per lane
+DEFAULT_LANES = {
+    "interactive": (32, 256, 2.0),
+    "llm": (4, 16, 10.0),
+    "analytics": (4, 32, 5.0),
+}
+
+# (method or None, path prefix, lane), first match wins; unmatched /api/ paths are interactive
+ROUTES: List[Tuple[Optional[str], str, str]] = [
+    (None, "/api/chat", "llm"),
+    (None, "/api/ml/", "analytics"),
+    (None, "/api/trends/", "analytics"),
+    (None, "/api/change-orders/scope-gaps", "analytics"),
+    ("POST", "/api/morning-brief/refresh", "analytics"),
+]
+
+# Never queued or shed
+EXEMPT_PATHS = ("/health", "/ready", "/metrics", "/api/diagnostics", "/api/info")
+
+# Service-time smoothing for wait estimates
+EWMA_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """A lane cannot admit the request within its deadline."""
+
+    def __init__(self, lane: str, reason: str, retry_after: float):
+        super().__init__(f"{lane} lane {reason}")
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _lane_config(name: str, default: Tuple[int, int, float]) -> Tuple[int, int, float]:
+    value = os.environ.get(f"ATLAS_ADMISSION_{name.upper()}")
+    if not value:
+        return default
+    try:
+        concurrency, max_queue, max_wait = value.split(",")
+        return int(concurrency), int(max_queue), float(max_wait)
+    except ValueError:
+        logger.warning(f"Ignoring malformed ATLAS_ADMISSION_{name.upper()}={value!r}")
+        return default
+
+
+class Lane:
+    """Concurrency budget plus a bounded FIFO queue with a wait deadline."""
+
+    def __init__(self, name: str, concurrency: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.running = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_s: Optional[float] = None
+
+        # Metrics
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "deadline": 0, "timeout": 0}
+        self.max_queue_depth = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+    def expected_wait(self, position: int) -> float:
+        """Seconds until the request at queue `position` (1-based) could start."""
+        service = self._service_s if self._service_s is not None else 0.0
+        return position * service / self.concurrency
+
+    def _retry_after(self) -> float:
+        return max(1.0, self.expected_wait(len(self._waiters) + 1))
+
+    async def acquire(self):
+        """Take a slot, waiting in FIFO order; raises Overloaded."""
+        if self.running < self.concurrency and not self._waiters:
+            self.running += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            raise Overloaded(self.name, "queue is full", self._retry_after())
+        if self.expected_wait(len(self._waiters) + 1) > self.max_wait:
+            self.rejected["deadline"] += 1
+            raise Overloaded(self.name, "would miss its queue deadline", self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # The slot was handed over just as we gave up - pass it on
+                self._release_slot()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected["timeout"] += 1
+            raise Overloaded(self.name, f"queue wait exceeded {self.max_wait:.1f}s", self._retry_after())
+        wait = time.monotonic() - started
+        self._total_wait += wait
+        self._max_wait_seen = max(self._max_wait_seen, wait)
+        self.admitted += 1
+
+    def release(self, service_s: float):
+        self._service_s = service_s if self._service_s is None else (
+            EWMA_ALPHA * service_s + (1 - EWMA_ALPHA) * self._service_s
+        )
+        self._release_slot()
+
+    def _release_slot(self):
+        # Hand the slot straight to the oldest waiter (running stays the same)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_s": self.max_wait,
+            "running": self.running,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "queued": self.queued_total,
+            "rejected": sum(self.rejected.values()),
+            "rejected_queue_full": self.rejected["queue_full"],
+            "rejected_deadline": self.rejected["deadline"],
+            "rejected_timeout": self.rejected["timeout"],
+            "avg_queue_wait_ms": round(self._total_wait / self.queued_total * 1000, 2) if self.queued_total else 0.0,
+            "max_queue_wait_ms": round(self._max_wait_seen * 1000, 2),
+            "service_ms": round(self._service_s * 1000, 2) if self._service_s is not None else None
+        }
+
+
+class AdmissionController:
+    """Lanes plus the route -> lane classification."""
+
+    def __init__(self, lanes: Sequence[Lane], routes: Sequence[Tuple[Optional[str], str, str]] = ROUTES):
+        self.lanes = {lane.name: lane for lane in lanes}
+        self.routes = list(routes)
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls([Lane(name, *_lane_config(name, default)) for name, default in DEFAULT_LANES.items()])
+
+    def lane_for(self, method: str, path: str, query_string: bytes = b"") -> Optional[Lane]:
+        """The lane for a request, or None when it is exempt."""
+        if not path.startswith("/api/") or path in EXEMPT_PATHS:
+            return None
+        if method == "POST" and path.rstrip("/") == BATCH_PATH:
+            # Only dispatches - its sub-requests go through their own lanes
+            return None
+        if b"format=ndjson" in query_string:
+            return self.lanes["analytics"]
+        for route_method, prefix, lane in self.routes:
+            if (route_method is None or route_method == method) and path.startswith(prefix):
+                return self.lanes[lane]
+        return self.lanes["interactive"]
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting each API request through its lane (429 + Retry-After when shed)."""
+
+    def __init__(self, app: Any, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        lane = self.controller.lane_for(scope["method"], scope["path"], scope.get("query_string", b""))
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await lane.acquire()
+        except Overloaded as e:
+            logger.warning(f"Shed {scope['method']} {scope['path']}: {e}")
+            await self._reject(send, e)
+            return
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            lane.release(time.monotonic() - started)
+
+    @staticmethod
+    async def _reject(send: Callable, error: Overloaded):
+        body = dumps({"detail": f"Server busy: {error}", "lane": error.lane})
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(error.retry_after)).encode()),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
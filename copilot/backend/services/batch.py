@@ -0,0 +1,149 @@
+"""
+ATLAS Capital Delivery - Batched GET Requests
+
+`POST /api/batch` resolves several dashboard GETs in one round trip:
+- each sub-request is dispatched in-process through the ASGI app, so routing,
+  parameter validation and error handling are exactly those of a direct call
+- sub-requests run concurrently and share the batch request's RequestLoader,
+  so a service read needed by several of them is issued once
+- sub-response bodies are spliced into one JSON document without being
+  parsed again; a failing sub-request reports its own status and error and
+  does not fail the others
+"""
+
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from .serialization import dumps
+
+BATCH_MAX_REQUESTS = int(os.environ.get("ATLAS_BATCH_MAX_REQUESTS", "20"))
+BATCH_PATH = "/api/batch"
+# Scope flag marking in-process sub-requests of a batch
+SUBREQUEST_KEY = "atlas.subrequest"
+
+# Parent request headers not forwarded to sub-requests (the batch response is
+# compressed as a whole, and conditional headers belong to the batch itself)
+_DROPPED_HEADERS = {
+    b"content-length", b"content-type", b"transfer-encoding", b"accept-encoding",
+    b"if-none-match", b"if-modified-since"
+}
+
+
+def _query_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class SubRequest:
+    """One named GET of a batch: `id`, path and encoded query string."""
+
+    __slots__ = ("id", "path", "query_string")
+
+    def __init__(self, id: str, path: str, params: Optional[Dict[str, Any]] = None):
+        split = urlsplit(path)
+        if split.scheme or split.netloc or not split.path.startswith("/api/"):
+            raise ValueError(f"Sub-request '{id}': path must be an /api/ route")
+        if split.path.rstrip("/") == BATCH_PATH:
+            raise ValueError(f"Sub-request '{id}': batches cannot be nested")
+        pairs = [
+            (key, [_query_value(v) for v in value] if isinstance(value, (list, tuple)) else _query_value(value))
+            for key, value in (params or {}).items() if value is not None
+        ]
+        query = "&".join(part for part in (split.query, urlencode(pairs, doseq=True)) if part)
+        self.id = id
+        self.path = split.path
+        self.query_string = query.encode("latin-1")
+
+
+def parse_batch(items: Sequence[Tuple[str, str, Optional[Dict[str, Any]]]]) -> List[SubRequest]:
+    """Validate (id, path, params) triples; raises ValueError."""
+    if not items:
+        raise ValueError("A batch needs at least one request")
+    if len(items) > BATCH_MAX_REQUESTS:
+        raise ValueError(f"A batch holds at most {BATCH_MAX_REQUESTS} requests")
+    subs = [SubRequest(id, path, params) for id, path, params in items]
+    ids = [sub.id for sub in subs]
+    if len(set(ids)) != len(ids):
+        raise ValueError("Sub-request ids must be unique")
+    return subs
+
+
+async def _dispatch(app: Callable, parent: Dict[str, Any], sub: SubRequest) -> Tuple[int, bytes, bytes]:
+    """Run one GET through `app`; returns (status, content type, body)."""
+    scope = {
+        key: parent[key]
+        for key in ("asgi", "http_version", "scheme", "server", "client", "root_path", "app", "state")
+        if key in parent
+    }
+    scope.update({
+        "type": "http",
+        "method": "GET",
+        "path": sub.path,
+        "raw_path": sub.path.encode("latin-1"),
+        "query_string": sub.query_string,
+        "headers": [(name, value) for name, value in parent.get("headers", []) if name not in _DROPPED_HEADERS],
+        SUBREQUEST_KEY: True
+    })
+
+    response: Dict[str, Any] = {"status": None, "content_type": b"", "body": []}
+    finished = asyncio.Event()
+    requested = False
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses listen for a disconnect until they are done
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            for name, value in message.get("headers", []):
+                if name.lower() == b"content-type":
+                    response["content_type"] = value
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    except Exception as e:
+        # Server errors are re-raised after the 500 has been sent
+        if response["status"] is None:
+            return 500, b"text/plain", str(e).encode("utf-8")
+    finally:
+        finished.set()
+    return response["status"] or 500, response["content_type"], b"".join(response["body"])
+
+
+def _entry(status: int, content_type: bytes, body: bytes) -> Tuple[bool, bytes]:
+    is_json = content_type.split(b";")[0].strip() == b"application/json"
+    ok = 200 <= status < 300 and is_json
+    head = b'{"status":%d,"ok":%s,' % (status, b"true" if ok else b"false")
+    if is_json:
+        return ok, head + b'"body":' + (body or b"null") + b"}"
+    if 200 <= status < 300:
+        return ok, head + b'"error":"Response is not JSON (streaming routes cannot be batched)"}'
+    return ok, head + b'"error":' + dumps(body.decode("utf-8", "replace")) + b"}"
+
+
+async def run_batch(app: Callable, parent: Dict[str, Any], subs: Sequence[SubRequest]) -> Tuple[bytes, Dict[str, int]]:
+    """
+    Run `subs` concurrently; returns the combined document
+    {"ok": n, "failed": n, "results": {id: {"status", "ok", "body" | "error"}}} and its counts.
+    Call inside request_scope() so the sub-requests share one loader.
+    """
+    responses = await asyncio.gather(*(_dispatch(app, parent, sub) for sub in subs))
+    entries = []
+    counts = {"ok": 0, "failed": 0}
+    for sub, (status, content_type, body) in zip(subs, responses):
+        ok, entry = _entry(status, content_type, body)
+        counts["ok" if ok else "failed"] += 1
+        entries.append(dumps(sub.id) + b":" + entry)
+    document = b'{"ok":%d,"failed":%d,"results":{' % (counts["ok"], counts["failed"]) + b",".join(entries) + b"}}"
+    return document, counts
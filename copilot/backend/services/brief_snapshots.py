@@ -0,0 +1,214 @@
+"""
+ATLAS Capital Delivery - Morning Brief Snapshots
+
+The morning brief is materialized instead of rebuilt per page load: a
+background scheduler builds it for the current date, stores it keyed by
+date together with the data version it was built from, and rebuilds only
+when the date rolls over or the underlying tables change (LAST_ALTERED).
+Serving a stored brief costs no warehouse queries. A failed build stores
+nothing: the previous snapshot keeps being served and the next poll retries.
+
+Snapshots hold the encoded JSON body and its ETag, so a request is a dict
+lookup plus a header comparison. Every uvicorn worker builds its own
+snapshot, so the ETag hashes the brief's content serialized
+deterministically without generated_at: identical briefs share an ETag
+across workers, and any different body gets a new one.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # Python < 3.9
+    ZoneInfo = None
+
+logger = logging.getLogger(__name__)
+
+# Tables the brief reads; any change to them triggers a rebuild
+BRIEF_TABLES = ("ATOMIC.PROJECT", "ATOMIC.CHANGE_ORDER", "ATOMIC.SCHEDULE_ACTIVITY", "ATOMIC.VENDOR")
+
+DEFAULT_POLL_INTERVAL = float(os.environ.get("ATLAS_BRIEF_POLL_INTERVAL", "60"))
+DEFAULT_HISTORY_DAYS = int(os.environ.get("ATLAS_BRIEF_HISTORY_DAYS", "30"))
+BRIEF_TIMEZONE = os.environ.get("ATLAS_BRIEF_TZ", "UTC")
+
+
+def brief_today() -> str:
+    """Current brief date (ISO) in ATLAS_BRIEF_TZ."""
+    if ZoneInfo is not None:
+        try:
+            return datetime.now(ZoneInfo(BRIEF_TIMEZONE)).date().isoformat()
+        except Exception:
+            logger.warning(f"Unknown ATLAS_BRIEF_TZ '{BRIEF_TIMEZONE}', using UTC")
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def parse_brief_date(value: str) -> str:
+    """Validate a YYYY-MM-DD brief date; raises ValueError."""
+    return date.fromisoformat(value).isoformat()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class BriefSnapshot:
+    """One built brief: encoded body, ETag and the data version it reflects."""
+
+    __slots__ = ("brief_date", "data_version", "built_at", "build_ms", "body", "etag")
+
+    def __init__(self, brief_date: str, data_version: Optional[str], payload: Dict[str, Any], build_ms: float = 0.0):
+        self.brief_date = brief_date
+        self.data_version = data_version
+        self.built_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.build_ms = round(build_ms, 1)
+        document = {**payload, "date": brief_date, "data_version": data_version}
+        # The content without the per-worker build time
+        content = json.dumps(document, default=_json_default, sort_keys=True, separators=(",", ":"))
+        self.etag = f'"{brief_date}-{hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]}"'
+        document["generated_at"] = self.built_at
+        self.body = json.dumps(document, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "date": self.brief_date,
+            "data_version": self.data_version,
+            "built_at": self.built_at,
+            "build_ms": self.build_ms,
+            "bytes": len(self.body),
+            "etag": self.etag
+        }
+
+
+class BriefSnapshotStore:
+    """Latest snapshot per date, keeping the most recent `history_days` dates."""
+
+    def __init__(self, history_days: int = DEFAULT_HISTORY_DAYS):
+        self.history_days = max(1, history_days)
+        self._by_date: "OrderedDict[str, BriefSnapshot]" = OrderedDict()
+
+    def put(self, snapshot: BriefSnapshot):
+        self._by_date[snapshot.brief_date] = snapshot
+        # ISO dates sort chronologically; drop the oldest beyond the window
+        for stale in sorted(self._by_date)[:-self.history_days]:
+            del self._by_date[stale]
+
+    def get(self, brief_date: str) -> Optional[BriefSnapshot]:
+        return self._by_date.get(brief_date)
+
+    def dates(self) -> List[str]:
+        return sorted(self._by_date, reverse=True)
+
+
+class BriefScheduler:
+    """
+    Keeps today's brief built and current.
+
+        scheduler = BriefScheduler(build_brief, data_version)
+        scheduler.start()                       # from the app's startup hook
+        snapshot = await scheduler.current()    # stored brief (built once if missing)
+
+    `build` is an async callable returning the brief payload; `data_version`
+    is a blocking callable returning an opaque version string (or None when
+    unknown) and runs on a worker thread.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Awaitable[Dict[str, Any]]],
+        data_version: Callable[[], Optional[str]],
+        store: Optional[BriefSnapshotStore] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        self.build = build
+        self.data_version = data_version
+        self.store = store or BriefSnapshotStore()
+        self.poll_interval = poll_interval
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> asyncio.Task:
+        """Schedule the refresh loop on the running event loop (idempotent)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+        return self._task
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Morning brief refresh failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def refresh(self, force: bool = False) -> BriefSnapshot:
+        """Rebuild today's brief if the date or data version changed (or `force`)."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            today = brief_today()
+            loop = asyncio.get_running_loop()
+            try:
+                version = await loop.run_in_executor(None, self.data_version)
+            except Exception as e:
+                logger.warning(f"Brief data version unavailable: {e}")
+                version = None
+
+            current = self.store.get(today)
+            # An unknown version is no evidence of change: keep today's brief
+            if not force and current is not None and version in (None, current.data_version):
+                return current
+
+            started = time.monotonic()
+            try:
+                payload = await self.build()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                raise
+            snapshot = BriefSnapshot(today, version, payload, (time.monotonic() - started) * 1000)
+            self.store.put(snapshot)
+            self.builds += 1
+            self.last_error = None
+            logger.info(f"Morning brief for {today} built in {snapshot.build_ms:.0f} ms (data version {version})")
+            return snapshot
+
+    async def current(self) -> BriefSnapshot:
+        """Today's stored brief; built on demand only when none exists yet."""
+        snapshot = self.store.get(brief_today())
+        if snapshot is not None:
+            return snapshot
+        # Cold start: concurrent callers wait on the lock and share one build
+        return await self.refresh()
+
+    def stats(self) -> Dict[str, Any]:
+        latest = self.store.get(brief_today())
+        return {
+            "builds": self.builds,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "poll_interval_s": self.poll_interval,
+            "dates": self.store.dates(),
+            "today": latest.info() if latest is not None else None
+        }
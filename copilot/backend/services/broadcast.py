@@ -0,0 +1,287 @@
+"""
+ATLAS Capital Delivery - WebSocket Broadcast Hub
+
+Pub/sub for live dashboards. One background poller per source fetches its
+data once per interval, however many clients are connected, detects changes
+and fans the same encoded message out to every subscriber of a topic:
+
+- first message per topic (and after a resync) is a full snapshot
+- later messages are diffs of top-level keys: {"changed": {...}, "removed": [...]}
+- every message carries a per-topic `seq`; a gap means the client missed data
+
+Each connection has a bounded send queue. When a slow client's queue is full
+its pending update for that topic is dropped, further diffs for the topic are
+skipped, and a fresh snapshot is sent once the queue drains (backpressure
+without blocking the poller or other clients).
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = float(os.environ.get("ATLAS_WS_POLL_INTERVAL", "5"))
+DEFAULT_QUEUE_SIZE = int(os.environ.get("ATLAS_WS_QUEUE_SIZE", "64"))
+MAX_TOPICS_PER_CONNECTION = 50
+
+_MISSING = object()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _normalize(value: Any) -> Any:
+    """JSON round trip: stable comparisons and plain types for diffing."""
+    return json.loads(json.dumps(value, default=_json_default))
+
+
+def keyed(rows: Sequence[Dict[str, Any]], key: Callable[[Dict[str, Any]], Any]) -> Dict[str, Any]:
+    """Turn a list of rows into a dict so diffs address rows by key."""
+    return {str(key(row)): row for row in rows}
+
+
+def diff(old: Any, new: Any) -> Optional[Dict[str, Any]]:
+    """Top-level diff of two dicts, or None when unchanged."""
+    changed = {k: v for k, v in new.items() if old.get(k, _MISSING) != v}
+    removed = [k for k in old if k not in new]
+    if not changed and not removed:
+        return None
+    return {"changed": changed, "removed": removed}
+
+
+class Subscriber:
+    """One connection: its topics and a bounded queue of encoded messages."""
+
+    def __init__(self, hub: "BroadcastHub", queue_size: int):
+        self.hub = hub
+        self.topics: Set[str] = set()
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self._resync: Set[str] = set()
+        self.dropped = 0
+
+    def offer(self, text: str, topic: Optional[str] = None):
+        if topic is not None and topic in self._resync:
+            return  # Diffs would apply to a base the client never received
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if topic is not None:
+                self._resync.add(topic)
+
+    async def next_message(self) -> str:
+        """Next message to send; snapshots for dropped topics once the queue has drained."""
+        while True:
+            if not self.queue.empty() or not self._resync:
+                return await self.queue.get()
+            topic = self._resync.pop()
+            text = self.hub.snapshot_text(topic) if topic in self.topics else None
+            if text is not None:
+                return text
+
+
+class _Topic:
+    __slots__ = ("name", "state", "seq", "subscribers")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state: Any = None
+        self.seq = 0
+        self.subscribers: Set[Subscriber] = set()
+
+
+class _Source:
+    """A poller serving every topic named like one of its prefixes or `prefix:<key>`."""
+
+    def __init__(self, name: str, fetch: Callable[[Set[str]], Awaitable[Dict[str, Any]]], prefixes: Sequence[str]):
+        self.name = name
+        self.fetch = fetch
+        self.prefixes = tuple(prefixes)
+        self.task: Optional[asyncio.Task] = None
+        self.wake = asyncio.Event()
+        self.polls = 0
+        self.failures = 0
+
+    def serves(self, topic: str) -> bool:
+        return topic.split(":", 1)[0] in self.prefixes
+
+
+class BroadcastHub:
+    """
+    Topic registry, pollers and fan-out.
+
+        hub = BroadcastHub()
+        hub.add_source("portfolio", fetch_summary)      # fetch(topics) -> {topic: value}
+        hub.add_source("projects", fetch_projects, topics=["projects", "project"])
+        subscriber = hub.connect()
+        hub.subscribe(subscriber, ["portfolio", "project:P-001"])
+        text = await subscriber.next_message()
+    """
+
+    def __init__(self, poll_interval: float = DEFAULT_POLL_INTERVAL, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._sources: List[_Source] = []
+        self._topics: Dict[str, _Topic] = {}
+        self._subscribers: Set[Subscriber] = set()
+        self.messages = 0
+
+    def add_source(
+        self,
+        name: str,
+        fetch: Callable[[Set[str]], Awaitable[Dict[str, Any]]],
+        topics: Optional[Sequence[str]] = None
+    ):
+        """
+        Register one poller for the topic prefixes in `topics` (default: `name`).
+        `fetch` receives the subscribed topics it serves and returns
+        {topic: value}; dict values (or rows passed through `keyed`) are diffed
+        by top-level key.
+        """
+        self._sources.append(_Source(name, fetch, topics or [name]))
+
+    def _source_for(self, topic: str) -> Optional[_Source]:
+        return next((s for s in self._sources if s.serves(topic)), None)
+
+    # =========================================================================
+    # Connections & subscriptions
+    # =========================================================================
+
+    def connect(self) -> Subscriber:
+        subscriber = Subscriber(self, self.queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: Subscriber):
+        self.unsubscribe(subscriber, list(subscriber.topics))
+        self._subscribers.discard(subscriber)
+
+    def subscribe(self, subscriber: Subscriber, topics: Sequence[str]) -> List[str]:
+        """Subscribe to known topics; returns the topics that were rejected."""
+        rejected = []
+        for name in topics:
+            source = self._source_for(name)
+            if source is None or (
+                name not in subscriber.topics and len(subscriber.topics) >= MAX_TOPICS_PER_CONNECTION
+            ):
+                rejected.append(name)
+                continue
+            topic = self._topics.get(name)
+            if topic is None:
+                topic = self._topics[name] = _Topic(name)
+            topic.subscribers.add(subscriber)
+            subscriber.topics.add(name)
+            if topic.state is not None:
+                subscriber.offer(self.snapshot_text(name), name)
+            else:
+                source.wake.set()  # New topic - poll now rather than at the next interval
+            self._ensure_polling(source)
+        return rejected
+
+    def unsubscribe(self, subscriber: Subscriber, topics: Sequence[str]):
+        for name in topics:
+            subscriber.topics.discard(name)
+            topic = self._topics.get(name)
+            if topic is None:
+                continue
+            topic.subscribers.discard(subscriber)
+            if not topic.subscribers:
+                del self._topics[name]
+
+    def refresh(self, subscriber: Subscriber):
+        """Resend snapshots of every subscribed topic."""
+        for name in subscriber.topics:
+            text = self.snapshot_text(name)
+            if text is not None:
+                subscriber.offer(text, name)
+
+    def snapshot_text(self, name: str) -> Optional[str]:
+        topic = self._topics.get(name)
+        if topic is None or topic.state is None:
+            return None
+        return json.dumps({"type": "snapshot", "topic": name, "seq": topic.seq, "data": topic.state})
+
+    # =========================================================================
+    # Polling & fan-out
+    # =========================================================================
+
+    def _ensure_polling(self, source: _Source):
+        if source.task is None or source.task.done():
+            source.task = asyncio.get_running_loop().create_task(self._poll(source))
+
+    def _wanted(self, source: _Source) -> Set[str]:
+        return {name for name in self._topics if source.serves(name)}
+
+    async def _poll(self, source: _Source):
+        # Runs while any of the source's topics has a subscriber
+        while True:
+            wanted = self._wanted(source)
+            if not wanted:
+                return
+            source.wake.clear()
+            try:
+                values = await source.fetch(wanted)
+                source.polls += 1
+                for name, value in values.items():
+                    self.publish(name, value)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                source.failures += 1
+                logger.warning(f"Broadcast poll for '{source.name}' failed: {e}")
+            try:
+                await asyncio.wait_for(source.wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def publish(self, name: str, value: Any):
+        """Diff `value` against the topic's state and fan out one encoded message."""
+        topic = self._topics.get(name)
+        if topic is None or value is None:
+            return  # Nobody listening, or nothing to publish (unknown project)
+        value = _normalize(value)
+        if topic.state is None:
+            message = {"type": "snapshot", "data": value}
+        elif isinstance(value, dict) and isinstance(topic.state, dict):
+            changes = diff(topic.state, value)
+            if changes is None:
+                return
+            message = {"type": "diff", **changes}
+        elif value == topic.state:
+            return
+        else:
+            message = {"type": "snapshot", "data": value}
+        topic.seq += 1
+        topic.state = value
+        text = json.dumps({"topic": name, "seq": topic.seq, **message})
+        for subscriber in topic.subscribers:
+            subscriber.offer(text, name)
+        self.messages += len(topic.subscribers)
+
+    def close(self):
+        for source in self._sources:
+            if source.task is not None:
+                source.task.cancel()
+                source.task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self._subscribers),
+            "topics": {name: len(topic.subscribers) for name, topic in self._topics.items()},
+            "messages": self.messages,
+            "dropped": sum(s.dropped for s in self._subscribers),
+            "pollers": {
+                s.name: {"running": s.task is not None and not s.task.done(), "polls": s.polls, "failures": s.failures}
+                for s in self._sources
+            }
+        }
@@ -0,0 +1,195 @@
+"""
+ATLAS Capital Delivery - Persistent LLM Completion Cache
+
+Cortex COMPLETE answers for identical requests, kept on disk so narrative
+generation, canned demo questions and retries skip the LLM - also after a
+container restart when the file lives on a persistent volume:
+- key: SHA-256 of model name, prompt and decoding options
+- SQLite in WAL mode, shared by the uvicorn workers of the host
+- LRU eviction (last use) above ATLAS_COMPLETION_CACHE_MB; entries older
+  than ATLAS_COMPLETION_CACHE_TTL seconds (0 = no expiry) are misses
+- callers that want a fresh sample pass cache=False (bypass)
+
+ATLAS_COMPLETION_CACHE=0 disables the cache. Empty responses (failed calls)
+are never stored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.environ.get(
+    "ATLAS_COMPLETION_CACHE_PATH", os.path.join(tempfile.gettempdir(), "atlas-completions.db")
+)
+DEFAULT_MAX_BYTES = int(float(os.environ.get("ATLAS_COMPLETION_CACHE_MB", "64")) * 1024 * 1024)
+DEFAULT_TTL = float(os.environ.get("ATLAS_COMPLETION_CACHE_TTL", "0"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL,
+    response TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used);
+"""
+
+
+def completion_key(model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+    payload = json.dumps([model, prompt, options or {}], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompletionCache:
+    """
+    Disk-backed model + prompt + options -> response cache.
+
+    Like the shared result store, every operation degrades instead of
+    raising: a failing lookup is a miss, a failing write is dropped.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # Metrics (this process)
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._writes = 0
+        self._bypassed = 0
+        self._errors = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _failed(self, action: str, error: Exception):
+        self._count("_errors")
+        logger.warning(f"Completion cache {action} failed: {error}")
+
+    def bypassed(self):
+        """Record a call that skipped the cache on purpose."""
+        self._count("_bypassed")
+
+    def lookup(self, key: str) -> Optional[str]:
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._count("_expired")
+                row = None
+            if row is None:
+                self._count("_misses")
+                return None
+            conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+        except Exception as e:
+            self._failed("lookup", e)
+            return None
+        self._count("_hits")
+        return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        if not response:
+            return
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, created, last_used, size, response) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, now, now, size, response)
+            )
+            self._evict(conn)
+        except Exception as e:
+            self._failed("write", e)
+            return
+        self._count("_writes")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop the least recently used entries while over the byte budget."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        doomed, freed = [], 0
+        for key, size in conn.execute("SELECT key, size FROM completions ORDER BY last_used"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM completions WHERE key = ?", doomed)
+
+    def clear(self):
+        try:
+            self._connect().execute("DELETE FROM completions")
+        except Exception as e:
+            self._failed("clear", e)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+        except Exception:
+            entries = size = None
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "path": self.path,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "ttl_s": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+                "expired": self._expired,
+                "writes": self._writes,
+                "bypassed": self._bypassed,
+                "errors": self._errors
+            }
+
+
+def completion_cache_from_env() -> Optional[CompletionCache]:
+    """The completion cache, or None when disabled (ATLAS_COMPLETION_CACHE=0) or unavailable."""
+    if os.environ.get("ATLAS_COMPLETION_CACHE", "1").lower() in ("0", "false", "off"):
+        return None
+    try:
+        return CompletionCache()
+    except Exception as e:
+        logger.warning(f"Completion cache unavailable ({DEFAULT_PATH}): {e}")
+        return None
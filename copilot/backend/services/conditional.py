@@ -0,0 +1,88 @@
+"""
+ATLAS Capital Delivery - Conditional GET Validators
+
+HTTP validators derived from warehouse data versions: the ETag of a
+read-only endpoint is a hash of its URL and the LAST_ALTERED versions of its
+source tables, so a client holding a current representation is answered
+with 304 before any query runs or anything is serialized.
+
+- ETag: strong, `"<sha1 of build id, URL, table versions>"`
+- Last-Modified: most recent LAST_ALTERED of the source tables
+- If-None-Match is compared weakly (nginx gzip turns ETags into W/"...")
+  and takes precedence over If-Modified-Since
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from .result_cache import Versions
+
+# Changes to response shapes ship with a new build id, invalidating old ETags
+BUILD_ID = os.environ.get("ATLAS_BUILD_ID", "1")
+
+# Browsers may reuse a response this long without revalidating; matches the
+# table version poll interval, within which a data change is not seen anyway
+DEFAULT_MAX_AGE = int(os.environ.get("ATLAS_HTTP_MAX_AGE", "5"))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check using weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def _http_date(last_altered: str) -> Optional[datetime]:
+    try:
+        moment = datetime.fromisoformat(last_altered)
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return moment.astimezone(timezone.utc).replace(microsecond=0)
+
+
+class Validators:
+    """ETag / Last-Modified / Cache-Control for one representation."""
+
+    __slots__ = ("etag", "last_modified", "cache_control")
+
+    def __init__(self, etag: str, last_modified: Optional[datetime], cache_control: str):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.cache_control = cache_control
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """True when the client's cached copy is current."""
+        if if_none_match:
+            return etag_matches(if_none_match, self.etag)
+        if if_modified_since and self.last_modified is not None:
+            try:
+                return self.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+def data_validators(url: str, versions: Versions, max_age: int = DEFAULT_MAX_AGE) -> Optional[Validators]:
+    """Validators for `url` backed by table `versions`; None when versions are unknown."""
+    if not versions:
+        return None
+    token = "\n".join([BUILD_ID, url] + [f"{table}={version}" for table, version in versions])
+    etag = f'"{hashlib.sha1(token.encode("utf-8")).hexdigest()[:20]}"'
+    last_modified = _http_date(max(version for _, version in versions))
+    return Validators(etag, last_modified, f"public, max-age={max_age}, must-revalidate")
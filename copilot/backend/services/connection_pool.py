@@ -0,0 +1,319 @@
+"""
+ATLAS Capital Delivery - Connection Pool
+
+Thread-safe pool of Snowflake connections shared by the QueryExecutor workers.
+Each member is checked out by one query at a time, pinged after sitting idle,
+recycled after a maximum lifetime, and rebuilt individually when its OAuth
+token expires - so a token rotation never tears down the whole pool.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.environ.get("ATLAS_POOL_SIZE", os.environ.get("ATLAS_QUERY_WORKERS", "8")))
+DEFAULT_MAX_LIFETIME = float(os.environ.get("ATLAS_POOL_MAX_LIFETIME", "3300"))  # < 1h SPCS token lifetime
+DEFAULT_IDLE_PING = float(os.environ.get("ATLAS_POOL_IDLE_PING", "300"))
+DEFAULT_CHECKOUT_TIMEOUT = float(os.environ.get("ATLAS_POOL_CHECKOUT_TIMEOUT", "30"))
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class PooledConnection:
+    """A pool member: one live connection plus bookkeeping."""
+
+    def __init__(self, connection: Any, member_id: int):
+        self.connection = connection
+        self.member_id = member_id
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.created_at
+
+    @property
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_used
+
+
+class ConnectionPool:
+    """
+    Bounded pool of connections created by `factory`.
+
+    - Checkout/checkin (or the `connection()` context manager)
+    - Lazy growth up to `size`; `start()` / `grow()` open members eagerly
+    - Health ping on checkout after `idle_ping` seconds idle
+    - Recycling after `max_lifetime` seconds
+    - `rebuild()` replaces a single broken member
+    - Utilization and wait-time metrics via `stats()`
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int = DEFAULT_POOL_SIZE,
+        max_lifetime: float = DEFAULT_MAX_LIFETIME,
+        idle_ping: float = DEFAULT_IDLE_PING,
+        checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT,
+        ping_query: str = "SELECT 1",
+        name: str = "snowflake"
+    ):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_lifetime = max_lifetime
+        self.idle_ping = idle_ping
+        self.checkout_timeout = checkout_timeout
+        self.ping_query = ping_query
+        self.name = name
+
+        self._idle: Deque[PooledConnection] = deque()
+        self._cond = threading.Condition()
+        self._open = 0          # members created (idle + in use + being created)
+        self._in_use = 0
+        self._next_id = 0
+        self._closed = False
+
+        # Metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._ping_failures = 0
+        self._rebuilds = 0
+        self._create_failures = 0
+
+    # =========================================================================
+    # Lifecycle
+    # =========================================================================
+
+    def start(self, min_size: int = 1) -> bool:
+        """Open `min_size` members eagerly. Returns False if none could be opened."""
+        opened = self.grow(min_size)
+        logger.info(f"ConnectionPool[{self.name}] started with {opened}/{self.size} members")
+        return opened > 0
+
+    def grow(self, target: int) -> int:
+        """Open idle members until `target` are open (capped at size). Returns how many were opened."""
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._open >= min(target, self.size):
+                    return opened
+                self._open += 1
+            member = self._create_member()
+            with self._cond:
+                if member is None:
+                    self._open -= 1
+                    self._cond.notify()
+                    return opened
+                self._idle.append(member)
+                self._cond.notify()
+            opened += 1
+
+    def close(self):
+        """Close all idle members; in-use members are closed on checkin."""
+        with self._cond:
+            self._closed = True
+            members = list(self._idle)
+            self._idle.clear()
+            self._open -= len(members)
+            self._cond.notify_all()
+        for member in members:
+            self._close_connection(member)
+
+    # =========================================================================
+    # Checkout / Checkin
+    # =========================================================================
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[PooledConnection]:
+        """Check out a member for the duration of the block."""
+        member = self.checkout(timeout=timeout)
+        try:
+            yield member
+        finally:
+            self.checkin(member)
+
+    def checkout(self, timeout: Optional[float] = None) -> PooledConnection:
+        """Borrow a healthy member, growing the pool or waiting as needed."""
+        timeout = timeout if timeout is not None else self.checkout_timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            member = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError(f"ConnectionPool[{self.name}] is closed")
+                    if self._idle:
+                        member = self._idle.pop()  # LIFO keeps hot members hot
+                        self._in_use += 1
+                        break
+                    if self._open < self.size:
+                        self._open += 1
+                        self._in_use += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"ConnectionPool[{self.name}]: no connection available after {timeout:.1f}s"
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+
+            if create:
+                member = self._create_member()
+                if member is None:
+                    self._release_slot()
+                    raise RuntimeError(f"ConnectionPool[{self.name}]: failed to open connection")
+            elif not self._validate(member):
+                # Replace the stale member in place; the slot stays reserved
+                member = self._replace(member)
+                if member is None:
+                    self._release_slot()
+                    raise RuntimeError(f"ConnectionPool[{self.name}]: failed to reopen connection")
+
+            wait = time.monotonic() - started
+            with self._cond:
+                self._checkouts += 1
+                if waited:
+                    self._waits += 1
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            member.uses += 1
+            return member
+
+    def checkin(self, member: PooledConnection, discard: bool = False):
+        """Return a member. Discarded members are closed and their slot freed."""
+        member.last_used = time.monotonic()
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._open -= 1
+            else:
+                self._idle.append(member)
+            self._cond.notify()
+        if discard or self._closed:
+            self._close_connection(member)
+
+    def rebuild(self, member: PooledConnection) -> bool:
+        """
+        Replace one checked-out member's connection (e.g. after token expiry).
+        The member stays checked out; other members keep serving queries.
+        """
+        with self._cond:
+            self._rebuilds += 1
+        new_member = self._replace(member)
+        if new_member is None:
+            return False
+        member.connection = new_member.connection
+        member.created_at = new_member.created_at
+        member.last_used = new_member.last_used
+        return True
+
+    # =========================================================================
+    # Internals
+    # =========================================================================
+
+    def _validate(self, member: PooledConnection) -> bool:
+        """Lifetime and idle-ping checks performed on checkout."""
+        if self.max_lifetime and member.age > self.max_lifetime:
+            with self._cond:
+                self._recycled += 1
+            logger.info(f"ConnectionPool[{self.name}] recycling member {member.member_id} after {member.age:.0f}s")
+            return False
+        if self._is_closed(member):
+            return False
+        if self.idle_ping and member.idle_for > self.idle_ping:
+            try:
+                cursor = member.connection.cursor()
+                try:
+                    cursor.execute(self.ping_query)
+                    cursor.fetchall()
+                finally:
+                    cursor.close()
+            except Exception as e:
+                with self._cond:
+                    self._ping_failures += 1
+                logger.warning(f"ConnectionPool[{self.name}] ping failed on member {member.member_id}: {e}")
+                return False
+        return True
+
+    def _replace(self, member: PooledConnection) -> Optional[PooledConnection]:
+        self._close_connection(member)
+        return self._create_member()
+
+    def _create_member(self) -> Optional[PooledConnection]:
+        try:
+            connection = self.factory()
+        except Exception as e:
+            with self._cond:
+                self._create_failures += 1
+            logger.error(f"ConnectionPool[{self.name}] failed to open connection: {e}")
+            return None
+        with self._cond:
+            self._next_id += 1
+            self._created += 1
+            member_id = self._next_id
+        return PooledConnection(connection, member_id)
+
+    def _release_slot(self):
+        with self._cond:
+            self._open -= 1
+            self._in_use -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _is_closed(member: PooledConnection) -> bool:
+        is_closed = getattr(member.connection, "is_closed", None)
+        try:
+            return bool(is_closed()) if callable(is_closed) else False
+        except Exception:
+            return True
+
+    @staticmethod
+    def _close_connection(member: PooledConnection):
+        try:
+            member.connection.close()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool utilization and wait metrics."""
+        with self._cond:
+            return {
+                "name": self.name,
+                "size": self.size,
+                "open": self._open,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "utilization": round(self._in_use / self.size, 3),
+                "checkouts": self._checkouts,
+                "waited_checkouts": self._waits,
+                "avg_wait_ms": round(self._total_wait / self._checkouts * 1000, 2) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 2),
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "recycled": self._recycled,
+                "ping_failures": self._ping_failures,
+                "rebuilds": self._rebuilds,
+                "create_failures": self._create_failures
+            }
@@ -0,0 +1,72 @@
+"""
+ATLAS Capital Delivery - Time Series Downsampling
+
+Largest-Triangle-Three-Buckets (LTTB, Steinarsson 2013) for chart series:
+keeps the first and last points and, from each bucket in between, the point
+forming the largest triangle with the previously kept point and the next
+bucket's average. Peaks, troughs and S-curve knees survive at a few hundred
+points where uniform sampling would flatten them.
+
+`lttb_indices` works on one series; `downsample_columns` keeps the union of
+the points each series needs, so every line of a multi-series chart (PV, EV,
+AC, CPI, SPI) keeps its shape while all of them share one x axis.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+# Below this LTTB cannot do better than returning the points as they are
+MIN_POINTS = 3
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[Optional[float]], threshold: int) -> List[int]:
+    """Indices of the points LTTB keeps (ascending); None values count as 0."""
+    n = len(x)
+    if threshold >= n or threshold < MIN_POINTS:
+        return list(range(n))
+    ys = [value or 0.0 for value in y]
+
+    kept = [0]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+        # Average of the next bucket (the last point for the final bucket)
+        next_start, next_end = end, min(int((i + 2) * bucket) + 1, n)
+        if next_start >= next_end:
+            avg_x, avg_y = x[n - 1], ys[n - 1]
+        else:
+            count = next_end - next_start
+            avg_x = sum(x[next_start:next_end]) / count
+            avg_y = sum(ys[next_start:next_end]) / count
+
+        ax, ay = x[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, min(end, n - 1)):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+def downsample_columns(
+    x: Sequence[float], columns: Dict[str, Sequence[Any]], max_points: int
+) -> List[int]:
+    """
+    Indices to keep for a chart of several series over `x`, at most
+    `max_points`: each series gets an equal share of LTTB points and the
+    union is returned in order.
+    """
+    if len(x) <= max_points or not columns:
+        return list(range(len(x)))
+    share = max(MIN_POINTS, max_points // len(columns))
+    kept = set()
+    for values in columns.values():
+        kept.update(lttb_indices(x, values, share))
+    if len(kept) > max_points:
+        # Too small a budget to share - follow the first series alone
+        return lttb_indices(x, next(iter(columns.values())), max_points)
+    return sorted(kept)
@@ -0,0 +1,72 @@
+"""
+ATLAS Capital Delivery - Sparse Fieldsets
+
+`fields=` support for list endpoints: each entity declares an allow-list of
+selectable fields (API name -> SQL expression). Requested fields are
+validated, put in canonical order and pushed down into the SELECT list, so
+unrequested columns are neither scanned nor shipped. The field signature is
+part of the statement name and SQL text, and so of every cache key.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Fields = Optional[Tuple[str, ...]]
+
+
+class InvalidFieldError(ValueError):
+    """Raised for a field outside an entity's allow-list."""
+
+
+def parse_fields(value: Optional[str]) -> Fields:
+    """Parse a `fields=a,b,c` query value (case-insensitive); None means the default set."""
+    if value is None or not value.strip():
+        return None
+    return tuple(part.strip().upper() for part in value.split(",") if part.strip())
+
+
+class FieldSet:
+    """
+    Selectable fields of one entity.
+
+        CHANGE_ORDER_FIELDS = FieldSet("change order", [("CO_ID", "co.CO_ID"), ...], required=["CO_ID"])
+        select_list = CHANGE_ORDER_FIELDS.select_list(("CO_ID", "APPROVED_AMOUNT"))
+    """
+
+    def __init__(
+        self,
+        entity: str,
+        columns: Sequence[Tuple[str, str]],
+        default: Optional[Sequence[str]] = None,
+        required: Sequence[str] = ()
+    ):
+        self.entity = entity
+        self.columns: Dict[str, str] = dict(columns)
+        self.order = [name for name, _ in columns]
+        self.default = tuple(default) if default is not None else tuple(self.order)
+        self.required = tuple(required)
+
+    def resolve(self, fields: Fields, required: Sequence[str] = ()) -> Tuple[str, ...]:
+        """Validated field names in canonical order; None selects the default set."""
+        if not fields:
+            return self.default
+        unknown = sorted(set(fields) - self.columns.keys())
+        if unknown:
+            raise InvalidFieldError(
+                f"Unknown {self.entity} field(s): {', '.join(unknown)} "
+                f"(allowed: {', '.join(self.order)})"
+            )
+        wanted = set(fields) | set(self.required) | set(required)
+        return tuple(name for name in self.order if name in wanted)
+
+    def signature(self, names: Tuple[str, ...]) -> str:
+        """Short stable label for statement names."""
+        return "default" if names == self.default else "+".join(names)
+
+    def select_list(self, names: Tuple[str, ...]) -> str:
+        return ",\n            ".join(
+            expr if expr.rsplit(".", 1)[-1] == name else f"{expr} AS {name}"
+            for name, expr in ((name, self.columns[name]) for name in names)
+        )
+
+    def allowed(self) -> List[str]:
+        return list(self.order)
@@ -0,0 +1,148 @@
+"""
+ATLAS Capital Delivery - Map Spatial Index
+
+In-memory index over the MAP_DATA view for viewport queries:
+- points are kept sorted by longitude, so a bounding box is two bisects plus
+  a latitude filter
+- grid clusters are precomputed for every zoom level when the index is
+  built: cells are 1/CELLS_PER_TILE of a map tile wide, so a viewport holds
+  a bounded number of them whatever the portfolio size
+
+A viewport query returns individual projects when few enough are visible
+(or at street zoom), otherwise clusters with count, budget sum and worst risk.
+"""
+
+import bisect
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+MAX_ZOOM = 22
+# Zoom at and above which projects are never clustered
+CLUSTER_MAX_ZOOM = 14
+# Clusters per tile width (256 px tiles -> 64 px cells)
+CELLS_PER_TILE = 4
+# Visible projects returned individually up to this many
+POINT_LIMIT = 300
+
+RISK_ORDER = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+# (west, south, east, north); west > east crosses the antimeridian
+BBox = Tuple[float, float, float, float]
+WORLD: BBox = (-180.0, -90.0, 180.0, 90.0)
+
+
+def parse_bbox(value: Optional[str]) -> BBox:
+    """Parse "west,south,east,north" (degrees); raises ValueError."""
+    if not value:
+        return WORLD
+    try:
+        west, south, east, north = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be 'west,south,east,north'")
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError("bbox is out of range")
+    return west, south, east, north
+
+
+def validate_zoom(zoom: Optional[int]) -> int:
+    if zoom is None:
+        return 0
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValueError(f"zoom must be between 0 and {MAX_ZOOM}")
+    return zoom
+
+
+def _lng_ranges(bbox: BBox) -> List[Tuple[float, float]]:
+    west, _, east, _ = bbox
+    return [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+
+
+def _cell_size(zoom: int) -> float:
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+
+class GeoIndex:
+    """
+    Spatial index over map items ({"id", "lat", "lng", "budget", "riskLevel", ...}).
+
+        index = GeoIndex(items)
+        view = index.query(parse_bbox("-125,30,-110,50"), zoom=6)
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]]):
+        self.items = sorted(
+            (item for item in items if item.get("lat") is not None and item.get("lng") is not None),
+            key=lambda item: item["lng"]
+        )
+        self._lngs = [item["lng"] for item in self.items]
+        self._clusters: List[Dict[Tuple[int, int], Dict[str, Any]]] = [
+            self._build_clusters(zoom) for zoom in range(CLUSTER_MAX_ZOOM)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _build_clusters(self, zoom: int) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        size = _cell_size(zoom)
+        cells: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        for item in self.items:
+            key = (math.floor((item["lng"] + 180.0) / size), math.floor((item["lat"] + 90.0) / size))
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = {"count": 0, "budget": 0.0, "lat": 0.0, "lng": 0.0, "risk": 0, "members": []}
+            cell["count"] += 1
+            cell["budget"] += item.get("budget") or 0.0
+            cell["lat"] += item["lat"]
+            cell["lng"] += item["lng"]
+            cell["risk"] = max(cell["risk"], RISK_ORDER.get(item.get("riskLevel"), 0))
+            if cell["count"] <= 1:
+                cell["members"].append(item)
+            else:
+                cell["members"] = []  # only single-project cells keep their item
+        for (ix, iy), cell in cells.items():
+            west, south = ix * size - 180.0, iy * size - 90.0
+            cell["bounds"] = (west, south, west + size, south + size)
+        return cells
+
+    def within(self, bbox: BBox) -> List[Dict[str, Any]]:
+        """Projects inside `bbox`."""
+        _, south, _, north = bbox
+        found = []
+        for low, high in _lng_ranges(bbox):
+            start = bisect.bisect_left(self._lngs, low)
+            end = bisect.bisect_right(self._lngs, high)
+            found.extend(item for item in self.items[start:end] if south <= item["lat"] <= north)
+        return found
+
+    @staticmethod
+    def _intersects(bounds: Sequence[float], bbox: BBox) -> bool:
+        west, south, east, north = bounds
+        if north < bbox[1] or south > bbox[3]:
+            return False
+        return any(east >= low and west <= high for low, high in _lng_ranges(bbox))
+
+    def query(self, bbox: BBox, zoom: int, point_limit: int = POINT_LIMIT) -> Dict[str, Any]:
+        """Projects or clusters visible in `bbox` at `zoom`."""
+        visible = self.within(bbox)
+        view = {"zoom": zoom, "bbox": list(bbox), "total": len(visible)}
+        if zoom >= CLUSTER_MAX_ZOOM or len(visible) <= point_limit:
+            return {**view, "mode": "projects", "projects": visible, "clusters": []}
+
+        projects, clusters = [], []
+        risk_names = {rank: name for name, rank in RISK_ORDER.items()}
+        for (ix, iy), cell in self._clusters[zoom].items():
+            if not self._intersects(cell["bounds"], bbox):
+                continue
+            if cell["count"] == 1:
+                projects.extend(cell["members"])
+                continue
+            clusters.append({
+                "id": f"{zoom}/{ix}/{iy}",
+                "lat": cell["lat"] / cell["count"],
+                "lng": cell["lng"] / cell["count"],
+                "count": cell["count"],
+                "budget": cell["budget"],
+                "worstRisk": risk_names[cell["risk"]],
+                "bounds": list(cell["bounds"])
+            })
+        return {**view, "mode": "clusters", "projects": projects, "clusters": clusters}
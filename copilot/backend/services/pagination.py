@@ -0,0 +1,78 @@
+"""
+ATLAS Capital Delivery - Keyset Pagination
+
+Seek-style pagination for large lists: each page continues strictly after the
+(sort value, id) of the previous page's last row, so page N costs the same as
+page 1 and rows never shift between pages the way OFFSET does.
+
+Cursors are opaque URL-safe tokens encoding that (sort value, id) pair.
+"""
+
+import base64
+import binascii
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a malformed or foreign pagination cursor."""
+
+
+def page_size(limit: Optional[int]) -> int:
+    """Validate a requested page size."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    limit = int(limit)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque token for a row's keyset values (Decimals kept exact as strings)."""
+    payload = [str(v) if isinstance(v, Decimal) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, types: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """Decode a cursor, converting each value with the matching type."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("unexpected cursor layout")
+        return [convert(value) for convert, value in zip(types, values)]
+    except (binascii.Error, UnicodeDecodeError, InvalidOperation, TypeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {e}")
+
+
+def keyset_predicate(sort_expr: str, id_expr: str) -> str:
+    """
+    WHERE fragment for "after (sort value, id)" under
+    ORDER BY <sort_expr> DESC, <id_expr> ASC. Binds: value, value, id.
+    """
+    return f"({sort_expr} < ? OR ({sort_expr} = ? AND {id_expr} > ?))"
+
+
+def keyset_params(after: Sequence[Any]) -> List[Any]:
+    value, row_id = after
+    return [value, value, row_id]
+
+
+def make_page(rows: List[Dict[str, Any]], limit: int, key: Callable[[Dict[str, Any]], Tuple[Any, Any]]) -> Dict[str, Any]:
+    """
+    Build a page from up to limit + 1 fetched rows; the extra row only signals
+    that another page exists.
+    """
+    items = rows[:limit]
+    has_more = len(rows) > limit
+    return {
+        "items": items,
+        "count": len(items),
+        "next_cursor": encode_cursor(key(items[-1])) if has_more and items else None
+    }
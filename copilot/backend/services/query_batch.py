@@ -0,0 +1,311 @@
+"""
+ATLAS Capital Delivery - Query Batches
+
+Runs several independent statements concurrently and hands results back as
+each one finishes, so a composite endpoint costs roughly its slowest query
+instead of the sum of all of them.
+
+- Connector path: statements are submitted with `cursor.execute_async` on one
+  pooled connection and their query IDs are polled together
+- Fallback (Snowpark session / snow CLI): statements run on a small thread
+  pool owned by the batch
+- One deadline for the whole batch; statements still running when it passes
+  are cancelled and resolve to an empty result
+- Statements added with `tables=` are answered from the result cache when fresh
+"""
+
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+from .connection_pool import ConnectionPool
+from .query_executor import DEFAULT_QUERY_TIMEOUT
+from .result_cache import Versions, fresh_only, query_key
+from .result_decoding import empty_result, fetch_cursor, validate_shape
+from .statements import Params
+from .telemetry import get_query_telemetry
+
+logger = logging.getLogger(__name__)
+
+# Query status polling backs off from the first interval to the max
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
+
+# Thread fallback concurrency (Snowpark session / snow CLI)
+FALLBACK_WORKERS = 4
+
+
+class _BatchStatement:
+    __slots__ = ("name", "query", "params", "shape", "tables", "key", "versions", "span")
+
+    def __init__(self, name: str, query: str, params: Params, shape: str, tables: Optional[Sequence[str]]):
+        self.name = name
+        self.query = query
+        self.params = list(params) if params else None
+        self.shape = shape
+        self.tables = tables
+        self.key: Optional[Hashable] = None
+        self.versions: Versions = None
+        self.span: Any = None
+
+
+class QueryBatch:
+    """
+    A set of named, independent statements executed concurrently.
+
+        batch = sf.batch().add("summary", sql_a).add("projects", sql_b, tables=[...])
+        for name, rows in batch.as_completed():
+            ...
+        results = batch.run()   # or {name: result} once everything finished
+
+    Failed or timed-out statements yield an empty result (the service's usual
+    error semantics); their names are listed in `failed` / `timed_out`. Under
+    require_fresh(), run() raises instead when any statement did not finish.
+    """
+
+    def __init__(self, service: Any, timeout: Optional[float] = None):
+        self.service = service
+        self.timeout = timeout if timeout is not None else DEFAULT_QUERY_TIMEOUT
+        self._statements: List[_BatchStatement] = []
+        self.failed: List[str] = []
+        self.timed_out: List[str] = []
+        self.cached: List[str] = []
+        self.elapsed_ms: Optional[float] = None
+
+    def add(
+        self,
+        name: str,
+        query: str,
+        params: Params = None,
+        shape: str = "records",
+        tables: Optional[Sequence[str]] = None
+    ) -> "QueryBatch":
+        """
+        Add a statement. `tables` ("SCHEMA.TABLE") makes it cacheable in the
+        service's result cache, exactly like `_cached_query`.
+        """
+        if any(s.name == name for s in self._statements):
+            raise ValueError(f"Duplicate batch statement name '{name}'")
+        self._statements.append(_BatchStatement(name, query, params, validate_shape(shape), tables))
+        return self
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def run(self) -> Dict[str, Any]:
+        """Execute the batch and return {name: result} once every statement finished."""
+        results = dict(self.as_completed())
+        if fresh_only() and (self.failed or self.timed_out):
+            raise RuntimeError(
+                f"Query batch incomplete (failed: {self.failed}, timed out: {self.timed_out})"
+            )
+        return results
+
+    async def run_async(self) -> Dict[str, Any]:
+        """Execute the batch on the service's QueryExecutor without blocking the event loop."""
+        # The batch enforces its own deadline; the executor's is only a backstop
+        return await self.service.executor.run(self.run, timeout=self.timeout + 5, label="query_batch")
+
+    def as_completed(self) -> Iterator[Tuple[str, Any]]:
+        """Yield (name, result) pairs in completion order."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        try:
+            pending = []
+            for statement in self._statements:
+                cached = self._from_cache(statement)
+                if cached is not None:
+                    self.cached.append(statement.name)
+                    yield statement.name, cached
+                else:
+                    pending.append(statement)
+
+            if not pending:
+                return
+            if self.service.pool:
+                yield from self._run_pooled(pending, deadline)
+            else:
+                yield from self._run_threaded(pending, deadline)
+        finally:
+            self.elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+            logger.debug(
+                f"Query batch of {len(self._statements)} finished in {self.elapsed_ms} ms "
+                f"(cached={len(self.cached)}, failed={len(self.failed)}, timed_out={len(self.timed_out)})"
+            )
+
+    # =========================================================================
+    # Result cache
+    # =========================================================================
+
+    def _from_cache(self, statement: _BatchStatement) -> Optional[Any]:
+        if not statement.tables:
+            return None
+        statement.versions = self.service.table_versions.versions(statement.tables)
+        statement.key = query_key(statement.query, statement.params, statement.shape)
+        return self.service.result_cache.get(statement.key, statement.versions)
+
+    def _done(self, statement: _BatchStatement, result: Any) -> Tuple[str, Any]:
+        if statement.key is not None:
+            self.service.result_cache.put(statement.key, statement.versions, result)
+        return statement.name, result
+
+    def _give_up(self, statements: Sequence[_BatchStatement], reason: List[str]) -> Iterator[Tuple[str, Any]]:
+        for statement in statements:
+            reason.append(statement.name)
+            self._finish_span(statement, "timed out" if reason is self.timed_out else "failed")
+            yield statement.name, empty_result(statement.shape)
+
+    @staticmethod
+    def _finish_span(statement: _BatchStatement, error: Optional[str] = None):
+        if statement.span is None:
+            return
+        if error:
+            statement.span.fail(error)
+        get_query_telemetry().finish(statement.span)
+        statement.span = None
+
+    # =========================================================================
+    # Connector path - execute_async + query ID polling
+    # =========================================================================
+
+    def _run_pooled(self, pending: List[_BatchStatement], deadline: float) -> Iterator[Tuple[str, Any]]:
+        pool: ConnectionPool = self.service.pool
+        try:
+            member = pool.checkout(timeout=max(deadline - time.monotonic(), 0.001))
+        except Exception as e:
+            logger.error(f"Batch pool checkout failed: {e}")
+            yield from self._give_up(pending, self.failed)
+            return
+
+        submitted: Dict[str, _BatchStatement] = {}
+        discard = False
+        try:
+            for statement in pending:
+                query_id = self._submit(member, statement)
+                if query_id is None:
+                    yield from self._give_up([statement], self.failed)
+                else:
+                    submitted[query_id] = statement
+
+            interval = POLL_INTERVAL
+            while submitted:
+                for query_id, statement in list(submitted.items()):
+                    connection = member.connection
+                    try:
+                        status = connection.get_query_status_throw_if_error(query_id)
+                        if connection.is_still_running(status):
+                            continue
+                        del submitted[query_id]
+                        # Submit -> done covers warehouse execution
+                        statement.span.add("execute", time.monotonic() - statement.span.started)
+                        result = self._collect(connection, query_id, statement)
+                    except Exception as e:
+                        submitted.pop(query_id, None)
+                        logger.error(f"Batch statement '{statement.name}' failed: {e}")
+                        yield from self._give_up([statement], self.failed)
+                        continue
+                    self._finish_span(statement)
+                    yield self._done(statement, result)
+
+                if not submitted:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Query batch deadline passed with {len(submitted)} statement(s) running")
+                    self._cancel(member, submitted)
+                    outstanding = list(submitted.values())
+                    submitted.clear()
+                    yield from self._give_up(outstanding, self.timed_out)
+                    break
+                time.sleep(min(interval, remaining))
+                interval = min(interval * 2, MAX_POLL_INTERVAL)
+        except Exception as e:
+            logger.error(f"Query batch failed: {e}")
+            discard = ConnectionPool._is_closed(member)
+            outstanding = list(submitted.values())
+            submitted.clear()
+            yield from self._give_up(outstanding, self.failed)
+        finally:
+            # Abandoned generator (consumer stopped early) - don't leave queries running
+            if submitted:
+                self._cancel(member, submitted)
+            pool.checkin(member, discard=discard)
+
+    def _submit(self, member: Any, statement: _BatchStatement) -> Optional[str]:
+        """Submit one statement asynchronously; rebuild an expired member once."""
+        for attempt in (1, 2):
+            cursor = member.connection.cursor()
+            try:
+                self.service.statements.record(statement.query, member.member_id)
+                if statement.span is None:
+                    statement.span = get_query_telemetry().start(statement.query, path="batch")
+                cursor.execute_async(statement.query, statement.params)
+                return cursor.sfqid
+            except Exception as e:
+                if attempt == 1 and self.service._is_token_expired(e):
+                    logger.info(f"Token expired on pool member {member.member_id}, rebuilding it")
+                    if self.service.pool.rebuild(member):
+                        continue
+                logger.error(f"Batch statement '{statement.name}' submit failed: {e}")
+                self._finish_span(statement, str(e))
+                return None
+            finally:
+                cursor.close()
+        return None
+
+    @staticmethod
+    def _collect(connection: Any, query_id: str, statement: _BatchStatement) -> Any:
+        cursor = connection.cursor()
+        try:
+            cursor.get_results_from_sfqid(query_id)
+            return fetch_cursor(cursor, statement.shape, statement.span)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _cancel(member: Any, submitted: Dict[str, _BatchStatement]):
+        cursor = member.connection.cursor()
+        try:
+            for query_id in submitted:
+                try:
+                    cursor.execute("SELECT SYSTEM$CANCEL_QUERY(?)", [query_id])
+                except Exception as e:
+                    logger.warning(f"Could not cancel query {query_id}: {e}")
+        finally:
+            cursor.close()
+
+    # =========================================================================
+    # Fallback - thread pool owned by the batch
+    # =========================================================================
+
+    def _run_threaded(self, pending: List[_BatchStatement], deadline: float) -> Iterator[Tuple[str, Any]]:
+        workers = ThreadPoolExecutor(
+            max_workers=min(len(pending), FALLBACK_WORKERS), thread_name_prefix="atlas-batch"
+        )
+        futures = {
+            # One context copy per task (a Context cannot be entered concurrently)
+            workers.submit(
+                contextvars.copy_context().run,
+                self.service.execute_query, s.query, s.params, s.shape, raise_errors=True
+            ): s
+            for s in pending
+        }
+        try:
+            for future in as_completed(futures, timeout=max(deadline - time.monotonic(), 0)):
+                statement = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Batch statement '{statement.name}' failed: {e}")
+                    yield from self._give_up([statement], self.failed)
+                    continue
+                yield self._done(statement, result)
+        except FutureTimeoutError:
+            logger.warning(f"Query batch deadline passed with {len(futures)} statement(s) running")
+            outstanding = list(futures.values())
+            futures.clear()
+            yield from self._give_up(outstanding, self.timed_out)
+        finally:
+            workers.shutdown(wait=False, cancel_futures=True)
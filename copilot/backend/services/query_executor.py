@@ -0,0 +1,184 @@
+"""
+ATLAS Capital Delivery - Query Executor
+
+Runs blocking Snowflake calls (Snowpark collect, connector fetch, snow CLI)
+on a bounded thread pool so async FastAPI handlers never stall the event loop.
+Every call carries a deadline that covers both queue wait and execution;
+statements issued by the call read it through remaining_time() so the
+warehouse aborts them when it passes.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from .telemetry import call_scope
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = int(os.environ.get("ATLAS_QUERY_WORKERS", "8"))
+DEFAULT_MAX_QUEUE = int(os.environ.get("ATLAS_QUERY_MAX_QUEUE", "256"))
+DEFAULT_QUERY_TIMEOUT = float(os.environ.get("ATLAS_QUERY_TIMEOUT", "60"))
+
+# Monotonic deadline of the executor call running on this thread
+_deadline: ContextVar[Optional[float]] = ContextVar("atlas_query_deadline", default=None)
+
+
+class QueryTimeoutError(TimeoutError):
+    """Raised when a query misses its deadline, either queued or running."""
+
+
+class QueryQueueFullError(RuntimeError):
+    """Raised when the executor queue is already at its configured depth."""
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current executor call's deadline (None outside a call)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class QueryExecutor:
+    """
+    Bounded executor for blocking warehouse calls.
+
+    - Fixed number of worker threads (one in-flight query per worker)
+    - Bounded queue; submissions beyond it fail fast
+    - Per-call deadline; calls whose deadline passes while queued never run,
+      statements still running at the deadline are cancelled on the warehouse
+    - Queue depth / wait time metrics for /api/diagnostics
+    - Queries issued by a call are attributed to it in query telemetry
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        default_timeout: float = DEFAULT_QUERY_TIMEOUT
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="atlas-query")
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._queued = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._timed_out = 0
+        self._rejected = 0
+        self._max_queue_depth = 0
+        self._total_queue_wait = 0.0
+        self._max_queue_wait = 0.0
+
+        logger.info(f"QueryExecutor initialized: workers={max_workers}, max_queue={max_queue}, timeout={default_timeout}s")
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        timeout: Optional[float] = None,
+        label: Optional[str] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Run a blocking callable on the pool and await its result within the deadline.
+        `label` names the call in query telemetry (default: the callable's name).
+        """
+        loop = asyncio.get_running_loop()
+        timeout = timeout if timeout is not None else self.default_timeout
+        enqueued = time.monotonic()
+        deadline = enqueued + timeout
+
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise QueryQueueFullError(f"Query queue full ({self._queued} waiting)")
+            self._queued += 1
+            self._submitted += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queued)
+
+        # Carry request-scoped context vars into the worker thread
+        ctx = contextvars.copy_context()
+
+        def _task():
+            started = time.monotonic()
+            wait = started - enqueued
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_queue_wait += wait
+                self._max_queue_wait = max(self._max_queue_wait, wait)
+            try:
+                if started >= deadline:
+                    raise QueryTimeoutError(f"Query deadline expired after {wait:.2f}s in queue")
+                return ctx.run(self._call, fn, args, kwargs, label or getattr(fn, "__name__", "call"), wait, deadline)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        future = loop.run_in_executor(self._pool, _task)
+        try:
+            # Shield so a timed-out caller does not cancel a queued task
+            # (which would skip the queue accounting in _task)
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=max(deadline - time.monotonic(), 0))
+        except QueryTimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise QueryTimeoutError(f"Query exceeded {timeout:.1f}s deadline")
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+
+        with self._lock:
+            self._completed += 1
+        return result
+
+    @staticmethod
+    def _call(
+        fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any], label: str, wait: float, deadline: float
+    ) -> Any:
+        token = _deadline.set(deadline)
+        try:
+            with call_scope(label, wait):
+                return fn(*args, **kwargs)
+        finally:
+            _deadline.reset(token)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of executor metrics."""
+        with self._lock:
+            started = self._submitted - self._queued
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "default_timeout_s": self.default_timeout,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "max_queue_depth": self._max_queue_depth,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "timed_out": self._timed_out,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": round(self._total_queue_wait / started * 1000, 2) if started > 0 else 0.0,
+                "max_queue_wait_ms": round(self._max_queue_wait * 1000, 2)
+            }
+
+    def shutdown(self):
+        """Stop accepting work and release worker threads."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
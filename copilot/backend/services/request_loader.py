@@ -0,0 +1,94 @@
+"""
+ATLAS Capital Delivery - Request-Scoped Loader
+
+Within one API request, identical service reads are issued once: the first
+caller starts the load and later callers with the same (method, arguments)
+await the same task. Independent reads started together (asyncio.gather)
+run concurrently on the QueryExecutor.
+
+The loader lives in a ContextVar set for each HTTP request by
+RequestLoaderMiddleware, so agents share it without being handed anything.
+Loaded values are shared between callers and are read-only, like result
+cache entries.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+_current: ContextVar[Optional["RequestLoader"]] = ContextVar("atlas_request_loader", default=None)
+
+
+def call_key(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[Hashable]:
+    """Memoization key for a call, or None when an argument is unhashable."""
+    key = (name, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class RequestLoader:
+    """Per-request memo of in-flight and finished service reads."""
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self.started = time.monotonic()
+        self.loads = 0      # distinct reads issued
+        self.shared = 0     # calls answered by an earlier identical read
+
+    async def load(self, key: Optional[Hashable], factory: Callable[[], Awaitable[Any]]) -> Any:
+        if key is None:
+            self.loads += 1
+            return await factory()
+        task = self._tasks.get(key)
+        if task is None:
+            self.loads += 1
+            task = self._tasks[key] = asyncio.ensure_future(factory())
+        else:
+            self.shared += 1
+        # A cancelled caller must not cancel the read for the others sharing it
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loads": self.loads,
+            "shared": self.shared,
+            "elapsed_ms": round((time.monotonic() - self.started) * 1000, 1)
+        }
+
+
+def current_loader() -> Optional[RequestLoader]:
+    return _current.get()
+
+
+@contextmanager
+def request_scope() -> Iterator[RequestLoader]:
+    """Activate a loader for the enclosed code; reuses the request's loader if one is active."""
+    loader = _current.get()
+    if loader is not None:
+        yield loader
+        return
+    loader = RequestLoader()
+    token = _current.set(loader)
+    try:
+        yield loader
+    finally:
+        _current.reset(token)
+
+
+class RequestLoaderMiddleware:
+    """ASGI middleware giving every HTTP request its own RequestLoader (WebSockets excluded)."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with request_scope():
+            await self.app(scope, receive, send)
@@ -0,0 +1,362 @@
+"""
+ATLAS Capital Delivery - Versioned Result Cache
+
+In-memory cache for read-mostly service queries. Entries are keyed by
+normalized SQL and tagged with the data version (INFORMATION_SCHEMA
+LAST_ALTERED) of every table they read, so a data load invalidates them
+automatically.
+
+- LRU eviction bounded by (estimated) bytes
+- Stale-while-revalidate: a stale entry may be served while one background
+  refresh reloads it (not for reads under require_fresh(), whose response
+  carries validators built from the current table versions)
+- Loaders raise on failure, so errors are never cached; empty results are
+  cached like any other
+- Hit / miss / stale-hit / eviction counters
+- Optional SharedResultStore tier (multi-worker): misses and refreshes go
+  through the host-wide store, so one worker loads each result per data
+  version and the others reuse it
+"""
+
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator, Optional, Sequence, Set, Tuple
+
+if TYPE_CHECKING:
+    from .shared_cache import SharedEntry, SharedResultStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get("ATLAS_RESULT_CACHE_MB", "64")) * 1024 * 1024)
+DEFAULT_STALE_WHILE_REVALIDATE = float(os.environ.get("ATLAS_RESULT_CACHE_SWR", "300"))
+DEFAULT_FALLBACK_TTL = float(os.environ.get("ATLAS_RESULT_CACHE_TTL", "60"))
+DEFAULT_VERSION_POLL_INTERVAL = float(os.environ.get("ATLAS_VERSION_POLL_INTERVAL", "5"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+Versions = Optional[Tuple[Tuple[str, str], ...]]
+
+# Set per request by conditional GETs: an ETag built from the current table
+# versions must not label a stale entry's data
+_fresh_only: contextvars.ContextVar[bool] = contextvars.ContextVar("atlas_cache_fresh_only", default=False)
+
+
+def require_fresh():
+    """
+    Reads in the current context skip stale-while-revalidate, and the
+    service raises their errors instead of returning empty results.
+    """
+    _fresh_only.set(True)
+
+
+@contextmanager
+def fresh_reads() -> Iterator[None]:
+    """require_fresh() for the enclosed code only."""
+    token = _fresh_only.set(True)
+    try:
+        yield
+    finally:
+        _fresh_only.reset(token)
+
+
+def fresh_only() -> bool:
+    return _fresh_only.get()
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace so formatting differences share one cache entry."""
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def query_key(sql: str, params: Optional[Sequence[Any]] = None, shape: str = "records") -> Hashable:
+    """Cache key for a query: normalized text, bind values and result shape."""
+    return (normalize_sql(sql), tuple(params or ()), shape)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory footprint of a result via its JSON length."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+# =============================================================================
+# Table Versions
+# =============================================================================
+
+
+class TableVersionTracker:
+    """
+    Tracks per-table data versions (LAST_ALTERED timestamps).
+
+    `fetch` returns {"SCHEMA.TABLE": "<last altered>"} for every tracked table
+    in one cheap INFORMATION_SCHEMA query. Versions are re-read at most every
+    `poll_interval` seconds, in the background once an initial set is known.
+    """
+
+    def __init__(self, fetch: Callable[[], Dict[str, str]], poll_interval: float = DEFAULT_VERSION_POLL_INTERVAL):
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self._versions: Dict[str, str] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refreshes = 0
+        self._failures = 0
+
+    def versions(self, tables: Sequence[str]) -> Versions:
+        """Version tuple for `tables`, or None when versions are unavailable."""
+        self._maybe_refresh()
+        with self._lock:
+            if not self._versions:
+                return None
+            return tuple((t, self._versions.get(t.upper(), "")) for t in sorted(tables))
+
+    def last_altered(self, tables: Sequence[str]) -> Optional[str]:
+        """Most recent LAST_ALTERED across `tables` (ISO string), if known."""
+        versions = self.versions(tables)
+        if not versions:
+            return None
+        return max(v for _, v in versions) or None
+
+    def invalidate(self):
+        """Force the next lookup to re-read versions."""
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def _maybe_refresh(self):
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.poll_interval or self._refreshing:
+                return
+            self._refreshing = True
+            background = bool(self._versions)
+        if background:
+            threading.Thread(target=self._refresh, name="atlas-table-versions", daemon=True).start()
+        else:
+            self._refresh()
+
+    def _refresh(self):
+        try:
+            versions = self.fetch()
+        except Exception as e:
+            versions = {}
+            logger.warning(f"Table version refresh failed: {e}")
+        with self._lock:
+            self._refreshing = False
+            self._loaded_at = time.monotonic()
+            if versions:
+                self._versions = {k.upper(): v for k, v in versions.items()}
+                self._refreshes += 1
+            else:
+                self._failures += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tables": len(self._versions),
+                "refreshes": self._refreshes,
+                "failures": self._failures,
+                "age_s": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None
+            }
+
+
+# =============================================================================
+# Result Cache
+# =============================================================================
+
+
+class _Entry:
+    __slots__ = ("value", "versions", "size", "created")
+
+    def __init__(self, value: Any, versions: Versions, size: int, created: Optional[float] = None):
+        self.value = value
+        self.versions = versions
+        self.size = size
+        self.created = time.monotonic() if created is None else created
+
+    @classmethod
+    def from_shared(cls, shared: "SharedEntry") -> "_Entry":
+        # Wall-clock age in the store -> local monotonic creation time
+        age = max(0.0, time.time() - shared.created)
+        return cls(shared.value, shared.versions, shared.size, time.monotonic() - age)
+
+
+class ResultCache:
+    """
+    Byte-bounded LRU of query results tagged with table versions.
+
+    Returned values are shared between callers and must be treated as read-only.
+    With a `shared` store, local misses and refreshes are resolved through it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        stale_while_revalidate: float = DEFAULT_STALE_WHILE_REVALIDATE,
+        fallback_ttl: float = DEFAULT_FALLBACK_TTL,
+        shared: Optional["SharedResultStore"] = None
+    ):
+        self.shared = shared
+        self.max_bytes = max_bytes
+        self.stale_while_revalidate = stale_while_revalidate
+        self.fallback_ttl = fallback_ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing: Set[Hashable] = set()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="atlas-cache-refresh")
+
+        # Metrics
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._refreshes = 0
+
+    def get_or_load(self, key: Hashable, versions: Versions, loader: Callable[[], Any]) -> Any:
+        """Return a fresh cached value, a stale one (refreshing it), or load it."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._is_fresh(entry, versions):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return entry.value
+                if not _fresh_only.get() and time.monotonic() - entry.created <= self.stale_while_revalidate:
+                    self._entries.move_to_end(key)
+                    self._stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        # Keep the caller's context (telemetry attribution) for the reload
+                        self._refresher.submit(contextvars.copy_context().run, self._refresh, key, versions, loader)
+                    return entry.value
+            self._misses += 1
+
+        if self.shared is not None:
+            return self._load_shared(key, versions, loader, wait=True)
+        value = loader()
+        self.put(key, versions, value)
+        return value
+
+    def _load_shared(self, key: Hashable, versions: Versions, loader: Callable[[], Any], wait: bool) -> Any:
+        """
+        Resolve a local miss through the shared store: reuse a fresh entry,
+        else load under the key's lease. Without the lease, serve a stale
+        entry or (wait=True) wait for the leaseholder. Returns None when
+        wait=False and another worker is loading.
+        """
+        from .shared_cache import shared_key
+
+        skey = shared_key(key)
+        entry = self.shared.lookup(skey)
+        if entry is not None and self._is_fresh(_Entry.from_shared(entry), versions):
+            self._insert(key, _Entry.from_shared(entry))
+            return entry.value
+
+        if self.shared.acquire(skey):
+            try:
+                value = loader()
+                size = self.shared.put(skey, versions, value)
+                self._insert(key, _Entry(value, versions, size or estimate_size(value)))
+                return value
+            finally:
+                self.shared.release(skey)
+
+        # Another worker is loading this key
+        if entry is not None and not _fresh_only.get() and time.time() - entry.created <= self.stale_while_revalidate:
+            return entry.value
+        if not wait:
+            return None
+        entry = self.shared.wait_for(skey, lambda e: self._is_fresh(_Entry.from_shared(e), versions))
+        if entry is not None:
+            self._insert(key, _Entry.from_shared(entry))
+            return entry.value
+        # The leaseholder failed or gave up - load here
+        value = loader()
+        self.put(key, versions, value)
+        return value
+
+    def get(self, key: Hashable, versions: Versions) -> Optional[Any]:
+        """Return a fresh cached value, or None (counted as a miss) - never loads."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry, versions):
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.value
+            self._misses += 1
+            return None
+
+    def put(self, key: Hashable, versions: Versions, value: Any):
+        self._insert(key, _Entry(value, versions, estimate_size(value)))
+
+    def _insert(self, key: Hashable, entry: _Entry):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one entry, or everything when key is None (locally only)."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._bytes -= entry.size
+
+    def _is_fresh(self, entry: _Entry, versions: Versions) -> bool:
+        if versions is None or entry.versions is None:
+            # No version info - fall back to a plain TTL
+            return time.monotonic() - entry.created < self.fallback_ttl
+        return entry.versions == versions
+
+    def _refresh(self, key: Hashable, versions: Versions, loader: Callable[[], Any]):
+        try:
+            if self.shared is not None:
+                # Adopts another worker's refresh, or refreshes under the lease
+                self._load_shared(key, versions, loader, wait=False)
+            else:
+                self.put(key, versions, loader())
+            with self._lock:
+                self._refreshes += 1
+        except Exception as e:
+            logger.warning(f"Background cache refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._stale_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "refreshes": self._refreshes,
+                "hit_rate": round((self._hits + self._stale_hits) / lookups, 3) if lookups else 0.0,
+                "shared": self.shared is not None
+            }
@@ -0,0 +1,324 @@
+"""
+ATLAS Capital Delivery - Result Decoding
+
+Type-driven conversion of query results. Converters are chosen once per column
+from the cursor description (or Snowpark schema) instead of probing every cell,
+and results can be fetched as Arrow record batches. Date and timestamp columns
+of an Arrow result are formatted as ISO strings inside Arrow.
+
+Results can also be streamed batch by batch (iter_cursor / iter_snowpark),
+keeping memory bounded by the batch size rather than the result size.
+
+Output shapes:
+- "records": list of dicts (the historical API shape)
+- "columns": dict of column name -> list of values
+- "arrow":   pyarrow.Table (zero-copy from the connector's Arrow batches)
+"""
+
+import logging
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pc = None
+
+from .telemetry import NULL_SPAN
+
+logger = logging.getLogger(__name__)
+
+RESULT_SHAPES = ("records", "columns", "arrow")
+
+# Rows per yielded batch when streaming
+DEFAULT_BATCH_ROWS = 5000
+
+_END = object()
+
+# Snowflake connector type codes (snowflake.connector.constants.FIELD_ID_TO_NAME)
+# DATE, TIMESTAMP, TIMESTAMP_LTZ, TIMESTAMP_TZ, TIMESTAMP_NTZ, TIME
+TEMPORAL_TYPE_CODES = frozenset({3, 4, 6, 7, 8, 12})
+
+# Snowpark DataType class names that need ISO-8601 conversion
+TEMPORAL_SNOWPARK_TYPES = frozenset({"DateType", "TimestampType", "TimeType"})
+
+Converter = Optional[Callable[[Any], Any]]
+
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if value is not None else None
+
+
+def validate_shape(shape: str) -> str:
+    if shape not in RESULT_SHAPES:
+        raise ValueError(f"Unknown result shape '{shape}' (expected one of {', '.join(RESULT_SHAPES)})")
+    if shape == "arrow" and pa is None:
+        raise ValueError("Result shape 'arrow' requires pyarrow")
+    return shape
+
+
+def empty_result(shape: str, names: Sequence[str] = ()) -> Any:
+    """Empty result in the requested shape."""
+    if shape == "columns":
+        return {name: [] for name in names}
+    if shape == "arrow":
+        return pa.table({name: pa.array([], type=pa.null()) for name in names})
+    return []
+
+
+# =============================================================================
+# Converter selection (once per column)
+# =============================================================================
+
+
+def converters_for_description(description: Optional[Sequence[Any]]) -> List[Converter]:
+    """Pick a converter per column from a DB-API cursor description."""
+    if not description:
+        return []
+    return [_isoformat if desc[1] in TEMPORAL_TYPE_CODES else None for desc in description]
+
+
+def converters_for_snowpark_schema(schema: Any) -> List[Converter]:
+    """Pick a converter per column from a Snowpark StructType schema."""
+    return [
+        _isoformat if type(field.datatype).__name__ in TEMPORAL_SNOWPARK_TYPES else None
+        for field in schema.fields
+    ]
+
+
+def converters_for_arrow_schema(schema: Any) -> List[Converter]:
+    """Pick a converter per column from an Arrow schema."""
+    return [_isoformat if pa.types.is_temporal(field.type) else None for field in schema]
+
+
+# =============================================================================
+# Shaping
+# =============================================================================
+
+
+def _convert_columns(columns: List[List[Any]], converters: Sequence[Converter]) -> List[List[Any]]:
+    for i, convert in enumerate(converters):
+        if convert is not None:
+            columns[i] = [convert(v) for v in columns[i]]
+    return columns
+
+
+def _columns_to_shape(names: Sequence[str], columns: List[List[Any]], shape: str) -> Any:
+    if shape == "columns":
+        return dict(zip(names, columns))
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def from_rows(names: Sequence[str], rows: Sequence[Sequence[Any]], converters: Sequence[Converter],
+              shape: str = "records") -> Any:
+    """Shape row tuples (connector fetchall / Snowpark collect)."""
+    if not rows:
+        return empty_result(shape, names)
+    if shape == "arrow":
+        columns = [list(col) for col in zip(*rows)]
+        return pa.table(dict(zip(names, columns)))
+    columns = _convert_columns([list(col) for col in zip(*rows)], converters)
+    return _columns_to_shape(names, columns, shape)
+
+
+def _arrow_isoformat(column: Any) -> Optional[List[Any]]:
+    """
+    isoformat() of a date or naive timestamp column computed by Arrow, or None
+    for other types (tz-aware, nanosecond, time), which convert per value.
+    """
+    kind = column.type
+    if pa.types.is_date(kind):
+        return column.cast(pa.string()).to_pylist()
+    if pa.types.is_timestamp(kind) and kind.tz is None and kind.unit != "ns":
+        text = column.cast(pa.timestamp("us")).cast(pa.string())
+        text = pc.replace_substring(text, " ", "T", max_replacements=1)
+        # Like datetime.isoformat(), omit a zero microsecond part
+        return pc.replace_substring_regex(text, r"\.000000$", "").to_pylist()
+    return None
+
+
+def from_arrow(table: Any, converters: Optional[Sequence[Converter]] = None, shape: str = "records") -> Any:
+    """Shape an Arrow table. Temporal columns become ISO strings for records/columns."""
+    if shape == "arrow":
+        return table
+    if converters is None or len(converters) != table.num_columns:
+        converters = converters_for_arrow_schema(table.schema)
+    columns = []
+    for column, convert in zip(table.columns, converters):
+        values = _arrow_isoformat(column) if convert is not None else None
+        if values is None:
+            values = column.to_pylist()
+            if convert is not None:
+                values = [convert(v) for v in values]
+        columns.append(values)
+    return _columns_to_shape(table.column_names, columns, shape)
+
+
+def from_records(records: List[Dict[str, Any]], shape: str = "records") -> Any:
+    """Shape already-decoded records (snow CLI JSON output)."""
+    if shape == "records":
+        return records
+    names = list(records[0].keys()) if records else []
+    if shape == "columns":
+        return {name: [r.get(name) for r in records] for name in names}
+    return pa.Table.from_pylist(records) if records else empty_result(shape)
+
+
+# =============================================================================
+# Fetching
+# =============================================================================
+
+
+def fetch_arrow_table(cursor: Any) -> Optional[Any]:
+    """
+    Fetch all result batches from a connector cursor as one Arrow table.
+    Returns None when Arrow fetch is unavailable (no pyarrow / JSON result format).
+    """
+    if pa is None or not hasattr(cursor, "fetch_arrow_batches"):
+        return None
+    try:
+        batches = list(cursor.fetch_arrow_batches())
+    except Exception as e:
+        # NotSupportedError for non-Arrow result formats; rows are still unread
+        logger.debug(f"Arrow fetch unavailable, using row fetch: {e}")
+        return None
+    if not batches:
+        names = [desc[0] for desc in cursor.description or []]
+        return empty_result("arrow", names)
+    return pa.concat_tables(batches) if len(batches) > 1 else batches[0]
+
+
+def fetch_cursor(cursor: Any, shape: str = "records", span: Any = NULL_SPAN) -> Any:
+    """Fetch an executed connector cursor's full result in the requested shape."""
+    description = cursor.description or []
+    names = [desc[0] for desc in description]
+    converters = converters_for_description(description)
+
+    with span.phase("fetch"):
+        table = fetch_arrow_table(cursor)
+    if table is not None:
+        span.add_rows(table.num_rows, table.nbytes)
+        with span.phase("convert"):
+            return from_arrow(table, converters, shape)
+    with span.phase("fetch"):
+        rows = cursor.fetchall()
+    span.add_rows(len(rows))
+    with span.phase("convert"):
+        return from_rows(names, rows, converters, shape)
+
+
+def fetch_snowpark(df: Any, shape: str = "records", span: Any = NULL_SPAN) -> Any:
+    """Fetch a Snowpark DataFrame via pandas batches (Arrow-backed), else collect()."""
+    schema = df.schema
+    names = [field.name for field in schema.fields]
+    converters = converters_for_snowpark_schema(schema)
+
+    if pa is not None:
+        try:
+            with span.phase("fetch"):
+                tables = [pa.Table.from_pandas(batch, preserve_index=False) for batch in df.to_pandas_batches()]
+            if not tables:
+                return empty_result(shape, names)
+            table = pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+            span.add_rows(table.num_rows, table.nbytes)
+            with span.phase("convert"):
+                return from_arrow(table, None, shape)
+        except Exception as e:
+            logger.debug(f"Snowpark pandas batches unavailable, using collect(): {e}")
+
+    with span.phase("fetch"):
+        rows = df.collect()
+    span.add_rows(len(rows))
+    with span.phase("convert"):
+        return from_rows(names, [tuple(row) for row in rows], converters, shape)
+
+
+# =============================================================================
+# Streaming
+# =============================================================================
+
+
+def _slice_arrow(table: Any, converters: Optional[Sequence[Converter]], shape: str, batch_rows: int,
+                 span: Any = NULL_SPAN) -> Iterator[Any]:
+    span.add_rows(table.num_rows, table.nbytes)
+    for offset in range(0, table.num_rows, batch_rows):
+        with span.phase("convert"):
+            batch = from_arrow(table.slice(offset, batch_rows), converters, shape)
+        yield batch
+
+
+def _timed(iterator: Iterator[Any], span: Any, phase: str) -> Iterator[Any]:
+    """Attribute time spent inside next() to `phase`."""
+    while True:
+        with span.phase(phase):
+            item = next(iterator, _END)
+        if item is _END:
+            return
+        yield item
+
+
+def iter_cursor(cursor: Any, shape: str = "records", batch_rows: int = DEFAULT_BATCH_ROWS,
+                span: Any = NULL_SPAN) -> Iterator[Any]:
+    """
+    Yield an executed connector cursor's result in batches of at most
+    `batch_rows`, as result chunks are downloaded.
+    """
+    description = cursor.description or []
+    names = [desc[0] for desc in description]
+    converters = converters_for_description(description)
+
+    batches = None
+    if pa is not None and hasattr(cursor, "fetch_arrow_batches"):
+        try:
+            batches = cursor.fetch_arrow_batches()
+        except Exception as e:
+            logger.debug(f"Arrow fetch unavailable, using row fetch: {e}")
+    if batches is not None:
+        for table in _timed(iter(batches), span, "fetch"):
+            yield from _slice_arrow(table, converters, shape, batch_rows, span)
+        return
+
+    while True:
+        with span.phase("fetch"):
+            rows = cursor.fetchmany(batch_rows)
+        if not rows:
+            return
+        span.add_rows(len(rows))
+        with span.phase("convert"):
+            batch = from_rows(names, rows, converters, shape)
+        yield batch
+
+
+def iter_snowpark(df: Any, shape: str = "records", batch_rows: int = DEFAULT_BATCH_ROWS,
+                  span: Any = NULL_SPAN) -> Iterator[Any]:
+    """Yield a Snowpark DataFrame's result in batches (pandas batches, else local iterator)."""
+    schema = df.schema
+    names = [field.name for field in schema.fields]
+    converters = converters_for_snowpark_schema(schema)
+
+    if pa is not None:
+        try:
+            batches = _timed(iter(df.to_pandas_batches()), span, "fetch")
+            first = next(batches, None)
+        except Exception as e:
+            logger.debug(f"Snowpark pandas batches unavailable, using local iterator: {e}")
+        else:
+            if first is None:
+                return
+            for batch in ([first], batches):
+                for frame in batch:
+                    table = pa.Table.from_pandas(frame, preserve_index=False)
+                    yield from _slice_arrow(table, None, shape, batch_rows, span)
+            return
+
+    rows = df.to_local_iterator()
+    while True:
+        with span.phase("fetch"):
+            chunk = [tuple(row) for row in islice(rows, batch_rows)]
+        if not chunk:
+            return
+        span.add_rows(len(chunk))
+        with span.phase("convert"):
+            batch = from_rows(names, chunk, converters, shape)
+        yield batch
@@ -0,0 +1,92 @@
+"""
+ATLAS Capital Delivery - Response Serialization
+
+Fast JSON encoding for API payloads:
+- `dumps` encodes with orjson when installed (stdlib json otherwise);
+  Decimals become floats, dates/datetimes ISO strings
+- `RowSchema` declares how warehouse columns map to API field names and
+  converters. The column actually present (UPPER or lower case) is resolved
+  once per result, so each row costs one dict build instead of repeated
+  `r.get("UPPER") or r.get("lower")` probing
+"""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+Converter = Optional[Callable[[Any], Any]]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content: Any) -> bytes:
+        return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+# Converters matching the API's historical coercions (`float(x or 0)`, ...)
+def as_float(value: Any) -> float:
+    return float(value or 0)
+
+
+def as_int(value: Any) -> int:
+    return int(value or 0)
+
+
+def as_str(value: Any) -> str:
+    return str(value or "")
+
+
+FieldSpec = Union[Tuple[str, str], Tuple[str, str, Converter]]
+
+
+class RowSchema:
+    """
+    API field name <- warehouse column (+ optional converter).
+
+        CO_ROW = RowSchema([("co_id", "CO_ID"), ("approved_amount", "APPROVED_AMOUNT", as_float)])
+        items = CO_ROW.apply(rows)
+    """
+
+    def __init__(self, fields: Sequence[FieldSpec]):
+        self.fields: List[Tuple[str, str, Converter]] = [
+            (spec[0], spec[1], spec[2] if len(spec) > 2 else None) for spec in fields
+        ]
+        self.names = [name for name, _, _ in self.fields]
+
+    def _plan(self, sample: Dict[str, Any]) -> List[Tuple[str, str, Converter]]:
+        """Resolve each column against the actual row keys (upper or lower case)."""
+        plan = []
+        for name, column, convert in self.fields:
+            key = column if column in sample else column.lower() if column.lower() in sample else column
+            plan.append((name, key, convert))
+        return plan
+
+    def apply(self, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        plan = self._plan(rows[0])
+        return [
+            {name: convert(row.get(key)) if convert else row.get(key) for name, key, convert in plan}
+            for row in rows
+        ]
+
+    def apply_one(self, row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return self.apply([row or {}])[0]
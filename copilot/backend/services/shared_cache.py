@@ -0,0 +1,273 @@
+"""
+ATLAS Capital Delivery - Cross-Process Result Cache
+
+Second tier behind ResultCache for multi-worker deployments (ATLAS_WORKERS > 1):
+a SQLite database in WAL mode on local disk, read and written by every
+uvicorn worker on the host. Readers never block each other or the writer.
+Entries carry the same table versions as the in-process cache.
+
+Single-writer refresh: before loading a missing or outdated result, a worker
+takes a short lease on its key. Workers without the lease serve a stale
+entry if there is one, otherwise wait for the leaseholder's result - after a
+data load one worker per query reaches Snowflake instead of all N.
+
+Values are pickled (records, columns, DataFrames). The file is private to the
+container and only this service writes it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WORKERS = int(os.environ.get("ATLAS_WORKERS", "1"))
+DEFAULT_PATH = os.environ.get(
+    "ATLAS_SHARED_CACHE_PATH", os.path.join(tempfile.gettempdir(), "atlas-result-cache.db")
+)
+DEFAULT_MAX_BYTES = int(float(os.environ.get("ATLAS_SHARED_CACHE_MB", "256")) * 1024 * 1024)
+# A leaseholder that has not finished by then is presumed dead
+DEFAULT_LEASE_TTL = float(os.environ.get("ATLAS_SHARED_CACHE_LEASE", "30"))
+# Polling interval while waiting for another worker's load
+LEASE_POLL_INTERVAL = 0.05
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    versions TEXT,
+    created REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_created ON entries (created);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+def shared_key(key: Hashable) -> str:
+    """Stable text key for a ResultCache key (normalized SQL, binds, shape)."""
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+
+class SharedEntry:
+    __slots__ = ("value", "versions", "created", "size")
+
+    def __init__(self, value: Any, versions: Any, created: float, size: int):
+        self.value = value
+        self.versions = versions
+        self.created = created  # wall clock (time.time()), comparable across processes
+        self.size = size
+
+
+class SharedResultStore:
+    """
+    SQLite (WAL) result store shared by the worker processes of one host.
+
+    Every operation degrades instead of raising: a failing lookup is a miss,
+    a failing lease is granted (the caller loads itself), a failing write is
+    dropped.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES, lease_ttl: float = DEFAULT_LEASE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lease_ttl = lease_ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        # Metrics (this process)
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._leases = 0
+        self._lease_waits = 0
+        self._errors = 0
+
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _owner(self) -> str:
+        return f"{os.getpid()}:{threading.get_ident()}"
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _failed(self, action: str, error: Exception):
+        self._count("_errors")
+        logger.warning(f"Shared cache {action} failed: {error}")
+
+    # -------------------------------------------------------------------------
+    # Entries
+    # -------------------------------------------------------------------------
+
+    def lookup(self, key: str) -> Optional[SharedEntry]:
+        try:
+            row = self._connect().execute(
+                "SELECT value, versions, created, size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count("_misses")
+                return None
+            value, versions, created, size = row
+            entry = SharedEntry(pickle.loads(value), _decode_versions(versions), created, size)
+        except Exception as e:
+            self._failed("lookup", e)
+            return None
+        self._count("_hits")
+        return entry
+
+    def put(self, key: str, versions: Any, value: Any) -> Optional[int]:
+        """Store `value`; returns its size in bytes, or None when it was not stored."""
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if len(blob) > self.max_bytes:
+                return None
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, versions, created, size, value) VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(versions), time.time(), len(blob), blob)
+            )
+            self._evict(conn)
+        except Exception as e:
+            self._failed("write", e)
+            return None
+        self._count("_writes")
+        return len(blob)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop the oldest entries while the store is over its byte budget."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        doomed, freed = [], 0
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY created"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def invalidate(self, key: Optional[str] = None):
+        try:
+            if key is None:
+                self._connect().execute("DELETE FROM entries")
+            else:
+                self._connect().execute("DELETE FROM entries WHERE key = ?", (key,))
+        except Exception as e:
+            self._failed("invalidate", e)
+
+    # -------------------------------------------------------------------------
+    # Refresh leases
+    # -------------------------------------------------------------------------
+
+    def acquire(self, key: str) -> bool:
+        """Take the refresh lease on `key` unless a live one is held elsewhere."""
+        now = time.time()
+        try:
+            cursor = self._connect().execute(
+                "INSERT INTO leases (key, owner, expires) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+                "WHERE leases.expires < ?",
+                (key, self._owner(), now + self.lease_ttl, now)
+            )
+        except Exception as e:
+            self._failed("lease", e)
+            return True
+        if cursor.rowcount == 1:
+            self._count("_leases")
+            return True
+        return False
+
+    def release(self, key: str):
+        try:
+            self._connect().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self._owner()))
+        except Exception as e:
+            self._failed("lease release", e)
+
+    def leased(self, key: str) -> bool:
+        try:
+            row = self._connect().execute("SELECT expires FROM leases WHERE key = ?", (key,)).fetchone()
+        except Exception as e:
+            self._failed("lease check", e)
+            return False
+        return row is not None and row[0] >= time.time()
+
+    def wait_for(self, key: str, is_fresh) -> Optional[SharedEntry]:
+        """
+        Wait (up to the lease TTL) for another worker's load of `key`.
+        Returns the entry once `is_fresh(entry)`, or None if the lease ends without one.
+        """
+        self._count("_lease_waits")
+        deadline = time.monotonic() + self.lease_ttl
+        while time.monotonic() < deadline:
+            time.sleep(LEASE_POLL_INTERVAL)
+            entry = self.lookup(key)
+            if entry is not None and is_fresh(entry):
+                return entry
+            if not self.leased(key):
+                return None
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        except Exception:
+            entries = size = None
+        with self._lock:
+            return {
+                "path": self.path,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "leases": self._leases,
+                "lease_waits": self._lease_waits,
+                "errors": self._errors
+            }
+
+
+def _decode_versions(text: Optional[str]) -> Optional[Tuple[Tuple[str, str], ...]]:
+    versions = json.loads(text) if text else None
+    if versions is None:
+        return None
+    return tuple(tuple(pair) for pair in versions)
+
+
+def shared_store_from_env() -> Optional[SharedResultStore]:
+    """
+    The host-wide store when running several workers (or when
+    ATLAS_SHARED_CACHE_PATH is set explicitly); None for a single worker.
+    """
+    if WORKERS <= 1 and "ATLAS_SHARED_CACHE_PATH" not in os.environ:
+        return None
+    try:
+        return SharedResultStore()
+    except Exception as e:
+        logger.warning(f"Shared result cache unavailable ({DEFAULT_PATH}): {e}")
+        return None
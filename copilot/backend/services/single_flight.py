@@ -0,0 +1,145 @@
+"""
+ATLAS Capital Delivery - Single-Flight Coalescing
+
+Process-wide de-duplication of identical in-flight reads: while a call for a
+key is running, later callers with the same key wait for its outcome (value
+or exception) instead of starting their own. Nothing is kept once the call
+finishes - that is the result cache's job. Under a burst of users the number
+of concurrent warehouse queries follows the number of distinct queries, not
+the number of requests.
+
+- SingleFlight: for blocking calls on worker threads (execute_query)
+- AsyncSingleFlight: for coroutines (the *_async service API); the shared
+  call runs in its own task, so a cancelled caller never cancels it for the
+  others
+
+Results are shared between callers and are read-only, like cached results.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+def _hashable(key: Optional[Hashable]) -> bool:
+    if key is None:
+        return False
+    try:
+        hash(key)
+    except TypeError:
+        return False
+    return True
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.leaders = 0
+        self.shared = 0  # duplicate calls answered by an in-flight one
+
+    def count(self, leader: bool):
+        with self._lock:
+            self.calls += 1
+            if leader:
+                self.leaders += 1
+            else:
+                self.shared += 1
+
+    def stats(self, in_flight: int) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.leaders,
+                "shared": self.shared,
+                "in_flight": in_flight,
+                "saved_rate": round(self.shared / self.calls, 3) if self.calls else 0.0
+            }
+
+
+class SingleFlight:
+    """
+    Thread-safe single flight for blocking callables.
+
+        rows = flight.do(query_key(sql, params), lambda: run(sql, params))
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._counters = _Counters()
+
+    def do(self, key: Optional[Hashable], fn: Callable[[], Any]) -> Any:
+        if not _hashable(key):
+            return fn()
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        self._counters.count(leader)
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            # Later callers start a new flight; current waiters get this outcome
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._flights)
+        return self._counters.stats(in_flight)
+
+
+class AsyncSingleFlight:
+    """
+    Single flight for coroutines on one event loop.
+
+        value = await flight.do(key, lambda: executor.run(fn, *args))
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._counters = _Counters()
+
+    async def do(self, key: Optional[Hashable], factory: Callable[[], Awaitable[Any]]) -> Any:
+        if not _hashable(key):
+            return await factory()
+        task = self._tasks.get(key)
+        leader = task is None
+        if leader:
+            task = self._tasks[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda _, key=key, task=task: self._finished(key, task))
+        self._counters.count(leader)
+        # Cancelling one caller must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Future):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved: an error nobody awaited is not "never retrieved"
+
+    def stats(self) -> Dict[str, Any]:
+        return self._counters.stats(len(self._tasks))
@@ -1,16 +1,41 @@
 """
 ATLAS Capital Delivery - Snowflake Service (SPCS Compatible)
-Uses Snowpark Session for SPCS (auto-detects environment).
-Falls back to CLI for local development.
+Uses a pool of connector sessions for SPCS (auto-detects environment),
+with a Snowpark Session as fallback.
+Locally, uses the named connection config; falls back to CLI.
 Includes auto-reconnection on token expiration.
 """
 
+import asyncio
 import json
+import math
 import os
 import subprocess
-from typing import Any, Dict, List, Optional
+import threading
+from datetime import date
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
 import logging
 
+from .completion_cache import completion_cache_from_env, completion_key
+from .connection_pool import ConnectionPool
+from .downsampling import MIN_POINTS, downsample_columns
+from .fieldsets import FieldSet, Fields
+from .geo_index import GeoIndex
+from .pagination import DEFAULT_PAGE_SIZE, decode_cursor, keyset_params, keyset_predicate, make_page, page_size
+from .query_batch import QueryBatch
+from .query_executor import DEFAULT_QUERY_TIMEOUT, QueryExecutor, QueryTimeoutError, remaining_time
+from .request_loader import call_key, current_loader
+from .result_cache import ResultCache, TableVersionTracker, fresh_only, query_key
+from .shared_cache import shared_store_from_env
+from .single_flight import AsyncSingleFlight, SingleFlight
+from .sql_cache import SemanticSQLCache, prompt_version
+from .statements import Params, StatementRegistry, inline_params
+from .telemetry import NULL_SPAN, get_query_telemetry
+from .result_decoding import (
+    DEFAULT_BATCH_ROWS, empty_result, fetch_cursor, fetch_snowpark, from_records, iter_cursor, iter_snowpark,
+    validate_shape
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,10 +54,89 @@ def _detect_spcs() -> bool:
 IS_SPCS = _detect_spcs()
 
 
+def _completion_text(response: str) -> str:
+    """Message text of an options-form COMPLETE answer ({"choices": [{"messages": ...}]})."""
+    try:
+        return str(json.loads(response)["choices"][0]["messages"])
+    except (ValueError, KeyError, IndexError, TypeError):
+        return response
+
+# Keyword placeholders in search_change_orders (fixed for statement reuse)
+SEARCH_KEYWORD_SLOTS = 5
+
+# Returned by next() once a streamed result is exhausted
+_END_OF_STREAM = object()
+
+# Pool members opened during warm-up (the rest open lazily)
+WARM_POOL_SIZE = int(os.environ.get("ATLAS_POOL_WARM_SIZE", "2"))
+
+# A stream holds its pool connection until the client has read it all, so
+# only this many run at once (0: a quarter of the query workers) and slow
+# consumers cannot starve regular queries; others wait up to the slot wait
+MAX_STREAMS = int(os.environ.get("ATLAS_MAX_STREAMS", "0"))
+STREAM_SLOT_WAIT = float(os.environ.get("ATLAS_STREAM_SLOT_WAIT", "10"))
+
+# Server-side cap on any statement of a pooled session, so a statement whose
+# caller is gone (or that escaped its executor deadline) cannot run on
+STATEMENT_TIMEOUT = int(os.environ.get("ATLAS_STATEMENT_TIMEOUT", str(math.ceil(DEFAULT_QUERY_TIMEOUT))))
+
+# Selectable fields per entity (`fields=` on the list endpoints). Defaults are
+# the historical column lists, so responses without `fields=` are unchanged.
+PROJECT_COLUMNS = [
+    "PROJECT_ID", "PROJECT_NAME", "PROJECT_CODE", "PROJECT_TYPE", "STATUS", "CITY", "STATE",
+    "LATITUDE", "LONGITUDE", "PLANNED_START_DATE", "PLANNED_END_DATE", "ACTUAL_START_DATE",
+    "ACTUAL_END_DATE", "ORIGINAL_BUDGET", "CURRENT_BUDGET", "CONTINGENCY_BUDGET", "CONTINGENCY_USED",
+    "CPI", "SPI", "PROGRAM_ID", "OWNER_NAME", "PRIME_CONTRACTOR", "CREATED_AT", "UPDATED_AT"
+]
+PROJECT_FIELDS = FieldSet(
+    "project", [(name, name) for name in PROJECT_COLUMNS],
+    default=[
+        "PROJECT_ID", "PROJECT_NAME", "PROJECT_TYPE", "STATUS", "CITY", "STATE", "LATITUDE", "LONGITUDE",
+        "ORIGINAL_BUDGET", "CURRENT_BUDGET", "CONTINGENCY_BUDGET", "CONTINGENCY_USED", "CPI", "SPI",
+        "PRIME_CONTRACTOR"
+    ],
+    required=["PROJECT_ID"]
+)
+# Project detail defaults to every column (formerly SELECT *)
+PROJECT_DETAIL_FIELDS = FieldSet("project", PROJECT_FIELDS.columns.items(), required=["PROJECT_ID"])
+
+CHANGE_ORDER_FIELDS = FieldSet(
+    "change order",
+    [
+        ("CO_ID", "co.CO_ID"), ("PROJECT_ID", "co.PROJECT_ID"), ("PROJECT_NAME", "p.PROJECT_NAME"),
+        ("VENDOR_ID", "co.VENDOR_ID"), ("VENDOR_NAME", "v.VENDOR_NAME"), ("CO_NUMBER", "co.CO_NUMBER"),
+        ("CO_TITLE", "co.CO_TITLE"), ("CO_TYPE", "co.CO_TYPE"), ("REASON_TEXT", "co.REASON_TEXT"),
+        ("JUSTIFICATION", "co.JUSTIFICATION"), ("ORIGINAL_AMOUNT", "co.ORIGINAL_AMOUNT"),
+        ("APPROVED_AMOUNT", "co.APPROVED_AMOUNT"), ("STATUS", "co.STATUS"),
+        ("SUBMIT_DATE", "co.SUBMIT_DATE"), ("APPROVAL_DATE", "co.APPROVAL_DATE"),
+        ("ML_CATEGORY", "co.ML_CATEGORY"), ("ML_CONFIDENCE", "co.ML_CONFIDENCE"),
+        ("ML_SCOPE_GAP_PROB", "co.ML_SCOPE_GAP_PROB")
+    ],
+    default=[
+        "CO_ID", "PROJECT_ID", "PROJECT_NAME", "VENDOR_ID", "VENDOR_NAME", "CO_NUMBER", "CO_TITLE",
+        "REASON_TEXT", "APPROVED_AMOUNT", "STATUS", "ML_CATEGORY", "ML_CONFIDENCE"
+    ],
+    required=["CO_ID"]
+)
+
+ACTIVITY_FIELDS = FieldSet(
+    "activity",
+    [
+        ("ACTIVITY_ID", "sa.ACTIVITY_ID"), ("PROJECT_ID", "sa.PROJECT_ID"), ("PROJECT_NAME", "p.PROJECT_NAME"),
+        ("ACTIVITY_NAME", "sa.ACTIVITY_NAME"), ("PLANNED_START", "sa.PLANNED_START"),
+        ("PLANNED_FINISH", "sa.PLANNED_FINISH"), ("FORECAST_FINISH", "sa.FORECAST_FINISH"),
+        ("PERCENT_COMPLETE", "sa.PERCENT_COMPLETE"), ("SLIP_PROBABILITY", "sa.SLIP_PROBABILITY")
+    ],
+    required=["ACTIVITY_ID"]
+)
+
+
 class SnowflakeServiceSPCS:
     """
     Service for interacting with Snowflake.
     Automatically detects SPCS environment and uses appropriate connection method.
+    In SPCS, queries run on a ConnectionPool sized to the query executor so
+    concurrent requests execute in parallel.
     Includes auto-reconnection on token expiration.
     """
     
@@ -42,15 +146,70 @@ class SnowflakeServiceSPCS:
         self.schema = "ATOMIC"
         self._session = None
         self._connection = None
+        self.pool: Optional[ConnectionPool] = None
+        
+        # Bounded pool for the *_async API (keeps blocking calls off the event loop)
+        self.executor = QueryExecutor()
+        self.max_streams = MAX_STREAMS or max(1, self.executor.max_workers // 4)
+        self._stream_slots = asyncio.Semaphore(self.max_streams)
+        self._streams_running = 0
+        
+        # Read-mostly results, invalidated by per-table data versions; shared
+        # across uvicorn workers when ATLAS_WORKERS > 1
+        self.result_cache = ResultCache(shared=shared_store_from_env())
+        self.table_versions = TableVersionTracker(self._fetch_table_versions)
+        
+        # Identical reads in flight at the same time run once (threads / coroutines)
+        self.flight = SingleFlight()
+        self.async_flight = AsyncSingleFlight()
+        
+        # Stable, parameterized SQL text per service method
+        self.statements = StatementRegistry()
+        
+        # Generated text-to-SQL per (paraphrased) question
+        self.sql_cache = SemanticSQLCache()
+        
+        # LLM completions on disk (survive restarts on a persistent volume)
+        self.completion_cache = completion_cache_from_env()
+        
+        # Per-query timing breakdown (process-wide)
+        self.telemetry = get_query_telemetry()
+        
+        # Map spatial index, rebuilt when the MAP_DATA rows change
+        self._map_index: Optional[GeoIndex] = None
+        self._map_rows: Any = None
+        self._map_index_lock = threading.Lock()
         
         self.is_spcs = IS_SPCS
         
         if self.is_spcs:
-            logger.info("Running inside SPCS - using Snowpark Session")
-            self._init_snowpark_session()
+            logger.info("Running inside SPCS - using pooled connector sessions")
+            self._init_pool()
         else:
-            logger.info("Running locally - using Snowflake CLI")
+            logger.info(f"Running locally - using connection '{connection_name}'")
             self.snow_path = self._find_snow_cli()
+            self._init_local_pool()
+    
+    def _init_local_pool(self):
+        """Open a persistent local connector pool; keep the snow CLI as last resort"""
+        pool = ConnectionPool(self._connect_local, size=self.executor.max_workers, name="local")
+        if pool.start(min_size=1):
+            self.pool = pool
+            logger.info(f"Local connection pool ready (size={pool.size}, connection={self.connection_name})")
+        else:
+            logger.warning(f"Could not open connection '{self.connection_name}' with the connector - falling back to snow CLI")
+    
+    def _connect_local(self):
+        """Open one connector connection from the named connection config (~/.snowflake)"""
+        import snowflake.connector
+        
+        return snowflake.connector.connect(
+            connection_name=self.connection_name,
+            database=self.database,
+            schema=self.schema,
+            paramstyle="qmark",  # server-side binds -> stable SQL text
+            session_parameters={"STATEMENT_TIMEOUT_IN_SECONDS": STATEMENT_TIMEOUT}
+        )
     
     def _find_snow_cli(self) -> str:
         """Find the snow CLI path"""
@@ -66,39 +225,61 @@ class SnowflakeServiceSPCS:
                 return path
         return "snow"
     
+    def _init_pool(self):
+        """Open the SPCS connection pool; fall back to a single Snowpark Session"""
+        pool = ConnectionPool(self._connect_spcs, size=self.executor.max_workers, name="spcs")
+        if pool.start(min_size=1):
+            self.pool = pool
+            logger.info(f"SPCS connection pool ready (size={pool.size}) - DB: {self.database}, Schema: {self.schema}")
+        else:
+            logger.warning("SPCS connection pool unavailable - falling back to Snowpark Session")
+            self._init_snowpark_session()
+    
+    def _connect_spcs(self):
+        """Open one OAuth connector connection using the current SPCS token"""
+        import snowflake.connector
+        
+        token_path = "/snowflake/session/token"
+        token = ""
+        if os.path.exists(token_path):
+            with open(token_path, "r") as f:
+                token = f.read().strip()
+        
+        return snowflake.connector.connect(
+            host=os.environ.get("SNOWFLAKE_HOST", ""),
+            account=os.environ.get("SNOWFLAKE_ACCOUNT", ""),
+            authenticator="oauth",
+            token=token,
+            database=self.database,
+            schema=self.schema,
+            warehouse=os.environ.get("SNOWFLAKE_WAREHOUSE", "CAPITAL_COMPUTE_WH"),
+            paramstyle="qmark",  # server-side binds -> stable SQL text
+            session_parameters={"STATEMENT_TIMEOUT_IN_SECONDS": STATEMENT_TIMEOUT}
+        )
+    
     def _init_snowpark_session(self):
         """Initialize Snowpark Session for SPCS environment"""
         try:
             from snowflake.snowpark import Session
             
-            print(f"[SPCS] Initializing Snowpark Session...", flush=True)
+            logger.info("Initializing Snowpark Session...")
             
             self._session = Session.builder.getOrCreate()
             
-            print(f"[SPCS] Session created, setting database/schema...", flush=True)
-            
             self._session.sql(f"USE DATABASE {self.database}").collect()
             self._session.sql(f"USE SCHEMA {self.schema}").collect()
+            self._session.sql(f"ALTER SESSION SET STATEMENT_TIMEOUT_IN_SECONDS = {STATEMENT_TIMEOUT}").collect()
             
-            print(f"[SPCS] Snowpark Session established - DB: {self.database}, Schema: {self.schema}", flush=True)
+            # No test query here - warm_up() verifies the session with real preloads
             logger.info(f"Snowpark Session established - DB: {self.database}, Schema: {self.schema}")
             
-            # Test query
-            test_result = self._session.sql("SELECT COUNT(*) as cnt FROM PROJECT").collect()
-            print(f"[SPCS] Test query result: {test_result}", flush=True)
-            
         except Exception as e:
-            import traceback
-            print(f"[SPCS] Failed to establish Snowpark Session: {e}", flush=True)
-            traceback.print_exc()
-            logger.error(f"Failed to establish Snowpark Session: {e}")
+            logger.error(f"Failed to establish Snowpark Session: {e}", exc_info=True)
             self._init_connector_fallback()
     
     def _init_connector_fallback(self):
         """Fallback to connector if Snowpark fails - also used for reconnection"""
         try:
-            import snowflake.connector
-            
             if self._connection:
                 try:
                     self._connection.close()
@@ -106,137 +287,359 @@ class SnowflakeServiceSPCS:
                     pass
                 self._connection = None
             
-            token_path = "/snowflake/session/token"
-            token = ""
-            if os.path.exists(token_path):
-                with open(token_path, "r") as f:
-                    token = f.read().strip()
-            
             warehouse = os.environ.get("SNOWFLAKE_WAREHOUSE", "CAPITAL_COMPUTE_WH")
-            
-            self._connection = snowflake.connector.connect(
-                host=os.environ.get("SNOWFLAKE_HOST", ""),
-                account=os.environ.get("SNOWFLAKE_ACCOUNT", ""),
-                authenticator="oauth",
-                token=token,
-                database=self.database,
-                schema=self.schema,
-                warehouse=warehouse
-            )
-            print(f"[SPCS] Connector established with warehouse: {warehouse}", flush=True)
+            self._connection = self._connect_spcs()
             logger.info(f"Connector fallback connection established with warehouse: {warehouse}")
             return True
         except Exception as e:
-            print(f"[SPCS] Connector fallback failed: {e}", flush=True)
             logger.error(f"Connector fallback also failed: {e}")
             return False
     
+    def _has_connection(self) -> bool:
+        return bool(self.pool or self._session or self._connection)
+    
+    def _ensure_connected(self):
+        """Retry the startup connection sequence if it left the service without a backend"""
+        if self._has_connection():
+            return
+        if self.is_spcs:
+            self._init_pool()
+        else:
+            self._init_local_pool()
+        if not self._has_connection() and self.is_spcs:
+            raise RuntimeError("No Snowflake connection available")
+    
+    def warm_up(self) -> Dict[str, Any]:
+        """
+        Open connections and load hot dimension data (PROJECT, VENDOR, portfolio
+        KPIs) into the result cache. Raises when the warehouse does not answer,
+        so a readiness gate can retry.
+        """
+        self._ensure_connected()
+        if self.pool:
+            self.pool.grow(WARM_POOL_SIZE)
+        
+        projects = self.get_projects()
+        if not projects:
+            raise RuntimeError("Warm-up query returned no projects")
+        vendors = self.get_vendors()
+        summary = self.get_portfolio_summary()
+        return {
+            "backend": "pool" if self.pool else ("snowpark" if self._session else ("connector" if self._connection else "cli")),
+            "pool_members": self.pool.stats().get("open") if self.pool else None,
+            "projects": len(projects),
+            "vendors": len(vendors),
+            "portfolio_summary": bool(summary)
+        }
+    
+    @staticmethod
+    def _is_token_expired(error_msg: Any) -> bool:
+        """Check if an error is an OAuth token expiration"""
+        error_str = str(error_msg).lower()
+        return "390114" in error_str or ("token" in error_str and "expired" in error_str)
+    
     def _reconnect_if_needed(self, error_msg: str) -> bool:
         """Check if error is token expiration and reconnect if so"""
-        error_str = str(error_msg).lower()
-        if "390114" in str(error_msg) or ("token" in error_str and "expired" in error_str):
-            print(f"[SPCS] Token expired, reconnecting...", flush=True)
+        if self._is_token_expired(error_msg):
+            logger.info("Token expired, reconnecting...")
             return self._init_connector_fallback()
         return False
     
-    def execute_query(self, query: str) -> List[Dict[str, Any]]:
-        """Execute a SQL query and return results as list of dicts"""
+    def execute_query(
+        self, query: str, params: Params = None, shape: str = "records", raise_errors: Optional[bool] = None
+    ) -> Any:
+        """
+        Execute a SQL query.
+        
+        params: values for qmark (`?`) placeholders, bound server-side.
+        shape: "records" (list of dicts, default), "columns" (dict of lists)
+        or "arrow" (pyarrow.Table).
+        raise_errors: propagate failures instead of returning an empty result.
+        Defaults to on under require_fresh(), whose response carries validators
+        that must never label an error as data.
+        
+        Concurrent calls with the same normalized SQL, binds and shape share
+        one execution (and its result, which callers must not mutate).
+        """
+        validate_shape(shape)
+        if raise_errors is None:
+            raise_errors = fresh_only()
+        return self.flight.do(
+            (query_key(query, params, shape), raise_errors),
+            lambda: self._execute_query(query, params, shape, raise_errors)
+        )
+    
+    def _execute_query(self, query: str, params: Params, shape: str, raise_errors: bool = False) -> Any:
+        if self.pool:
+            return self._execute_query_pooled(query, params, shape, raise_errors)
         if self.is_spcs:
-            return self._execute_query_snowpark(query)
-        else:
-            return self._execute_query_cli(query)
+            return self._execute_query_snowpark(query, params=params, shape=shape, raise_errors=raise_errors)
+        return from_records(self._execute_query_cli(query, params, raise_errors), shape)
+    
+    def _cached_query(self, query: str, tables: Sequence[str], params: Params = None, shape: str = "records") -> Any:
+        """
+        Execute a read-mostly query through the result cache.
+        
+        tables: every "SCHEMA.TABLE" the query reads; a change to any of them
+        (INFORMATION_SCHEMA.TABLES.LAST_ALTERED) invalidates the entry.
+        """
+        versions = self.table_versions.versions(tables)
+        key = query_key(query, params, shape)
+        try:
+            # The loader raises, so a failed read is never cached (an empty result is)
+            return self.result_cache.get_or_load(
+                key, versions, lambda: self.execute_query(query, params, shape, raise_errors=True)
+            )
+        except Exception as e:
+            if fresh_only():
+                raise
+            logger.warning(f"Cached query failed, returning an empty result: {e}")
+            return empty_result(shape)
+    
+    def batch(self, timeout: Optional[float] = None) -> QueryBatch:
+        """
+        Start a batch of independent statements that execute concurrently
+        under one overall deadline (see QueryBatch).
+        """
+        return QueryBatch(self, timeout=timeout)
+    
+    def _fetch_table_versions(self) -> Dict[str, str]:
+        """LAST_ALTERED per table in one metadata query (drives cache invalidation)"""
+        sql = f"""
+        SELECT TABLE_SCHEMA, TABLE_NAME, LAST_ALTERED
+        FROM {self.database}.INFORMATION_SCHEMA.TABLES
+        WHERE TABLE_SCHEMA IN ('ATOMIC', 'ML', 'CAPITAL_PROJECTS')
+        """
+        rows = self.execute_query(sql)
+        return {f"{r['TABLE_SCHEMA']}.{r['TABLE_NAME']}": str(r["LAST_ALTERED"]) for r in rows}
+    
+    def _execute_query_pooled(
+        self, query: str, params: Params = None, shape: str = "records", raise_errors: bool = False
+    ) -> Any:
+        """
+        Execute query on a pooled connection.
+        On token expiration only the checked-out member is rebuilt, then retried once.
+        Failures return an empty result unless raise_errors.
+        """
+        try:
+            member = self.pool.checkout()
+        except Exception as e:
+            logger.error(f"Pool checkout failed: {e}")
+            if raise_errors:
+                raise
+            return empty_result(shape)
+        
+        discard = False
+        try:
+            try:
+                return self._fetch(member.connection, query, params, shape, session=member.member_id)
+            except Exception as e:
+                if not self._is_token_expired(e):
+                    raise
+                logger.info(f"Token expired on pool member {member.member_id}, rebuilding it")
+                if not self.pool.rebuild(member):
+                    raise
+                return self._fetch(member.connection, query, params, shape, session=member.member_id)
+        except Exception as e:
+            logger.error(f"Pooled query failed: {e}")
+            discard = ConnectionPool._is_closed(member)
+            if raise_errors:
+                raise
+            return empty_result(shape)
+        finally:
+            self.pool.checkin(member, discard=discard)
+    
+    def _fetch(self, connection, query: str, params: Params = None, shape: str = "records", session: Any = "connector") -> Any:
+        """Run a query on a connector connection (qmark binds) and fetch it as Arrow batches"""
+        with self.telemetry.query(query, path="connector") as span:
+            cursor = self._execute_cursor(connection, query, params, session, span)
+            try:
+                return fetch_cursor(cursor, shape, span)
+            finally:
+                cursor.close()
+    
+    def _execute_cursor(self, connection, query: str, params: Params = None, session: Any = "connector", span: Any = NULL_SPAN):
+        """Execute a query on a new cursor and return it (the caller fetches and closes it)"""
+        self.statements.record(query, session)
+        # The connector cancels the statement once the executor deadline passes
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise QueryTimeoutError("Query deadline expired before execution")
+        timeout = math.ceil(remaining) if remaining is not None else None
+        cursor = connection.cursor()
+        try:
+            with span.phase("execute"):
+                if params:
+                    cursor.execute(query, list(params), timeout=timeout)
+                else:
+                    cursor.execute(query, timeout=timeout)
+        except Exception:
+            cursor.close()
+            raise
+        return cursor
     
-    def _execute_query_snowpark(self, query: str, retry: bool = True) -> List[Dict[str, Any]]:
-        """Execute query using Snowpark Session (SPCS) with auto-reconnect on token expiration"""
-        print(f"[QUERY] Executing: {query[:200]}...", flush=True)
+    # =========================================================================
+    # Streaming
+    # =========================================================================
+    
+    def execute_query_iter(
+        self,
+        query: str,
+        params: Params = None,
+        shape: str = "records",
+        batch_rows: int = DEFAULT_BATCH_ROWS
+    ) -> Iterator[Any]:
+        """
+        Execute a SQL query and yield its result in batches of at most
+        `batch_rows` rows as they arrive, instead of materializing it.
         
+        Unlike execute_query, errors propagate: a partially consumed stream
+        cannot be turned into an empty result. On the pooled path the
+        connection stays checked out until the iterator is exhausted or closed.
+        """
+        validate_shape(shape)
+        if self.pool:
+            yield from self._iter_query_pooled(query, params, shape, batch_rows)
+        elif self.is_spcs and self._session:
+            with self.telemetry.query(query, path="snowpark-stream") as span:
+                self.statements.record(query, "snowpark")
+                with span.phase("execute"):
+                    df = self._session.sql(query, params=list(params)) if params else self._session.sql(query)
+                yield from iter_snowpark(df, shape, batch_rows, span)
+        elif self.is_spcs and self._connection:
+            with self.telemetry.query(query, path="connector-stream") as span:
+                cursor = self._execute_cursor(self._connection, query, params, span=span)
+                try:
+                    yield from iter_cursor(cursor, shape, batch_rows, span)
+                finally:
+                    cursor.close()
+        elif self.is_spcs:
+            raise RuntimeError("No SPCS connection available")
+        else:
+            # The CLI cannot stream - chunk its materialized result
+            rows = self._execute_query_cli(query, params, raise_errors=True)
+            for offset in range(0, len(rows), batch_rows):
+                yield from_records(rows[offset:offset + batch_rows], shape)
+    
+    def execute_query_checked(self, query: str, params: Params = None) -> List[Dict[str, Any]]:
+        """
+        Execute a statement that may not compile (LLM-generated SQL) and
+        return its records. Unlike execute_query, errors raise instead of
+        becoming an empty result, so callers can tell bad SQL from no rows.
+        """
+        rows: List[Dict[str, Any]] = []
+        for batch in self.execute_query_iter(query, params):
+            rows.extend(batch)
+        return rows
+    
+    def _iter_query_pooled(self, query: str, params: Params, shape: str, batch_rows: int) -> Iterator[Any]:
+        member = self.pool.checkout()
+        discard = False
+        try:
+            with self.telemetry.query(query, path="connector-stream") as span:
+                try:
+                    cursor = self._execute_cursor(member.connection, query, params, member.member_id, span)
+                except Exception as e:
+                    if not self._is_token_expired(e) or not self.pool.rebuild(member):
+                        raise
+                    logger.info(f"Token expired on pool member {member.member_id}, rebuilt it")
+                    cursor = self._execute_cursor(member.connection, query, params, member.member_id, span)
+                try:
+                    yield from iter_cursor(cursor, shape, batch_rows, span)
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"Streamed query failed: {e}")
+            discard = ConnectionPool._is_closed(member)
+            raise
+        finally:
+            self.pool.checkin(member, discard=discard)
+    
+    def _execute_query_snowpark(
+        self, query: str, retry: bool = True, params: Params = None, shape: str = "records", raise_errors: bool = False
+    ) -> Any:
+        """
+        Execute query using Snowpark Session (SPCS) with auto-reconnect on token expiration.
+        Failures return an empty result unless raise_errors.
+        """
         try:
             if self._session:
-                print(f"[QUERY] Using Snowpark Session", flush=True)
-                df = self._session.sql(query)
-                rows = df.collect()
-                if not rows:
-                    print(f"[QUERY] No rows returned", flush=True)
-                    return []
-                
-                results = []
-                for row in rows:
-                    row_dict = row.asDict()
-                    for key, value in row_dict.items():
-                        if hasattr(value, 'isoformat'):
-                            row_dict[key] = value.isoformat()
-                    results.append(row_dict)
-                
-                print(f"[QUERY] Returned {len(results)} rows", flush=True)
-                return results
+                with self.telemetry.query(query, path="snowpark") as span:
+                    self.statements.record(query, "snowpark")
+                    with span.phase("execute"):
+                        df = self._session.sql(query, params=list(params)) if params else self._session.sql(query)
+                    return fetch_snowpark(df, shape, span)
             elif self._connection:
-                print(f"[QUERY] Using Connector fallback", flush=True)
-                cursor = self._connection.cursor()
-                cursor.execute(query)
-                columns = [desc[0] for desc in cursor.description] if cursor.description else []
-                rows = cursor.fetchall()
-                
-                print(f"[QUERY] Fetched {len(rows)} rows, columns: {columns[:5]}...", flush=True)
-                
-                results = []
-                for row in rows:
-                    row_dict = {}
-                    for i, col in enumerate(columns):
-                        value = row[i]
-                        if hasattr(value, 'isoformat'):
-                            value = value.isoformat()
-                        row_dict[col] = value
-                    results.append(row_dict)
-                
-                cursor.close()
-                print(f"[QUERY] Returning {len(results)} results", flush=True)
-                return results
+                return self._fetch(self._connection, query, params, shape)
             else:
-                print(f"[QUERY] ERROR: No connection available!", flush=True)
                 logger.error("No SPCS connection available")
-                return []
+                if raise_errors:
+                    raise RuntimeError("No SPCS connection available")
+                return empty_result(shape)
                 
         except Exception as e:
             error_str = str(e)
-            print(f"[QUERY] EXCEPTION: {error_str}", flush=True)
             logger.error(f"SPCS query failed: {e}")
             
             # Check if token expired and retry once
             if retry and self._reconnect_if_needed(error_str):
-                print(f"[QUERY] Retrying after reconnect...", flush=True)
-                return self._execute_query_snowpark(query, retry=False)
+                logger.info("Retrying query after reconnect...")
+                return self._execute_query_snowpark(
+                    query, retry=False, params=params, shape=shape, raise_errors=raise_errors
+                )
             
-            return []
+            if raise_errors:
+                raise
+            return empty_result(shape)
     
-    def _execute_query_cli(self, query: str) -> List[Dict[str, Any]]:
-        """Execute query using Snowflake CLI (local development)"""
-        try:
-            cmd = [
-                self.snow_path, "sql", 
-                "-c", self.connection_name,
-                "--format", "JSON",
-                "-q", query
-            ]
-            
-            result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
-                timeout=120
-            )
-            
-            if result.returncode != 0:
-                logger.error(f"Query failed: {result.stderr}")
+    def _execute_query_cli(self, query: str, params: Params = None, raise_errors: bool = False) -> List[Dict[str, Any]]:
+        """
+        Execute query using Snowflake CLI (local fallback - one process per query).
+        Failures return [] unless raise_errors.
+        """
+        with self.telemetry.query(query, path="cli") as span:
+            try:
+                # The CLI cannot bind - render parameters as escaped literals
+                query = inline_params(query, params)
+                cmd = [
+                    self.snow_path, "sql", 
+                    "-c", self.connection_name,
+                    "--format", "JSON",
+                    "-q", query
+                ]
+                
+                with span.phase("execute"):
+                    result = subprocess.run(
+                        cmd, 
+                        capture_output=True, 
+                        text=True, 
+                        timeout=120
+                    )
+                
+                if result.returncode != 0:
+                    if raise_errors:
+                        raise RuntimeError(f"Query failed: {result.stderr.strip()}")
+                    logger.error(f"Query failed: {result.stderr}")
+                    span.fail(result.stderr)
+                    return []
+                
+                with span.phase("convert"):
+                    rows = self._parse_json_output(result.stdout)
+                span.add_rows(len(rows), len(result.stdout))
+                return rows
+                
+            except subprocess.TimeoutExpired as e:
+                logger.error("Query timeout")
+                span.fail(e)
+                if raise_errors:
+                    raise
+                return []
+            except Exception as e:
+                logger.error(f"CLI query failed: {e}")
+                span.fail(e)
+                if raise_errors:
+                    raise
                 return []
-            
-            return self._parse_json_output(result.stdout)
-            
-        except subprocess.TimeoutExpired:
-            logger.error("Query timeout")
-            return []
-        except Exception as e:
-            logger.error(f"CLI query failed: {e}")
-            return []
     
     def _parse_json_output(self, output: str) -> List[Dict[str, Any]]:
         """Parse snow sql JSON output into list of dicts"""
@@ -268,38 +671,28 @@ class SnowflakeServiceSPCS:
     # Project Queries
     # =========================================================================
     
-    def get_projects(self) -> List[Dict[str, Any]]:
-        """Get all projects."""
+    def get_projects(self, fields: Fields = None) -> List[Dict[str, Any]]:
+        """Get all projects (`fields` narrows the columns; InvalidFieldError if unknown)."""
+        columns = PROJECT_FIELDS.resolve(fields)
         sql = f"""
         SELECT 
-            PROJECT_ID,
-            PROJECT_NAME,
-            PROJECT_TYPE,
-            STATUS,
-            CITY,
-            STATE,
-            LATITUDE,
-            LONGITUDE,
-            ORIGINAL_BUDGET,
-            CURRENT_BUDGET,
-            CONTINGENCY_BUDGET,
-            CONTINGENCY_USED,
-            CPI,
-            SPI,
-            PRIME_CONTRACTOR
+            {PROJECT_FIELDS.select_list(columns)}
         FROM {self.database}.{self.schema}.PROJECT
         ORDER BY PROJECT_NAME
         """
-        return self.execute_query(sql)
+        return self._cached_query(sql, tables=[f"{self.schema}.PROJECT"])
     
-    def get_project_detail(self, project_id: str) -> Optional[Dict[str, Any]]:
+    def get_project_detail(self, project_id: str, fields: Fields = None) -> Optional[Dict[str, Any]]:
         """Get detailed project information."""
-        sql = f"""
-        SELECT *
+        columns = PROJECT_DETAIL_FIELDS.resolve(fields)
+        name = f"get_project_detail[fields={PROJECT_DETAIL_FIELDS.signature(columns)}]"
+        sql = self.statements.sql(name, lambda: f"""
+        SELECT 
+            {PROJECT_DETAIL_FIELDS.select_list(columns)}
         FROM {self.database}.{self.schema}.PROJECT
-        WHERE PROJECT_ID = '{project_id}'
-        """
-        results = self.execute_query(sql)
+        WHERE PROJECT_ID = ?
+        """)
+        results = self.execute_query(sql, [project_id])
         return results[0] if results else None
     
     def get_portfolio_summary(self) -> Dict[str, Any]:
@@ -317,76 +710,198 @@ class SnowflakeServiceSPCS:
             SUM(CASE WHEN SPI < 0.95 THEN 1 ELSE 0 END) AS PROJECTS_BEHIND_SCHEDULE
         FROM {self.database}.{self.schema}.PROJECT
         """
-        results = self.execute_query(sql)
+        results = self._cached_query(sql, tables=[f"{self.schema}.PROJECT"])
         return results[0] if results else {}
     
     # =========================================================================
     # Change Order Queries
     # =========================================================================
     
-    def get_change_orders(self, project_id: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    def get_change_orders(
+        self, project_id: Optional[str] = None, limit: int = 100, fields: Fields = None
+    ) -> List[Dict[str, Any]]:
         """Get change orders with optional project filter."""
-        where_clause = f"WHERE co.PROJECT_ID = '{project_id}'" if project_id else ""
+        # One registered statement per (filter, fields) shape; LIMIT is bound
+        columns = CHANGE_ORDER_FIELDS.resolve(fields)
+        where_clause = "WHERE co.PROJECT_ID = ?" if project_id else ""
+        name = f"get_change_orders[project={bool(project_id)},fields={CHANGE_ORDER_FIELDS.signature(columns)}]"
         
-        sql = f"""
+        sql = self.statements.sql(name, lambda: f"""
         SELECT 
-            co.CO_ID,
-            co.PROJECT_ID,
-            p.PROJECT_NAME,
-            co.VENDOR_ID,
-            v.VENDOR_NAME,
-            co.CO_NUMBER,
-            co.CO_TITLE,
-            co.REASON_TEXT,
-            co.APPROVED_AMOUNT,
-            co.STATUS,
-            co.ML_CATEGORY,
-            co.ML_CONFIDENCE
+            {CHANGE_ORDER_FIELDS.select_list(columns)}
         FROM {self.database}.{self.schema}.CHANGE_ORDER co
         JOIN {self.database}.{self.schema}.PROJECT p ON co.PROJECT_ID = p.PROJECT_ID
         LEFT JOIN {self.database}.{self.schema}.VENDOR v ON co.VENDOR_ID = v.VENDOR_ID
         {where_clause}
         ORDER BY co.APPROVED_AMOUNT DESC
-        LIMIT {limit}
+        LIMIT ?
+        """)
+        return self.execute_query(sql, ([project_id] if project_id else []) + [int(limit)])
+    
+    def _change_orders_keyset(
+        self, project_id: Optional[str], cursor: Optional[str], limit: Optional[int], fields: Fields = None
+    ) -> Tuple[str, List[Any]]:
+        """SQL and binds for change orders after `cursor` (APPROVED_AMOUNT desc, CO_ID)."""
+        sort_expr = "COALESCE(co.APPROVED_AMOUNT, 0)"
+        # The page key columns are always selected
+        columns = CHANGE_ORDER_FIELDS.resolve(fields, required=["APPROVED_AMOUNT"])
+        where_clauses = []
+        params: List[Any] = []
+        if project_id:
+            where_clauses.append("co.PROJECT_ID = ?")
+            params.append(project_id)
+        if cursor:
+            where_clauses.append(keyset_predicate(sort_expr, "co.CO_ID"))
+            params += keyset_params(decode_cursor(cursor, (float, str)))  # APPROVED_AMOUNT is FLOAT
+        
+        where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        limit_clause = "LIMIT ?" if limit else ""
+        if limit:
+            params.append(int(limit))
+        name = (f"change_orders_keyset[project={bool(project_id)},after={bool(cursor)},limit={bool(limit)},"
+                f"fields={CHANGE_ORDER_FIELDS.signature(columns)}]")
+        
+        sql = self.statements.sql(name, lambda: f"""
+        SELECT 
+            {CHANGE_ORDER_FIELDS.select_list(columns)}
+        FROM {self.database}.{self.schema}.CHANGE_ORDER co
+        JOIN {self.database}.{self.schema}.PROJECT p ON co.PROJECT_ID = p.PROJECT_ID
+        LEFT JOIN {self.database}.{self.schema}.VENDOR v ON co.VENDOR_ID = v.VENDOR_ID
+        {where_clause}
+        ORDER BY {sort_expr} DESC, co.CO_ID
+        {limit_clause}
+        """)
+        return sql, params
+    
+    def get_change_orders_page(
+        self,
+        project_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        fields: Fields = None
+    ) -> Dict[str, Any]:
         """
-        return self.execute_query(sql)
+        One keyset page of change orders: {"items", "count", "next_cursor"}.
+        Pass next_cursor back as `cursor` for the following page.
+        """
+        limit = page_size(limit)
+        sql, params = self._change_orders_keyset(project_id, cursor, limit + 1, fields)
+        rows = self.execute_query(sql, params)
+        return make_page(rows, limit, lambda r: (r.get("APPROVED_AMOUNT") or 0, r["CO_ID"]))
+    
+    def iter_change_orders(
+        self,
+        project_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        fields: Fields = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Stream every change order after `cursor`, in page order, batch by batch."""
+        sql, params = self._change_orders_keyset(project_id, cursor, None, fields)
+        return self.execute_query_iter(sql, params, batch_rows=batch_rows)
     
     # =========================================================================
     # Schedule Activity Queries
     # =========================================================================
     
-    def get_activities(self, project_id: Optional[str] = None, critical_only: bool = False) -> List[Dict[str, Any]]:
+    def get_activities(
+        self, project_id: Optional[str] = None, critical_only: bool = False, fields: Fields = None
+    ) -> List[Dict[str, Any]]:
         """Get schedule activities with optional filters."""
+        columns = ACTIVITY_FIELDS.resolve(fields)
         where_clauses = []
+        params = []
         if project_id:
-            where_clauses.append(f"sa.PROJECT_ID = '{project_id}'")
+            where_clauses.append("sa.PROJECT_ID = ?")
+            params.append(project_id)
         if critical_only:
             where_clauses.append("sa.SLIP_PROBABILITY > 0.7")
         
         where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        name = (f"get_activities[project={bool(project_id)},critical={bool(critical_only)},"
+                f"fields={ACTIVITY_FIELDS.signature(columns)}]")
         
-        sql = f"""
+        sql = self.statements.sql(name, lambda: f"""
         SELECT 
-            sa.ACTIVITY_ID,
-            sa.PROJECT_ID,
-            p.PROJECT_NAME,
-            sa.ACTIVITY_NAME,
-            sa.PLANNED_START,
-            sa.PLANNED_FINISH,
-            sa.FORECAST_FINISH,
-            sa.PERCENT_COMPLETE,
-            sa.SLIP_PROBABILITY
+            {ACTIVITY_FIELDS.select_list(columns)}
         FROM {self.database}.{self.schema}.SCHEDULE_ACTIVITY sa
         JOIN {self.database}.{self.schema}.PROJECT p ON sa.PROJECT_ID = p.PROJECT_ID
         {where_clause}
         ORDER BY sa.SLIP_PROBABILITY DESC
         LIMIT 100
-        """
-        return self.execute_query(sql)
+        """)
+        return self.execute_query(sql, params)
+    
+    def _activities_keyset(
+        self,
+        project_id: Optional[str],
+        critical_only: bool,
+        cursor: Optional[str],
+        limit: Optional[int],
+        fields: Fields = None
+    ) -> Tuple[str, List[Any]]:
+        """SQL and binds for activities after `cursor` (SLIP_PROBABILITY desc, ACTIVITY_ID)."""
+        sort_expr = "COALESCE(sa.SLIP_PROBABILITY, 0)"
+        # The page key columns are always selected
+        columns = ACTIVITY_FIELDS.resolve(fields, required=["SLIP_PROBABILITY"])
+        where_clauses = []
+        params: List[Any] = []
+        if project_id:
+            where_clauses.append("sa.PROJECT_ID = ?")
+            params.append(project_id)
+        if critical_only:
+            where_clauses.append("sa.SLIP_PROBABILITY > 0.7")
+        if cursor:
+            where_clauses.append(keyset_predicate(sort_expr, "sa.ACTIVITY_ID"))
+            params += keyset_params(decode_cursor(cursor, (float, str)))
+        
+        where_clause = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
+        limit_clause = "LIMIT ?" if limit else ""
+        if limit:
+            params.append(int(limit))
+        name = (f"activities_keyset[project={bool(project_id)},critical={bool(critical_only)},"
+                f"after={bool(cursor)},limit={bool(limit)},fields={ACTIVITY_FIELDS.signature(columns)}]")
+        
+        sql = self.statements.sql(name, lambda: f"""
+        SELECT 
+            {ACTIVITY_FIELDS.select_list(columns)}
+        FROM {self.database}.{self.schema}.SCHEDULE_ACTIVITY sa
+        JOIN {self.database}.{self.schema}.PROJECT p ON sa.PROJECT_ID = p.PROJECT_ID
+        {where_clause}
+        ORDER BY {sort_expr} DESC, sa.ACTIVITY_ID
+        {limit_clause}
+        """)
+        return sql, params
+    
+    def get_activities_page(
+        self,
+        project_id: Optional[str] = None,
+        critical_only: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        fields: Fields = None
+    ) -> Dict[str, Any]:
+        """One keyset page of schedule activities: {"items", "count", "next_cursor"}."""
+        limit = page_size(limit)
+        sql, params = self._activities_keyset(project_id, critical_only, cursor, limit + 1, fields)
+        rows = self.execute_query(sql, params)
+        return make_page(rows, limit, lambda r: (r.get("SLIP_PROBABILITY") or 0.0, r["ACTIVITY_ID"]))
+    
+    def iter_activities(
+        self,
+        project_id: Optional[str] = None,
+        critical_only: bool = False,
+        cursor: Optional[str] = None,
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        fields: Fields = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Stream every activity after `cursor`, in page order, batch by batch."""
+        sql, params = self._activities_keyset(project_id, critical_only, cursor, None, fields)
+        return self.execute_query_iter(sql, params, batch_rows=batch_rows)
     
     def get_at_risk_activities(self, threshold: float = 0.5) -> List[Dict[str, Any]]:
         """Get activities with slip probability above threshold."""
-        sql = f"""
+        sql = self.statements.sql("get_at_risk_activities", lambda: f"""
         SELECT 
             sa.ACTIVITY_ID,
             sa.PROJECT_ID,
@@ -399,11 +914,11 @@ class SnowflakeServiceSPCS:
             DATEDIFF('day', sa.PLANNED_FINISH, sa.FORECAST_FINISH) as SLIP_DAYS
         FROM {self.database}.{self.schema}.SCHEDULE_ACTIVITY sa
         JOIN {self.database}.{self.schema}.PROJECT p ON sa.PROJECT_ID = p.PROJECT_ID
-        WHERE sa.SLIP_PROBABILITY > {threshold}
+        WHERE sa.SLIP_PROBABILITY > ?
         ORDER BY sa.SLIP_PROBABILITY DESC
         LIMIT 50
-        """
-        return self.execute_query(sql)
+        """)
+        return self.execute_query(sql, [float(threshold)])
     
     def search_change_orders(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -419,15 +934,14 @@ class SnowflakeServiceSPCS:
         if not keywords:
             return []
         
-        # Build LIKE conditions for each keyword
-        like_conditions = []
-        for kw in keywords[:5]:  # Limit to 5 keywords
-            like_conditions.append(f"LOWER(co.REASON_TEXT) LIKE '%{kw}%'")
+        # Fixed 5 keyword slots (OR'ed) so the SQL text never changes;
+        # unused slots bind NULL, and LIKE NULL never matches
+        patterns = [f"%{kw}%" for kw in keywords[:SEARCH_KEYWORD_SLOTS]]
+        patterns += [None] * (SEARCH_KEYWORD_SLOTS - len(patterns))
         
-        # Combine with OR for broader matches
-        where_clause = " OR ".join(like_conditions)
+        where_clause = " OR ".join(["LOWER(co.REASON_TEXT) LIKE ?"] * SEARCH_KEYWORD_SLOTS)
         
-        sql = f"""
+        sql = self.statements.sql("search_change_orders", lambda: f"""
         SELECT 
             co.CO_ID,
             co.PROJECT_ID,
@@ -446,29 +960,34 @@ class SnowflakeServiceSPCS:
         WHERE ({where_clause})
           AND co.STATUS = 'APPROVED'
         ORDER BY co.APPROVAL_DATE DESC
-        LIMIT {limit}
-        """
+        LIMIT ?
+        """)
         
         try:
-            results = self.execute_query(sql)
+            results = self.execute_query(sql, patterns + [int(limit)])
             logger.info(f"Search found {len(results)} results")
             return results
         except Exception as e:
             logger.error(f"Search failed: {e}")
             return []
     
-    def get_grounding_pattern(self) -> Dict[str, Any]:
-        """Get the grounding pattern - THE WOW MOMENT."""
+    def get_grounding_change_orders(self) -> List[Dict[str, Any]]:
+        """
+        Approved change orders citing grounding, by project name. The one scan
+        behind both the hidden pattern and its ML analysis.
+        """
         sql = f"""
         SELECT 
             co.CO_ID,
             co.PROJECT_ID,
             p.PROJECT_NAME,
+            co.VENDOR_ID,
             v.VENDOR_NAME,
             co.REASON_TEXT,
             co.APPROVED_AMOUNT,
             co.ML_CATEGORY,
-            co.ML_CONFIDENCE
+            co.ML_CONFIDENCE,
+            co.ML_SCOPE_GAP_PROB
         FROM {self.database}.{self.schema}.CHANGE_ORDER co
         JOIN {self.database}.{self.schema}.PROJECT p ON co.PROJECT_ID = p.PROJECT_ID
         LEFT JOIN {self.database}.{self.schema}.VENDOR v ON co.VENDOR_ID = v.VENDOR_ID
@@ -476,7 +995,13 @@ class SnowflakeServiceSPCS:
           AND co.STATUS = 'APPROVED'
         ORDER BY p.PROJECT_NAME
         """
-        results = self.execute_query(sql)
+        return self._cached_query(
+            sql, tables=[f"{self.schema}.CHANGE_ORDER", f"{self.schema}.PROJECT", f"{self.schema}.VENDOR"]
+        )
+    
+    def get_grounding_pattern(self) -> Dict[str, Any]:
+        """Get the grounding pattern - THE WOW MOMENT."""
+        results = self.get_grounding_change_orders()
         
         if results:
             total_amount = sum(r.get("APPROVED_AMOUNT", 0) or 0 for r in results)
@@ -507,8 +1032,6 @@ class SnowflakeServiceSPCS:
         GROUP BY ML_CATEGORY
         ORDER BY TOTAL_AMOUNT DESC
         """
-        results = self.execute_query(sql)
-        
         # Also get projects with scope issues
         project_sql = f"""
         SELECT 
@@ -523,7 +1046,15 @@ class SnowflakeServiceSPCS:
         HAVING COUNT(co.CO_ID) > 5
         ORDER BY TOTAL_CO_AMOUNT DESC
         """
-        project_results = self.execute_query(project_sql)
+        # Independent queries - run concurrently
+        batch = (
+            self.batch()
+            .add("by_category", sql, tables=[f"{self.schema}.CHANGE_ORDER"])
+            .add("high_co_projects", project_sql, tables=[f"{self.schema}.PROJECT", f"{self.schema}.CHANGE_ORDER"])
+        )
+        batch_results = batch.run()
+        results = batch_results["by_category"]
+        project_results = batch_results["high_co_projects"]
         
         return {
             "by_category": results,
@@ -552,7 +1083,118 @@ class SnowflakeServiceSPCS:
         WHERE ACTIVE_FLAG = TRUE
         ORDER BY RISK_SCORE DESC
         """
-        return self.execute_query(sql)
+        return self._cached_query(sql, tables=[f"{self.schema}.VENDOR"])
+    
+    def get_monthly_trend(self, project_id: Optional[str] = None, max_points: Optional[int] = None) -> Dict[str, Any]:
+        """
+        EVM series for S-curves from CAPITAL_PROJECTS.MONTHLY_TREND, columnar:
+        {"dates", "pv", "ev", "ac", "cpi", "spi"} (portfolio totals without a
+        project). The full history is cached per project; `max_points`
+        downsamples it with LTTB. Raises ValueError for max_points < 3.
+        """
+        if max_points is not None and max_points < MIN_POINTS:
+            raise ValueError(f"max_points must be at least {MIN_POINTS}")
+        if project_id:
+            sql = self.statements.sql("get_monthly_trend[project=True]", lambda: f"""
+            SELECT
+                SNAPSHOT_DATE,
+                PLANNED_VALUE,
+                EARNED_VALUE,
+                ACTUAL_COST_EV AS ACTUAL_COST,
+                CPI,
+                SPI
+            FROM {self.database}.CAPITAL_PROJECTS.MONTHLY_TREND
+            WHERE PROJECT_ID = ?
+            ORDER BY SNAPSHOT_DATE
+            """)
+        else:
+            # Portfolio indices from summed values, not averaged project indices
+            sql = self.statements.sql("get_monthly_trend[project=False]", lambda: f"""
+            SELECT
+                SNAPSHOT_DATE,
+                SUM(PLANNED_VALUE) AS PLANNED_VALUE,
+                SUM(EARNED_VALUE) AS EARNED_VALUE,
+                SUM(ACTUAL_COST_EV) AS ACTUAL_COST,
+                ROUND(SUM(EARNED_VALUE) / NULLIF(SUM(ACTUAL_COST_EV), 0), 3) AS CPI,
+                ROUND(SUM(EARNED_VALUE) / NULLIF(SUM(PLANNED_VALUE), 0), 3) AS SPI
+            FROM {self.database}.CAPITAL_PROJECTS.MONTHLY_TREND
+            GROUP BY SNAPSHOT_DATE
+            ORDER BY SNAPSHOT_DATE
+            """)
+        columns = self._cached_query(
+            sql,
+            tables=[f"{self.schema}.MONTHLY_SNAPSHOT", f"{self.schema}.PROJECT"],
+            params=[project_id] if project_id else None,
+            shape="columns"
+        ) or {}
+        
+        dates = [str(d)[:10] for d in columns.get("SNAPSHOT_DATE") or []]
+        series = {
+            "pv": columns.get("PLANNED_VALUE") or [],
+            "ev": columns.get("EARNED_VALUE") or [],
+            "ac": columns.get("ACTUAL_COST") or [],
+            "cpi": columns.get("CPI") or [],
+            "spi": columns.get("SPI") or []
+        }
+        total = len(dates)
+        if max_points and total > max_points:
+            x = [date.fromisoformat(d).toordinal() for d in dates]
+            keep = downsample_columns(x, series, max_points)
+            dates = [dates[i] for i in keep]
+            series = {key: [values[i] for i in keep] for key, values in series.items()}
+        return {
+            "project_id": project_id,
+            "total_points": total,
+            "points": len(dates),
+            "downsampled": len(dates) < total,
+            "dates": dates,
+            **series
+        }
+    
+    def get_map_index(self) -> GeoIndex:
+        """
+        Spatial index over CAPITAL_PROJECTS.MAP_DATA for viewport queries.
+        Rebuilt only when the cached rows change (PROJECT data version).
+        """
+        sql = f"""
+        SELECT
+            PROJECT_ID,
+            PROJECT_NAME,
+            PROJECT_TYPE,
+            STATUS,
+            CITY,
+            STATE,
+            LATITUDE,
+            LONGITUDE,
+            CURRENT_BUDGET,
+            CPI,
+            SPI,
+            RISK_LEVEL
+        FROM {self.database}.CAPITAL_PROJECTS.MAP_DATA
+        """
+        rows = self._cached_query(sql, tables=[f"{self.schema}.PROJECT"])
+        with self._map_index_lock:
+            if self._map_index is None or rows is not self._map_rows:
+                self._map_index = GeoIndex(
+                    {
+                        "id": r.get("PROJECT_ID"),
+                        "name": r.get("PROJECT_NAME"),
+                        "type": r.get("PROJECT_TYPE"),
+                        "status": r.get("STATUS"),
+                        "city": r.get("CITY"),
+                        "state": r.get("STATE"),
+                        "lat": float(r["LATITUDE"]),
+                        "lng": float(r["LONGITUDE"]),
+                        "budget": float(r.get("CURRENT_BUDGET") or 0),
+                        "cpi": float(r.get("CPI") or 0),
+                        "spi": float(r.get("SPI") or 0),
+                        "riskLevel": r.get("RISK_LEVEL") or "low"
+                    }
+                    for r in rows
+                    if r.get("LATITUDE") is not None and r.get("LONGITUDE") is not None
+                )
+                self._map_rows = rows
+            return self._map_index
     
     # =========================================================================
     # Direct SQL Query - Pattern Matching (RELIABLE)
@@ -693,39 +1335,64 @@ class SnowflakeServiceSPCS:
     # Cortex LLM
     # =========================================================================
     
-    def cortex_complete(self, prompt: str, model: str = "mistral-large2") -> str:
-        """Call Cortex Complete for LLM generation."""
-        escaped_prompt = prompt.replace("'", "''").replace("\\", "\\\\")
+    def cortex_complete(
+        self,
+        prompt: str,
+        model: str = "mistral-large2",
+        options: Optional[Dict[str, Any]] = None,
+        cache: bool = True
+    ) -> str:
+        """
+        Call Cortex Complete for LLM generation.
         
-        sql = f"""
-        SELECT SNOWFLAKE.CORTEX.COMPLETE(
-            '{model}',
-            '{escaped_prompt}'
-        ) AS RESPONSE
+        options: decoding options (temperature, top_p, max_tokens), part of
+        the completion cache key. cache=False bypasses the completion cache
+        for callers that want a fresh, non-deterministic answer.
         """
+        store = self.completion_cache
+        if store is None or not cache:
+            if store is not None:
+                store.bypassed()
+            return self._cortex_complete(prompt, model, options)
         
-        print(f"[LLM] Calling Cortex LLM with model: {model}", flush=True)
+        key = completion_key(model, prompt, options)
+        cached = store.lookup(key)
+        if cached is not None:
+            logger.info(f"Cortex LLM answer from completion cache (model: {model})")
+            return cached
+        response = self._cortex_complete(prompt, model, options)
+        store.put(key, model, response)
+        return response
+    
+    def _cortex_complete(self, prompt: str, model: str, options: Optional[Dict[str, Any]]) -> str:
+        if options:
+            # The options form takes a message list and answers with a JSON document
+            sql = self.statements.sql(
+                "cortex_complete_options",
+                lambda: "SELECT SNOWFLAKE.CORTEX.COMPLETE(?, "
+                        "ARRAY_CONSTRUCT(OBJECT_CONSTRUCT('role', 'user', 'content', ?)), "
+                        "PARSE_JSON(?)) AS RESPONSE"
+            )
+            params = [model, prompt, json.dumps(options)]
+        else:
+            sql = self.statements.sql(
+                "cortex_complete", lambda: "SELECT SNOWFLAKE.CORTEX.COMPLETE(?, ?) AS RESPONSE"
+            )
+            params = [model, prompt]
+        
+        logger.info(f"Calling Cortex LLM with model: {model}")
         
         try:
-            if self.is_spcs and self._connection:
-                cursor = self._connection.cursor()
-                cursor.execute(sql)
-                row = cursor.fetchone()
-                cursor.close()
-                
-                if row and row[0]:
-                    return str(row[0])
-                return ""
-            elif self.is_spcs and self._session:
-                df = self._session.sql(sql)
-                rows = df.collect()
-                if rows and rows[0][0]:
-                    return str(rows[0][0])
-                return ""
+            if self.pool:
+                rows = self._execute_query_pooled(sql, params)
+                response = str(rows[0]["RESPONSE"]) if rows and rows[0].get("RESPONSE") else ""
+            elif self.is_spcs and (self._connection or self._session):
+                rows = self._execute_query_snowpark(sql, params=params)
+                response = str(rows[0]["RESPONSE"]) if rows and rows[0].get("RESPONSE") else ""
             else:
-                return self._call_llm_cli(sql)
+                response = self._call_llm_cli(inline_params(sql, params))
+            return _completion_text(response) if options else response
         except Exception as e:
-            print(f"[LLM] Error: {e}", flush=True)
             logger.error(f"LLM call failed: {e}")
             return ""
     
@@ -753,7 +1420,12 @@ class SnowflakeServiceSPCS:
             return ""
     
     def cortex_analyst(self, question: str) -> Dict[str, Any]:
-        """Text-to-SQL using Cortex Complete LLM as fallback."""
+        """
+        Text-to-SQL using Cortex Complete LLM as fallback.
+        SQL for a question asked before (or a close paraphrase) comes from
+        the SQL cache and skips the LLM.
+        """
+        model = "mistral-large2"
         schema_context = f"""
 You are a SQL expert. Generate Snowflake SQL to answer the user's question.
 
@@ -780,10 +1452,30 @@ RULES:
 - Always include ORDER BY and LIMIT 20
 """
         
+        version = prompt_version(schema_context, model)
+        cached = self.sql_cache.lookup(question, version)
+        if cached:
+            sql, kind, similarity, cached_question = cached
+            try:
+                results = self.execute_query_checked(sql)
+                logger.info(f"SQL cache {kind} hit (similarity {similarity})")
+                answer = "Query executed"
+                if kind == "near":
+                    answer = f'Query executed - reused the SQL generated for the similar question "{cached_question}"'
+                return {
+                    "answer": answer, "sql": sql, "data": results, "error": None,
+                    "cached": kind, "cached_question": cached_question
+                }
+            except Exception as e:
+                logger.warning(f"Cached SQL failed, regenerating: {e}")
+                self.sql_cache.discard_sql(sql)
+        
         prompt = f"{schema_context}\n\nUSER QUESTION: {question}\n\nSQL:"
         
         try:
-            generated_sql = self.cortex_complete(prompt)
+            # The SQL cache covers this path and drops SQL that fails; the
+            # persistent completion cache would bring a bad generation back
+            generated_sql = self.cortex_complete(prompt, model, cache=False)
             
             if not generated_sql:
                 return {"answer": None, "sql": None, "data": None, "error": "LLM did not generate SQL"}
@@ -795,14 +1487,189 @@ RULES:
                 generated_sql = "\n".join(lines[1:-1] if lines[-1] == "```" else lines[1:])
             generated_sql = generated_sql.strip()
             
-            # Execute
-            results = self.execute_query(generated_sql)
+            # Execute; remember only SQL that runs (errors raise here)
+            results = self.execute_query_checked(generated_sql)
+            self.sql_cache.store(question, version, generated_sql)
             return {"answer": "Query executed", "sql": generated_sql, "data": results, "error": None}
         except Exception as e:
             return {"answer": None, "sql": None, "data": None, "error": str(e)}
     
+    # =========================================================================
+    # Async API - blocking calls run on the bounded QueryExecutor
+    # =========================================================================
+    
+    async def execute_query_async(
+        self,
+        query: str,
+        params: Params = None,
+        timeout: Optional[float] = None,
+        shape: str = "records"
+    ) -> Any:
+        """Execute a SQL query without blocking the event loop."""
+        return await self.executor.run(self.execute_query, query, params, shape, timeout=timeout)
+    
+    async def execute_query_iter_async(
+        self,
+        query: str,
+        params: Params = None,
+        shape: str = "records",
+        batch_rows: int = DEFAULT_BATCH_ROWS,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Any]:
+        """Stream a query's batches; each batch is fetched on the QueryExecutor (timeout per batch)."""
+        iterator = self.execute_query_iter(query, params, shape, batch_rows)
+        async for batch in self._drain_async(iterator, "execute_query_iter", timeout):
+            yield batch
+    
+    async def _drain_async(self, iterator: Iterator[Any], label: str, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        try:
+            await asyncio.wait_for(self._stream_slots.acquire(), STREAM_SLOT_WAIT)
+        except asyncio.TimeoutError:
+            iterator.close()
+            raise QueryTimeoutError(f"No stream slot within {STREAM_SLOT_WAIT:g}s ({self.max_streams} streams running)")
+        self._streams_running += 1
+        try:
+            while True:
+                batch = await self.executor.run(next, iterator, _END_OF_STREAM, timeout=timeout, label=label)
+                if batch is _END_OF_STREAM:
+                    return
+                yield batch
+        finally:
+            self._streams_running -= 1
+            self._stream_slots.release()
+            try:
+                iterator.close()
+            except ValueError:
+                # Still fetching on a worker (cancelled consumer) - the generator
+                # closes itself, returning its connection, once that fetch ends
+                pass
+    
+    def stream_stats(self) -> Dict[str, Any]:
+        return {"max_streams": self.max_streams, "running": self._streams_running}
+    
+    async def _load(self, fn, *args, **kwargs) -> Any:
+        """
+        Run a read on the executor. Identical calls within the current request
+        share one load (request loader); identical calls in flight across
+        requests share one executor task (single flight).
+        """
+        key = call_key(fn.__name__, args, kwargs)
+        if key is not None and fresh_only():
+            # Never share a (possibly stale) read with a conditional GET
+            key = (key, "fresh")
+        
+        def run():
+            return self.async_flight.do(key, lambda: self.executor.run(fn, *args, **kwargs))
+        
+        loader = current_loader()
+        if loader is None:
+            return await run()
+        return await loader.load(key, run)
+    
+    async def get_projects_async(self, fields: Fields = None) -> List[Dict[str, Any]]:
+        return await self._load(self.get_projects, fields=fields)
+    
+    async def get_project_detail_async(self, project_id: str, fields: Fields = None) -> Optional[Dict[str, Any]]:
+        return await self._load(self.get_project_detail, project_id, fields=fields)
+    
+    async def get_portfolio_summary_async(self) -> Dict[str, Any]:
+        return await self._load(self.get_portfolio_summary)
+    
+    async def get_change_orders_async(
+        self, project_id: Optional[str] = None, limit: int = 100, fields: Fields = None
+    ) -> List[Dict[str, Any]]:
+        return await self._load(self.get_change_orders, project_id=project_id, limit=limit, fields=fields)
+    
+    async def get_change_orders_page_async(
+        self,
+        project_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        fields: Fields = None
+    ) -> Dict[str, Any]:
+        return await self._load(self.get_change_orders_page, project_id, cursor, limit, fields)
+    
+    def iter_change_orders_async(
+        self, project_id: Optional[str] = None, cursor: Optional[str] = None, fields: Fields = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Async stream of change orders; `cursor` and `fields` are validated before this returns."""
+        iterator = self.iter_change_orders(project_id, cursor, fields=fields)
+        return self._drain_async(iterator, "iter_change_orders")
+    
+    async def get_activities_async(
+        self, project_id: Optional[str] = None, critical_only: bool = False, fields: Fields = None
+    ) -> List[Dict[str, Any]]:
+        return await self._load(
+            self.get_activities, project_id=project_id, critical_only=critical_only, fields=fields
+        )
+    
+    async def get_activities_page_async(
+        self,
+        project_id: Optional[str] = None,
+        critical_only: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        fields: Fields = None
+    ) -> Dict[str, Any]:
+        return await self._load(self.get_activities_page, project_id, critical_only, cursor, limit, fields)
+    
+    def iter_activities_async(
+        self,
+        project_id: Optional[str] = None,
+        critical_only: bool = False,
+        cursor: Optional[str] = None,
+        fields: Fields = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Async stream of activities; `cursor` and `fields` are validated before this returns."""
+        iterator = self.iter_activities(project_id, critical_only, cursor, fields=fields)
+        return self._drain_async(iterator, "iter_activities")
+    
+    async def get_at_risk_activities_async(self, threshold: float = 0.5) -> List[Dict[str, Any]]:
+        return await self._load(self.get_at_risk_activities, threshold=threshold)
+    
+    async def search_change_orders_async(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        return await self._load(self.search_change_orders, query, limit)
+    
+    async def get_grounding_change_orders_async(self) -> List[Dict[str, Any]]:
+        return await self._load(self.get_grounding_change_orders)
+    
+    async def get_grounding_pattern_async(self) -> Dict[str, Any]:
+        return await self._load(self.get_grounding_pattern)
+    
+    async def get_scope_gap_analysis_async(self) -> Dict[str, Any]:
+        return await self._load(self.get_scope_gap_analysis)
+    
+    async def get_vendors_async(self) -> List[Dict[str, Any]]:
+        return await self._load(self.get_vendors)
+    
+    async def get_monthly_trend_async(
+        self, project_id: Optional[str] = None, max_points: Optional[int] = None
+    ) -> Dict[str, Any]:
+        return await self._load(self.get_monthly_trend, project_id=project_id, max_points=max_points)
+    
+    async def get_map_index_async(self) -> GeoIndex:
+        return await self._load(self.get_map_index)
+    
+    async def direct_sql_query_async(self, question: str) -> Dict[str, Any]:
+        return await self.executor.run(self.direct_sql_query, question)
+    
+    async def cortex_complete_async(
+        self,
+        prompt: str,
+        model: str = "mistral-large2",
+        options: Optional[Dict[str, Any]] = None,
+        cache: bool = True
+    ) -> str:
+        return await self.executor.run(self.cortex_complete, prompt, model, options, cache)
+    
+    async def cortex_analyst_async(self, question: str) -> Dict[str, Any]:
+        return await self.executor.run(self.cortex_analyst, question)
+    
     def close(self):
         """Close the connection"""
+        self.executor.shutdown()
+        if self.pool:
+            self.pool.close()
         if self._session:
             self._session.close()
         if self._connection:
@@ -814,11 +1681,14 @@ RULES:
 
 # Singleton instance
 _snowflake_service: Optional[SnowflakeServiceSPCS] = None
+_snowflake_service_lock = threading.Lock()
 
 
 def get_snowflake_service() -> SnowflakeServiceSPCS:
-    """Get or create Snowflake service singleton"""
+    """Get or create Snowflake service singleton (warm-up and requests may race to create it)"""
     global _snowflake_service
     if _snowflake_service is None:
-        _snowflake_service = SnowflakeServiceSPCS()
+        with _snowflake_service_lock:
+            if _snowflake_service is None:
+                _snowflake_service = SnowflakeServiceSPCS()
     return _snowflake_service
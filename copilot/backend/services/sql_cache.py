@@ -0,0 +1,193 @@
+"""
+ATLAS Capital Delivery - Question -> SQL Cache
+
+Text-to-SQL through Cortex COMPLETE sends the whole schema prompt and waits
+seconds for the SQL. Analysts ask the same questions again, often reworded,
+so generated SQL is remembered per question:
+- exact hit: same normalized text (case, punctuation, whitespace ignored)
+- near hit: a cached question with the same set of content terms (words
+  left after dropping stop words, plurals folded) whose local embedding
+  (word + character trigram features, no model call) has cosine similarity
+  >= the threshold. A near hit only absorbs word order, plurals and function
+  words: every other word is a filter or measure ("northeast" / "southeast",
+  "transit" / "highway", "over" / "under", numbers), so a question differing
+  in any of them is a miss; the result names the question it reused
+- entries belong to a version (hash of the schema prompt, LLM model and
+  ATLAS_SEMANTIC_MODEL_VERSION); a new version misses every older entry
+
+Only the SQL is cached - it is executed on every request, so results follow
+the data. Only SQL that executed without error is stored.
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+SQL_CACHE_SIZE = int(os.environ.get("ATLAS_SQL_CACHE_SIZE", "512"))
+SQL_CACHE_SIMILARITY = float(os.environ.get("ATLAS_SQL_CACHE_SIMILARITY", "0.92"))
+SEMANTIC_MODEL_VERSION = os.environ.get("ATLAS_SEMANTIC_MODEL_VERSION", "1")
+
+_WORD = re.compile(r"[a-z0-9_-]+")
+
+STOP_WORDS = frozenset("""
+a an are as at be been by can could do does find for from get give had has have
+i in is it list me my of on our per please show tell that the their them there
+these this to us was we were what which with would you
+""".split())
+
+Embedding = Dict[str, float]
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(_WORD.findall(question.lower()))
+
+
+def _stem(token: str) -> str:
+    # Plural folding is enough for questions ("vendors" ~ "vendor")
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _tokens(normalized: str) -> List[str]:
+    return [_stem(token) for token in normalized.split() if token not in STOP_WORDS]
+
+
+def content_terms(normalized: str) -> FrozenSet[str]:
+    """Terms a near match must share exactly - every word that is not a stop word."""
+    return frozenset(_tokens(normalized))
+
+
+def embed(normalized: str) -> Embedding:
+    """Sparse L2-normalized vector of word and character trigram features."""
+    features: Embedding = {}
+    for token in _tokens(normalized):
+        features[f"w:{token}"] = features.get(f"w:{token}", 0.0) + 1.0
+        padded = f"#{token}#"
+        for i in range(len(padded) - 2):
+            gram = f"c:{padded[i:i + 3]}"
+            features[gram] = features.get(gram, 0.0) + 0.5
+    norm = math.sqrt(sum(value * value for value in features.values()))
+    return {key: value / norm for key, value in features.items()} if norm else {}
+
+
+def cosine(a: Embedding, b: Embedding) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(key, 0.0) for key, value in a.items())
+
+
+def prompt_version(*parts: str) -> str:
+    """Version id for a schema prompt / model / semantic model combination."""
+    digest = hashlib.sha1()
+    for part in (*parts, SEMANTIC_MODEL_VERSION):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class _Entry:
+    __slots__ = ("question", "sql", "version", "embedding", "terms", "hits")
+
+    def __init__(self, question: str, sql: str, version: str, embedding: Embedding, terms: FrozenSet[str]):
+        self.question = question
+        self.sql = sql
+        self.version = version
+        self.embedding = embedding
+        self.terms = terms
+        self.hits = 0
+
+
+class SemanticSQLCache:
+    """Thread-safe LRU of normalized question -> generated SQL."""
+
+    def __init__(self, max_entries: int = SQL_CACHE_SIZE, threshold: float = SQL_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.lookups = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.stale = 0  # entries dropped for an older version
+        self.stores = 0
+
+    def lookup(self, question: str, version: str) -> Optional[Tuple[str, str, float, str]]:
+        """(sql, "exact" | "near", similarity, cached question) for a cached answer, or None."""
+        normalized = normalize_question(question)
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(normalized)
+            if entry is not None:
+                if entry.version == version:
+                    return self._hit(normalized, entry, "exact", 1.0)
+                del self._entries[normalized]
+                self.stale += 1
+
+            embedding = embed(normalized)
+            if not embedding:
+                return None
+            terms = content_terms(normalized)
+            best_key, best, best_score = None, None, self.threshold
+            for key, candidate in self._entries.items():
+                if candidate.version != version or candidate.terms != terms:
+                    continue
+                score = cosine(embedding, candidate.embedding)
+                if score >= best_score:
+                    best_key, best, best_score = key, candidate, score
+            if best is None:
+                return None
+            return self._hit(best_key, best, "near", best_score)
+
+    def _hit(self, key: str, entry: _Entry, kind: str, score: float) -> Tuple[str, str, float, str]:
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        if kind == "exact":
+            self.exact_hits += 1
+        else:
+            self.near_hits += 1
+        return entry.sql, kind, round(score, 3), entry.question
+
+    def store(self, question: str, version: str, sql: str):
+        normalized = normalize_question(question)
+        if not normalized:
+            return
+        entry = _Entry(question, sql, version, embed(normalized), content_terms(normalized))
+        with self._lock:
+            self._entries[normalized] = entry
+            self._entries.move_to_end(normalized)
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard_sql(self, sql: str):
+        """Forget every question answered by `sql` (it no longer executes)."""
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.sql == sql]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.exact_hits + self.near_hits
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.lookups - hits,
+                "hit_rate": round(hits / self.lookups, 3) if self.lookups else 0.0,
+                "stale": self.stale,
+                "stores": self.stores
+            }
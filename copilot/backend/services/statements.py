@@ -0,0 +1,154 @@
+"""
+ATLAS Capital Delivery - Statements & Bind Parameters
+
+Service methods use fixed SQL text with qmark (`?`) bind parameters, so every
+call of a method sends the same statement to Snowflake (compiled-plan and
+result reuse) and user input is never spliced into SQL.
+
+- StatementRegistry: named, whitespace-normalized SQL text built once per
+  service, plus per-session execution tracking; LRU-bounded, since sparse
+  fieldsets give some methods many statement shapes
+- inline_params: client-side literal rendering, only for the snow CLI
+  fallback (which cannot bind)
+"""
+
+import datetime
+import logging
+import os
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Set
+
+from .result_cache import normalize_sql
+
+logger = logging.getLogger(__name__)
+
+Params = Optional[Sequence[Any]]
+
+DEFAULT_MAX_STATEMENTS = int(os.environ.get("ATLAS_MAX_STATEMENTS", "256"))
+
+
+class _Statement:
+    __slots__ = ("name", "sql", "executions", "sessions")
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.executions = 0
+        self.sessions: Set[Hashable] = set()
+
+
+class StatementRegistry:
+    """
+    Per-service registry of named statements.
+
+    `sql(name, build)` returns the registered text (building it on first use),
+    so each method always issues byte-identical SQL. `record()` counts
+    executions and the sessions each statement has been compiled on - a
+    statement's first run on a session pays compilation, later runs reuse it.
+    At most `max_statements` are kept; the least recently used is dropped
+    (an evicted statement is simply built again on its next use).
+    """
+
+    def __init__(self, max_statements: int = DEFAULT_MAX_STATEMENTS):
+        self.max_statements = max_statements
+        self._by_name: "OrderedDict[str, _Statement]" = OrderedDict()
+        self._by_sql: Dict[str, _Statement] = {}
+        self._lock = threading.Lock()
+        self._evictions = 0
+
+    def sql(self, name: str, build: Callable[[], str]) -> str:
+        with self._lock:
+            statement = self._by_name.get(name)
+            if statement is not None:
+                self._by_name.move_to_end(name)
+                return statement.sql
+        text = normalize_sql(build())
+        with self._lock:
+            statement = self._by_name.get(name)
+            if statement is None:
+                statement = _Statement(name, text)
+                self._by_name[name] = statement
+                self._by_sql[statement.sql] = statement
+                while len(self._by_name) > self.max_statements:
+                    _, evicted = self._by_name.popitem(last=False)
+                    if self._by_sql.get(evicted.sql) is evicted:
+                        del self._by_sql[evicted.sql]
+                    self._evictions += 1
+            return statement.sql
+
+    def record(self, sql: str, session: Hashable) -> Optional[bool]:
+        """
+        Note an execution of `sql` on `session`.
+        Returns True on the statement's first run on that session, None if unregistered.
+        """
+        statement = self._by_sql.get(sql)
+        if statement is None:
+            return None
+        with self._lock:
+            statement.executions += 1
+            first = session not in statement.sessions
+            if first:
+                statement.sessions.add(session)
+            return first
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "registered": len(self._by_name),
+                "max_statements": self.max_statements,
+                "evictions": self._evictions,
+                "statements": {
+                    name: {
+                        "executions": st.executions,
+                        "sessions": len(st.sessions),
+                        "reused": max(st.executions - len(st.sessions), 0)
+                    }
+                    for name, st in self._by_name.items()
+                }
+            }
+
+
+# =============================================================================
+# Client-side rendering (snow CLI fallback only)
+# =============================================================================
+
+
+def sql_literal(value: Any) -> str:
+    """Render a Python value as a Snowflake SQL literal."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float, Decimal)):
+        return repr(value) if isinstance(value, float) else str(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return f"'{value.isoformat()}'"
+    text = str(value).replace("\\", "\\\\").replace("'", "''")
+    return f"'{text}'"
+
+
+def inline_params(sql: str, params: Params) -> str:
+    """Substitute qmark placeholders (outside quoted strings) with literals."""
+    if not params:
+        return sql
+    values = iter(params)
+    out = []
+    quote = None
+    for ch in sql:
+        if quote:
+            if ch == quote:
+                quote = None
+            out.append(ch)
+        elif ch in ("'", '"'):
+            quote = ch
+            out.append(ch)
+        elif ch == "?":
+            try:
+                out.append(sql_literal(next(values)))
+            except StopIteration:
+                raise ValueError("Not enough bind parameters for statement")
+        else:
+            out.append(ch)
+    return "".join(out)
@@ -0,0 +1,400 @@
+"""
+ATLAS Capital Delivery - Query Telemetry
+
+Per-query timing breakdown recorded at the execution core:
+- queue:   wait for a QueryExecutor worker (first query of an executor call)
+- execute: submit -> result ready (warehouse time plus one round trip)
+- fetch:   downloading result chunks
+- convert: decoding rows into the API shape
+plus row count and result bytes, tagged with the calling service method and
+a SQL fingerprint.
+
+Exposed as Prometheus text-format histograms (/metrics), per-fingerprint
+aggregates (/api/diagnostics) and sampled structured log records on the
+"atlas.query" logger (slow and failed queries are always logged).
+
+Composite endpoints additionally record their end-to-end latency together
+with how many service reads their request loader issued and shared.
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+query_log = logging.getLogger("atlas.query")
+
+DEFAULT_LOG_SAMPLE_RATE = float(os.environ.get("ATLAS_QUERY_LOG_SAMPLE", "0.05"))
+DEFAULT_SLOW_QUERY_MS = float(os.environ.get("ATLAS_SLOW_QUERY_MS", "2000"))
+MAX_FINGERPRINTS = 200
+
+PHASES = ("queue", "execute", "fetch", "convert")
+
+# Histogram buckets
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ROWS_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BYTES_BUCKETS = (1_024, 16_384, 131_072, 1_048_576, 8_388_608, 67_108_864)
+
+# Calling service method and executor queue wait, set per executor call
+_method: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("atlas_query_method", default=None)
+_queue_wait: contextvars.ContextVar[float] = contextvars.ContextVar("atlas_query_queue_wait", default=0.0)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(sql: str) -> str:
+    """SQL with literals replaced by `?` and whitespace/case folded (safe to log)."""
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip().upper()
+
+
+def fingerprint(sql: str) -> str:
+    """Stable id for a statement shape."""
+    return hashlib.sha1(statement_shape(sql).encode("utf-8")).hexdigest()[:12]
+
+
+@contextmanager
+def call_scope(method: str, queue_wait: float = 0.0) -> Iterator[None]:
+    """Attribute queries issued inside this block to `method`."""
+    method_token = _method.set(method)
+    wait_token = _queue_wait.set(queue_wait)
+    try:
+        yield
+    finally:
+        _method.reset(method_token)
+        _queue_wait.reset(wait_token)
+
+
+def _take_queue_wait() -> float:
+    # Only the first query of an executor call actually waited in the queue
+    wait = _queue_wait.get()
+    if wait:
+        _queue_wait.set(0.0)
+    return wait
+
+
+# =============================================================================
+# Prometheus primitives
+# =============================================================================
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], labelnames: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        # Caller holds the telemetry lock
+        series = self._series.get(labels)
+        if series is None:
+            # bucket counts..., +Inf count, sum
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series):
+                le = _format_labels(self.labelnames, labels, f'le="{bound:g}"')
+                lines.append(f"{self.name}_bucket{le} {count:g}")
+            inf = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_bucket{inf} {series[-2]:g}")
+            lines.append(f"{self.name}_count{plain} {series[-2]:g}")
+            lines.append(f"{self.name}_sum{plain} {series[-1]:.6f}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1):
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+def render_gauges(prefix: str, stats: Optional[Dict[str, Any]]) -> List[str]:
+    """Numeric entries of a component stats() dict as untyped gauges."""
+    lines = []
+    for key, value in (stats or {}).items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        lines.append(f"# TYPE {prefix}_{key} gauge")
+        lines.append(f"{prefix}_{key} {value:g}")
+    return lines
+
+
+# =============================================================================
+# Spans
+# =============================================================================
+
+
+class QuerySpan:
+    """Timing record for one query; phases accumulate (streams fetch repeatedly)."""
+
+    __slots__ = ("sql", "path", "method", "started", "timings", "rows", "bytes", "status", "error")
+
+    def __init__(self, sql: str, path: str):
+        self.sql = sql
+        self.path = path
+        self.method = _method.get() or "unattributed"
+        self.started = time.monotonic()
+        self.timings: Dict[str, float] = {"queue": _take_queue_wait()}
+        self.rows: Optional[int] = None
+        self.bytes: Optional[int] = None
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, time.monotonic() - started)
+
+    def add(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def add_rows(self, rows: int, nbytes: Optional[int] = None):
+        self.rows = (self.rows or 0) + rows
+        if nbytes is not None:
+            self.bytes = (self.bytes or 0) + nbytes
+
+    def fail(self, error: Any):
+        """Mark the span failed for paths that swallow their errors."""
+        self.status = "error"
+        self.error = str(error)[:500]
+
+
+class _NullSpan:
+    """Span stand-in for callers that do not record telemetry."""
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        yield
+
+    def add(self, name: str, seconds: float):
+        pass
+
+    def add_rows(self, rows: int, nbytes: Optional[int] = None):
+        pass
+
+    def fail(self, error: Any):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+# =============================================================================
+# Telemetry registry
+# =============================================================================
+
+
+class QueryTelemetry:
+    """Process-wide query metrics: histograms, per-fingerprint aggregates, sampled logs."""
+
+    def __init__(self, sample_rate: float = DEFAULT_LOG_SAMPLE_RATE, slow_ms: float = DEFAULT_SLOW_QUERY_MS):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._phase_seconds = Histogram(
+            "atlas_query_phase_seconds", "Query time by phase (queue, execute, fetch, convert, total)",
+            SECONDS_BUCKETS, ("method", "phase")
+        )
+        self._rows = Histogram("atlas_query_rows", "Rows returned per query", ROWS_BUCKETS, ("method",))
+        self._bytes = Histogram("atlas_query_result_bytes", "Result bytes per query", BYTES_BUCKETS, ("method",))
+        self._queries = Counter("atlas_queries_total", "Queries executed", ("method", "path", "status"))
+        self._request_seconds = Histogram(
+            "atlas_request_seconds", "Composite endpoint latency", SECONDS_BUCKETS, ("endpoint", "status")
+        )
+        self._loader_reads = Counter(
+            "atlas_request_loader_reads_total", "Service reads per composite endpoint (loaded or shared)",
+            ("endpoint", "outcome")
+        )
+        self._fingerprints: Dict[str, Dict[str, Any]] = {}
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+
+    def start(self, sql: str, path: str) -> QuerySpan:
+        return QuerySpan(sql, path)
+
+    @contextmanager
+    def query(self, sql: str, path: str) -> Iterator[QuerySpan]:
+        """Record a span around a query; exceptions mark it failed and propagate."""
+        span = self.start(sql, path)
+        try:
+            yield span
+        except GeneratorExit:
+            span.status = "cancelled"
+            raise
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            self.finish(span)
+
+    def finish(self, span: QuerySpan):
+        total = time.monotonic() - span.started + span.timings.get("queue", 0.0)
+        fp = fingerprint(span.sql)
+        with self._lock:
+            for phase in PHASES:
+                if phase in span.timings:
+                    self._phase_seconds.observe((span.method, phase), span.timings[phase])
+            self._phase_seconds.observe((span.method, "total"), total)
+            if span.rows is not None:
+                self._rows.observe((span.method,), span.rows)
+            if span.bytes is not None:
+                self._bytes.observe((span.method,), span.bytes)
+            self._queries.inc((span.method, span.path, span.status))
+            self._aggregate(fp, span, total)
+
+        total_ms = total * 1000
+        if span.status == "error" or total_ms >= self.slow_ms or random.random() < self.sample_rate:
+            self._log(fp, span, total_ms)
+
+    def _aggregate(self, fp: str, span: QuerySpan, total: float):
+        entry = self._fingerprints.get(fp)
+        if entry is None:
+            if len(self._fingerprints) >= MAX_FINGERPRINTS:
+                # Drop the least-executed fingerprint to stay bounded
+                coldest = min(self._fingerprints, key=lambda k: self._fingerprints[k]["count"])
+                del self._fingerprints[coldest]
+            entry = self._fingerprints[fp] = {
+                "method": span.method, "sql": statement_shape(span.sql)[:200],
+                "count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0, "rows": 0
+            }
+        entry["count"] += 1
+        entry["errors"] += span.status == "error"
+        entry["total_s"] += total
+        entry["max_s"] = max(entry["max_s"], total)
+        entry["rows"] += span.rows or 0
+
+    def _log(self, fp: str, span: QuerySpan, total_ms: float):
+        record = {
+            "event": "query",
+            "fingerprint": fp,
+            "method": span.method,
+            "path": span.path,
+            "status": span.status,
+            "total_ms": round(total_ms, 1),
+            **{f"{phase}_ms": round(span.timings[phase] * 1000, 1) for phase in PHASES if phase in span.timings},
+            "rows": span.rows,
+            "bytes": span.bytes
+        }
+        if span.error:
+            record["error"] = span.error
+        level = logging.WARNING if span.status == "error" or total_ms >= self.slow_ms else logging.INFO
+        query_log.log(level, json.dumps(record))
+
+    def record_request(self, endpoint: str, seconds: float, loader_stats: Dict[str, Any], status: str = "ok"):
+        """Record one composite endpoint call and its request loader counts."""
+        loads, shared = loader_stats.get("loads", 0), loader_stats.get("shared", 0)
+        with self._lock:
+            self._request_seconds.observe((endpoint, status), seconds)
+            self._loader_reads.inc((endpoint, "loaded"), loads)
+            self._loader_reads.inc((endpoint, "shared"), shared)
+            entry = self._endpoints.setdefault(
+                endpoint, {"count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0, "loads": 0, "shared": 0}
+            )
+            entry["count"] += 1
+            entry["errors"] += status != "ok"
+            entry["total_s"] += seconds
+            entry["max_s"] = max(entry["max_s"], seconds)
+            entry["loads"] += loads
+            entry["shared"] += shared
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in (self._queries, self._phase_seconds, self._rows, self._bytes,
+                           self._request_seconds, self._loader_reads):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def stats(self, top: int = 20) -> Dict[str, Any]:
+        """Slowest fingerprints by cumulative time."""
+        with self._lock:
+            ranked = sorted(self._fingerprints.items(), key=lambda kv: kv[1]["total_s"], reverse=True)[:top]
+            return {
+                "sample_rate": self.sample_rate,
+                "slow_query_ms": self.slow_ms,
+                "fingerprints": len(self._fingerprints),
+                "top": [
+                    {
+                        "fingerprint": fp,
+                        **{k: v for k, v in entry.items() if k not in ("total_s", "max_s")},
+                        "avg_ms": round(entry["total_s"] / entry["count"] * 1000, 1),
+                        "max_ms": round(entry["max_s"] * 1000, 1)
+                    }
+                    for fp, entry in ranked
+                ],
+                "endpoints": {
+                    endpoint: {
+                        "count": entry["count"],
+                        "errors": entry["errors"],
+                        "avg_ms": round(entry["total_s"] / entry["count"] * 1000, 1),
+                        "max_ms": round(entry["max_s"] * 1000, 1),
+                        "avg_loads": round(entry["loads"] / entry["count"], 2),
+                        "avg_shared": round(entry["shared"] / entry["count"], 2)
+                    }
+                    for endpoint, entry in self._endpoints.items()
+                }
+            }
+
+
+# Process-wide instance
+_telemetry: Optional[QueryTelemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_query_telemetry() -> QueryTelemetry:
+    """Get or create the process-wide QueryTelemetry"""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = QueryTelemetry()
+    return _telemetry
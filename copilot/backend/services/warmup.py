@@ -0,0 +1,127 @@
+"""
+ATLAS Capital Delivery - Warm-up & Readiness
+
+Container start runs a background warm-up so the first user request does not
+pay for session setup and cold caches. Steps run in order on a worker thread:
+required steps are retried with backoff until they succeed, optional steps
+are attempted once.
+
+Readiness (/ready) turns true once every required step has succeeded;
+/health stays a pure liveness check.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETRY_INTERVAL = float(os.environ.get("ATLAS_WARMUP_RETRY_INTERVAL", "5"))
+MAX_RETRY_INTERVAL = 60.0
+
+
+class WarmupStep:
+    """One named warm-up action and its progress."""
+
+    def __init__(self, name: str, fn: Callable[[], Any], required: bool = True):
+        self.name = name
+        self.fn = fn
+        self.required = required
+        self.status = "pending"     # pending | running | done | failed
+        self.attempts = 0
+        self.elapsed_ms: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "required": self.required,
+            "status": self.status,
+            "attempts": self.attempts,
+            "elapsed_ms": self.elapsed_ms,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class Warmup:
+    """
+    Background warm-up sequence with readiness reporting.
+
+        warmup = Warmup([WarmupStep("session", connect), WarmupStep("agents", load, required=False)])
+        warmup.start()          # from the app's startup hook
+        warmup.ready            # True once all required steps are done
+    """
+
+    def __init__(self, steps: Sequence[WarmupStep], retry_interval: float = DEFAULT_RETRY_INTERVAL):
+        self.steps: List[WarmupStep] = list(steps)
+        self.retry_interval = retry_interval
+        self._task: Optional[asyncio.Task] = None
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return all(step.status == "done" for step in self.steps if step.required)
+
+    def start(self) -> asyncio.Task:
+        """Schedule the warm-up on the running event loop (idempotent)."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def run(self):
+        self._started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        for step in self.steps:
+            delay = self.retry_interval
+            while True:
+                # Blocking connects / queries stay off the event loop
+                if await loop.run_in_executor(None, self._attempt, step) or not step.required:
+                    break
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_INTERVAL)
+        self._finished = time.monotonic()
+        logger.info(f"Warm-up finished in {self._elapsed_ms():.0f} ms (ready={self.ready})")
+
+    def _attempt(self, step: WarmupStep) -> bool:
+        step.status = "running"
+        step.attempts += 1
+        started = time.monotonic()
+        try:
+            step.result = step.fn()
+            step.status = "done"
+            step.error = None
+            logger.info(f"Warm-up step '{step.name}' done in {(time.monotonic() - started) * 1000:.0f} ms")
+            return True
+        except Exception as e:
+            step.status = "failed"
+            step.error = str(e)
+            level = logging.WARNING if step.required else logging.INFO
+            logger.log(level, f"Warm-up step '{step.name}' failed (attempt {step.attempts}): {e}")
+            return False
+        finally:
+            step.elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+
+    def _elapsed_ms(self) -> Optional[float]:
+        if self._started is None:
+            return None
+        end = self._finished if self._finished is not None else time.monotonic()
+        return (end - self._started) * 1000
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def status(self) -> Dict[str, Any]:
+        current = next((s.name for s in self.steps if s.status in ("pending", "running", "failed")), None)
+        elapsed = self._elapsed_ms()
+        return {
+            "ready": self.ready,
+            "phase": "complete" if self._finished is not None else (current or "starting"),
+            "elapsed_ms": round(elapsed, 1) if elapsed is not None else None,
+            "steps": [step.to_dict() for step in self.steps]
+        }
@@ -189,7 +189,7 @@ spec:
           cpu: 2
       readinessProbe:
         port: 8080
-        path: /health
+        path: /ready
   endpoints:
     - name: atlas-endpoint
       port: 8080
@@ -217,7 +217,7 @@ spec:
           cpu: 2
       readinessProbe:
         port: 8080
-        path: /health
+        path: /ready
   endpoints:
     - name: atlas-endpoint
       port: 8080
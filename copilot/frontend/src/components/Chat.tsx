@@ -66,6 +66,8 @@ Try asking: *"What hidden patterns exist in our change orders?"*`,
       timestamp: new Date()
     }
   ])
+  // Server-side conversation context is kept per session
+  const [sessionId] = useState(() => crypto.randomUUID())
   const [input, setInput] = useState('')
   const [isLoading, setIsLoading] = useState(false)
   const [showThinking, setShowThinking] = useState<Record<string, boolean>>({})
@@ -115,7 +117,8 @@ Try asking: *"What hidden patterns exist in our change orders?"*`,
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
           message: content.trim(),
-          project_id: projectId
+          project_id: projectId,
+          session_id: sessionId
         })
       })
 
@@ -275,7 +278,8 @@ Try asking: *"What hidden patterns exist in our change orders?"*`,
           headers: { 'Content-Type': 'application/json' },
           body: JSON.stringify({
             message: content.trim(),
-            project_id: projectId
+            project_id: projectId,
+            session_id: sessionId
           })
         })
 
@@ -91,21 +91,29 @@ export function ScopeForensics(_props: NavigationContext) {
 
   const fetchData = async () => {
     try {
-      // Fetch all data in parallel
-      const [patternRes, mlClassRes, mlHiddenRes] = await Promise.all([
-        fetch('/api/change-orders/hidden-pattern'),
-        fetch('/api/ml/classification-summary'),
-        fetch('/api/ml/hidden-pattern-analysis')
-      ])
-      
-      if (patternRes.ok) {
-        setPattern(await patternRes.json())
+      // One round trip; the backend runs the three requests concurrently
+      const res = await fetch('/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          requests: [
+            { id: 'pattern', path: '/api/change-orders/hidden-pattern' },
+            { id: 'mlClass', path: '/api/ml/classification-summary' },
+            { id: 'mlHidden', path: '/api/ml/hidden-pattern-analysis' }
+          ]
+        })
+      })
+      if (!res.ok) throw new Error(`Batch request failed: ${res.status}`)
+      const { results } = await res.json()
+
+      if (results.pattern?.ok) {
+        setPattern(results.pattern.body)
       }
-      if (mlClassRes.ok) {
-        setMlClassifications(await mlClassRes.json())
+      if (results.mlClass?.ok) {
+        setMlClassifications(results.mlClass.body)
       }
-      if (mlHiddenRes.ok) {
-        setMlHiddenAnalysis(await mlHiddenRes.json())
+      if (results.mlHidden?.ok) {
+        setMlHiddenAnalysis(results.mlHidden.body)
       }
     } catch (error) {
       console.error('Failed to fetch data:', error)